@@ -2,11 +2,9 @@ from __future__ import annotations
 
 from typing import Dict, Optional
 
-from django.conf import settings
-from django.utils import timezone
-from itsdangerous import URLSafeSerializer
-
 from apps.candidates.models import Candidate
+from apps.documents.models import DocumentRequest
+from apps.documents.portal import issue_portal_token, portal_link
 from .models import AgentMessage
 from .templates import build_request_documents_email, build_request_documents_sms
 from .stubs import send_email, send_sms
@@ -31,12 +29,19 @@ def pick_channel(candidate: Candidate, preferred: Optional[str] = None) -> Optio
 
 def make_magic_link(candidate: Candidate) -> str:
     """
-    Generates a simple signed link token for uploads (portal is optional in this MVP).
+    Issues a timed upload token, records it on a DocumentRequest so /portal/upload
+    can redeem it, and returns the link.
     """
-    base = "http://localhost:8000"
-    s = URLSafeSerializer(settings.SECRET_KEY, salt="doc-request")
-    token = s.dumps({"cid": candidate.id, "ts": timezone.now().isoformat()})
-    return f"{base}/portal/upload?t={token}"
+    token, expires_at = issue_portal_token(candidate)
+    link = portal_link(token)
+    DocumentRequest.objects.create(
+        candidate=candidate,
+        status=DocumentRequest.Status.PENDING,
+        magic_token=token,
+        link_url=link,
+        expires_at=expires_at,
+    )
+    return link
 
 
 def send_request_documents(
@@ -0,0 +1,103 @@
+"""
+Helpers for the async (ASGI) views. Blocking work they cannot avoid -- writing uploaded
+files to storage, talking to SMTP -- goes to one bounded thread pool, so a slow disk or
+mail server ties up at most ASYNC_IO_WORKERS threads instead of one per request. The
+pool's threads never touch the ORM; async views use the async ORM API for that.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, ParseError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def io_executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.ASYNC_IO_WORKERS, thread_name_prefix="aio")
+        return _pool
+
+
+async def run_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the I/O pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), partial(func, *args, **kwargs))
+
+
+def _log_failure(name: str, fut: Future) -> None:
+    exc = fut.exception()
+    if exc is not None:
+        logger.error("Background job %s failed", name, exc_info=exc)
+
+
+def dispatch(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Fire-and-forget a blocking job on the I/O pool; failures are logged, not raised."""
+    fut = io_executor().submit(func, *args, **kwargs)
+    fut.add_done_callback(partial(_log_failure, getattr(func, "__name__", repr(func))))
+
+
+def drain() -> None:
+    """Wait for every dispatched job to finish; the pool is recreated on next use."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+class AsyncAPIView(View):
+    """
+    Base for the async variants of the API views. DRF's APIView is sync-only, so these
+    are plain Django views that reuse the DRF serializers for validation and answer
+    with the same JSON bodies and status codes (400 for validation errors, 404 for
+    missing objects). CSRF-exempt like APIView.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=e.status_code, safe=False)
+        except APIException as e:
+            return JsonResponse({"detail": e.detail}, status=e.status_code)
+        except Http404:
+            return JsonResponse({"detail": "Not found."}, status=404)
+
+    async def data(self, request) -> Any:
+        """
+        request.data equivalent. The server has already received the body; multipart
+        parsing runs on the I/O pool since the upload handlers may spill to temp files.
+        """
+        if request.content_type == "application/json":
+            try:
+                return json.loads(request.body or b"{}")
+            except ValueError as e:
+                raise ParseError(f"JSON parse error - {e}")
+
+        def parse():
+            data = request.POST.copy()
+            data.update(request.FILES)
+            return data
+
+        return await run_io(parse)
+
@@ -0,0 +1,126 @@
+"""
+Shared helpers for the bench_* management commands: latency summaries, a throwaway
+database + media root, and a dependency-free PDF writer for synthetic resumes.
+"""
+from __future__ import annotations
+
+import contextlib
+import math
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connections
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: Sequence[float], wall_seconds: float) -> Dict[str, float]:
+    """Throughput and latency (ms) summary for one measured stage."""
+    n = len(latencies)
+    return {
+        "count": n,
+        "per_sec": round(n / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / n * 1000, 3) if n else 0.0,
+    }
+
+
+@contextlib.contextmanager
+def scratch_database(*, on_disk: bool = True, options: Optional[Dict] = None) -> Iterator[Path]:
+    """
+    Create a migrated throwaway database and media root for the duration of a benchmark.
+
+    on_disk=True keeps SQLite on a real file so journal/locking behaviour matches
+    production; options, when given, replace the connection OPTIONS (e.g. {} to measure
+    an untuned SQLite). Yields the temporary directory.
+    """
+    tmp = Path(tempfile.mkdtemp(prefix="bench-"))
+    conn = connections["default"]
+    saved_options = dict(conn.settings_dict.get("OPTIONS", {}))
+    saved_test_name = conn.settings_dict["TEST"].get("NAME")
+    saved_media = settings.MEDIA_ROOT
+    if options is not None:
+        conn.settings_dict["OPTIONS"] = options
+    if on_disk and conn.vendor == "sqlite":
+        conn.settings_dict["TEST"]["NAME"] = str(tmp / "bench.sqlite3")
+    settings.MEDIA_ROOT = tmp / "media"
+    old_name = conn.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield tmp
+    finally:
+        connections.close_all()
+        conn.creation.destroy_test_db(old_name, verbosity=0)
+        conn.settings_dict["OPTIONS"] = saved_options
+        conn.settings_dict["TEST"]["NAME"] = saved_test_name
+        settings.MEDIA_ROOT = saved_media
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(
+    pages: List[List[str]], *, columns: int = 1, font_size: int = 10, headings: Collection[str] = ()
+) -> bytes:
+    """
+    Write a minimal, valid PDF with one Helvetica text block per page (or per column);
+    lines listed in headings are set in larger Helvetica-Bold. Good enough for pypdf text
+    extraction; no external dependency.
+    """
+    leading = font_size + 3
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # pages tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    kids: List[int] = []
+    for lines in pages:
+        per_col = max(1, math.ceil(len(lines) / columns))
+        ops: List[str] = []
+        for c in range(columns):
+            chunk = lines[c * per_col:(c + 1) * per_col]
+            if not chunk:
+                continue
+            x = 50 + c * (500 // columns)
+            ops.append(f"BT /F1 {font_size} Tf {leading} TL {x} 780 Td")
+            for ln in chunk:
+                if ln in headings:
+                    ops.append(f"/F2 {font_size + 4} Tf ({_pdf_escape(ln)}) Tj T* /F1 {font_size} Tf")
+                else:
+                    ops.append(f"({_pdf_escape(ln)}) Tj T*")
+            ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
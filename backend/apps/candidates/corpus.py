@@ -0,0 +1,310 @@
+"""
+Synthetic resume corpus for benchmarks: deterministic documents of varying size, page
+count and layout, each carrying the fields a correct parser should find. PDF and DOCX
+are the default mix; the other upload formats (Word 97 .doc, RTF, ODT, HTML, text) are
+written by hand here, without the libraries that read them, so their handlers are
+checked against files they did not produce.
+"""
+from __future__ import annotations
+
+import io
+import random
+import struct
+import zipfile
+from typing import Callable, Collection, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from .benchmarking import render_pdf
+
+FIRST_NAMES = ["Asha", "Rahul", "Priya", "Vikram", "Neha", "Arjun", "Kavya", "Rohan", "Meera", "Sanjay"]
+LAST_NAMES = ["Verma", "Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Menon", "Kapoor", "Das", "Joshi"]
+COMPANIES = ["Acme Analytics", "Zenith Labs", "Northwind Systems", "Bluefin Tech", "Orbit Payments"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Scientist", "Backend Developer", "Tech Lead"]
+SKILLS = ["python", "django", "postgresql", "redis", "docker", "kubernetes", "aws", "react", "celery", "pytorch"]
+SUMMARIES = [
+    "Hands-on developer and mentor focused on reliable backend systems.",
+    "Engineer who likes owning problems end to end, from data models to on-call.",
+]
+SECTION_TITLES = ("Summary", "Experience", "Skills", "Education")
+FILLER = (
+    "Owned the design and rollout of services handling millions of requests per day, "
+    "mentored engineers, improved latency and reliability, and partnered with product teams."
+)
+
+SIZES = {"small": (1, 2), "medium": (3, 8), "large": (8, 30)}  # (roles, filler bullets per role)
+LAYOUTS = ("single", "two-column")
+FORMATS = ("pdf", "docx")
+ALL_FORMATS = FORMATS + ("doc", "rtf", "odt", "html", "txt")
+
+
+class CorpusDoc(NamedTuple):
+    name: str
+    fmt: str
+    layout: str
+    size: str
+    pages: int
+    data: bytes
+    expected: Dict[str, str]
+
+
+def _resume_lines(rng: random.Random, size: str) -> Tuple[List[str], Dict[str, str]]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    title, company = rng.choice(TITLES), rng.choice(COMPANIES)
+    email = f"{first}.{last}{rng.randint(1, 999)}@example.com".lower()
+    phone = f"+91 9{rng.randint(100000000, 999999999)}"
+    skills = rng.sample(SKILLS, k=rng.randint(3, len(SKILLS)))
+    roles, bullets = SIZES[size]
+
+    # Some resumes have no headline under the name (the title is only in Experience), some
+    # open with a summary that mentions roles in passing, and some set the name or the
+    # employers in capitals (which must not be taken for section headings). A headline
+    # is the current title even when the latest role says something else.
+    name = f"{first} {last}"
+    if rng.random() < 0.2:
+        name = name.upper()
+    lines = [name]
+    headline = rng.random() < 0.7
+    if headline:
+        lines.append(title)
+    lines += [f"{email} | {phone}", ""]
+    if rng.random() < 0.5:
+        lines += ["Summary", rng.choice(SUMMARIES), ""]
+    lines.append("Experience")
+    employer_lines = rng.random() < 0.25  # "ACME ANALYTICS" / title / dates, not "title at company"
+    if employer_lines:
+        company = company.upper()
+    for r in range(roles):
+        role_title = title if r == 0 and not headline else rng.choice(TITLES)
+        role_company = company if r == 0 else rng.choice(COMPANIES)
+        if employer_lines:
+            lines += [role_company.upper(), role_title, f"{2023 - 2 * r - 2} - {2023 - 2 * r}"]
+        else:
+            lines.append(f"{role_title} at {role_company}")
+        lines.extend(f"- {FILLER}"[: rng.randint(60, 120)] for _ in range(bullets))
+    lines += ["", "Skills", ", ".join(skills), "", "Education", "B.Tech Computer Science"]
+    expected = {
+        "name": name,
+        "email": email,
+        "phone": phone.replace(" ", ""),
+        "company": company,
+        "designation": title,
+    }
+    return lines, expected
+
+
+def _paginate(lines: List[str], pages: int) -> List[List[str]]:
+    per = max(1, -(-len(lines) // pages))
+    return [lines[i:i + per] for i in range(0, len(lines), per)] or [[]]
+
+
+def render_docx(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    from docx import Document as DocxDocument
+    from docx.enum.text import WD_BREAK
+    from docx.oxml.ns import qn
+
+    doc = DocxDocument()
+    if columns > 1:
+        sect_pr = doc.sections[0]._sectPr
+        cols = sect_pr.find(qn("w:cols"))
+        if cols is None:
+            cols = sect_pr.makeelement(qn("w:cols"), {})
+            sect_pr.append(cols)
+        cols.set(qn("w:num"), str(columns))
+    for i, page in enumerate(pages):
+        for ln in page:
+            if ln in headings:
+                doc.add_heading(ln, level=2)
+            else:
+                doc.add_paragraph(ln)
+        if i < len(pages) - 1:
+            doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def render_rtf(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    """RTF with a font and colour table, headings in bold, the email as a HYPERLINK field."""
+    def esc(ln: str) -> str:
+        out = ln.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
+        return "".join(ch if ord(ch) < 128 else f"\\u{ord(ch) if ord(ch) < 32768 else ord(ch) - 65536}?" for ch in out)
+
+    body = []
+    for i, page in enumerate(pages):
+        for ln in page:
+            if ln in headings:
+                body.append(f"{{\\b\\fs28 {esc(ln)}}}\\par")
+            elif "@" in ln and " | " in ln:
+                email, rest = ln.split(" | ", 1)
+                body.append(
+                    f'{{\\field{{\\*\\fldinst HYPERLINK "mailto:{esc(email)}"}}{{\\fldrslt {esc(email)}}}}}'
+                    f" | {esc(rest)}\\par"
+                )
+            else:
+                body.append(f"{esc(ln)}\\par")
+        if i < len(pages) - 1:
+            body.append("\\page")
+    head = (
+        "{\\rtf1\\ansi\\ansicpg1252\\deff0{\\fonttbl{\\f0 Arial;}{\\f1 Arial Black;}}"
+        "{\\colortbl;\\red0\\green0\\blue0;}{\\*\\generator bench;}{\\info{\\author Bench}}\\f0\\fs20\n"
+    )
+    return (head + "\n".join(body) + "}").encode("ascii")
+
+
+def render_odt(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    """A minimal ODF text document: a mimetype member, content.xml with text:h headings."""
+    ns = (
+        'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    )
+    body = []
+    for i, page in enumerate(pages):
+        if i:
+            body.append("<text:soft-page-break/>")
+        for ln in page:
+            tag = '<text:h text:outline-level="2">{}</text:h>' if ln in headings else "<text:p>{}</text:p>"
+            body.append(tag.format(escape(ln).replace(" | ", "<text:tab/>")))
+    content = (
+        f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {ns}><office:body><office:text>'
+        + "".join(body) + "</office:text></office:body></office:document-content>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(zipfile.ZipInfo("mimetype"), "application/vnd.oasis.opendocument.text")
+        z.writestr("content.xml", content)
+    return out.getvalue()
+
+
+def render_html(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    body = []
+    for page in pages:
+        body.append("<section>")
+        body += [f"<h2>{escape(ln)}</h2>" if ln in headings else f"<p>{escape(ln)}</p>" for ln in page]
+        body.append("</section>")
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Resume</title>'
+        "<style>h2 { font-size: 14pt }</style><script>var p = '<p>not text</p>';</script></head><body>\n"
+        + "\n".join(body) + "\n</body></html>"
+    ).encode("utf-8")
+
+
+def render_txt(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    return "\f\r\n".join("\r\n".join(page) for page in pages).encode("utf-8")
+
+
+def render_doc(pages: List[List[str]], *, columns: int = 1, headings: Collection[str] = ()) -> bytes:
+    """
+    A Word 97-2003 file: the text in two pieces, cp1252 then UTF-16, listed in the piece
+    table of a 1Table stream, the email wrapped in a HYPERLINK field, inside an OLE2
+    (CFB v3) container.
+    """
+    paragraphs = []
+    for page in pages:
+        for ln in page:
+            if "@" in ln and " | " in ln:
+                email, rest = ln.split(" | ", 1)
+                ln = f'\x13 HYPERLINK "mailto:{email}" \x14{email}\x15 | {rest}'
+            paragraphs.append(ln)
+        paragraphs[-1] += "\x0c"
+    text = "\r".join(paragraphs) + "\r"
+    split = len(text) // 2
+    # Word stores a piece as cp1252 only when every character in it has a byte there
+    pieces = [(text[:split], _fits_cp1252(text[:split])), (text[split:], False)]
+
+    word = bytearray(0x800)
+    struct.pack_into("<HHH", word, 0, 0xA5EC, 0x00C1, 0)
+    struct.pack_into("<H", word, 0x0A, 0x0200)  # fWhichTblStm: 1Table
+    pos = 0x20
+    struct.pack_into("<H", word, pos, 14)  # csw, then FibRgW97
+    pos += 2 + 14 * 2
+    struct.pack_into("<H", word, pos, 22)  # cslw, then FibRgLw97
+    pos += 2 + 22 * 4
+    struct.pack_into("<H", word, pos, 93)  # cbRgFcLcb: FibRgFcLcb97
+    fclcb = pos + 2
+    cps, pcds = [0], []
+    for chunk, compressed in pieces:
+        start = len(word)
+        word += chunk.encode("cp1252") if compressed else chunk.encode("utf-16-le")
+        pcds.append(struct.pack("<HIH", 0, (start * 2) | 0x40000000 if compressed else start, 0))
+        cps.append(cps[-1] + len(chunk))
+    plc = struct.pack(f"<{len(cps)}I", *cps) + b"".join(pcds)
+    clx = b"\x01" + struct.pack("<H", 2) + b"\x00\x00" + b"\x02" + struct.pack("<I", len(plc)) + plc
+    struct.pack_into("<II", word, fclcb + 33 * 8, 0, len(clx))  # fcClx, lcbClx
+    return _cfb([("WordDocument", bytes(word)), ("1Table", clx)])
+
+
+def _fits_cp1252(text: str) -> bool:
+    try:
+        text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _cfb(streams: List[Tuple[str, bytes]]) -> bytes:
+    """An OLE2 compound file holding streams (each padded past the 4096-byte mini-stream cutoff)."""
+    sector = 512
+    free, end, fat_mark = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+    blobs = [data.ljust(max(4096, -(-len(data) // sector) * sector), b"\0") for _, data in streams]
+    data_sectors = sum(len(b) // sector for b in blobs) + 1  # + the directory
+    fat_sectors = 1
+    while fat_sectors * 128 < fat_sectors + data_sectors:
+        fat_sectors += 1
+    if fat_sectors > 109:
+        raise ValueError("document too large for a header-only DIFAT")
+    fat = [fat_mark] * fat_sectors + [end]  # FAT sectors, then the directory
+    starts = []
+    for b in blobs:
+        n = len(b) // sector
+        starts.append(len(fat))
+        fat += list(range(len(fat) + 1, len(fat) + n)) + [end]
+    fat += [free] * (fat_sectors * 128 - len(fat))
+
+    def entry(name: str, kind: int, child: int = free, right: int = free, start: int = end, size: int = 0) -> bytes:
+        e = bytearray(128)
+        encoded = (name + "\0").encode("utf-16-le")
+        e[:len(encoded)] = encoded
+        struct.pack_into("<HBBIII", e, 64, len(encoded), kind, 1, free, right, child)
+        struct.pack_into("<IQ", e, 116, start, size)
+        return bytes(e)
+
+    directory = entry("Root Entry", 5, child=1)
+    for i, ((name, _), start, b) in enumerate(zip(streams, starts, blobs)):
+        directory += entry(name, 2, right=i + 2 if i + 1 < len(streams) else free, start=start, size=len(b))
+    directory = directory.ljust(sector, b"\0")
+
+    header = bytearray(sector)
+    header[:8] = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    struct.pack_into("<HHHHH", header, 24, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<IIIIIIIII", header, 40, 0, fat_sectors, fat_sectors, 0, 4096, end, 0, end, 0)
+    struct.pack_into("<109I", header, 76, *(list(range(fat_sectors)) + [free] * (109 - fat_sectors)))
+    return bytes(header) + struct.pack(f"<{len(fat)}I", *fat) + directory + b"".join(blobs)
+
+
+RENDERERS: Dict[str, Callable[..., bytes]] = {
+    "pdf": render_pdf, "docx": render_docx, "doc": render_doc, "rtf": render_rtf,
+    "odt": render_odt, "html": render_html, "txt": render_txt,
+}
+
+
+def generate_corpus(
+    n: int,
+    *,
+    seed: int = 0,
+    formats: Sequence[str] = FORMATS,
+    sizes: Sequence[str] = tuple(SIZES),
+    layouts: Sequence[str] = LAYOUTS,
+    max_pages: int = 4,
+) -> Iterator[CorpusDoc]:
+    """Yield n documents cycling through formats x sizes x layouts; same seed, same corpus."""
+    rng = random.Random(seed)
+    for i in range(n):
+        fmt = formats[i % len(formats)]
+        size = sizes[(i // len(formats)) % len(sizes)]
+        layout = layouts[(i // (len(formats) * len(sizes))) % len(layouts)]
+        lines, expected = _resume_lines(rng, size)
+        # at most ~60 lines per page, so large resumes also run to more pages
+        pages = _paginate(lines, max(rng.randint(1, max_pages), -(-len(lines) // 60)))
+        columns = 2 if layout == "two-column" else 1
+        data = RENDERERS[fmt](pages, columns=columns, headings=SECTION_TITLES)
+        yield CorpusDoc(f"resume-{i:05d}.{fmt}", fmt, layout, size, len(pages), data, expected)
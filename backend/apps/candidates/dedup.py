@@ -0,0 +1,445 @@
+"""
+Duplicate-candidate detection.
+
+Every parsed candidate gets a handful of blocking keys in DedupKey: normalized email,
+E.164 phone, name+company, and MinHash LSH band keys over the resume text. Only
+candidates that share a key are ever compared, so neither the per-upload check nor the
+nightly batch (`manage.py dedupe_candidates`) does pairwise comparison:
+
+* email / phone matches are duplicates outright (unless the key is shared by so many
+  candidates that it is clearly generic, e.g. an agency inbox);
+* name+company and MinHash band matches are confirmed by the estimated Jaccard
+  similarity of the two resumes' MinHash signatures.
+
+Duplicates point at the oldest record via Candidate.duplicate_of ("link"); with
+DEDUP_MODE=merge their resumes, extractions and documents are also moved onto it.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from . import metrics
+from .models import Candidate, CandidateFingerprint, DedupKey, ExtractionText, decompress_text
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 4 rows per band: pairs above ~0.5 similarity usually share a band
+SHINGLE_WORDS = 5
+MAX_SHINGLES = 5000
+
+NEAR_DUPLICATE_SIMILARITY = 0.8  # MinHash band match alone
+NAME_COMPANY_SIMILARITY = 0.5  # same name and company, resumes moderately alike
+MAX_BUCKET = 50  # keys shared by more candidates than this are too generic to block on
+
+STRONG_KINDS = (DedupKey.Kind.EMAIL, DedupKey.Kind.PHONE)
+VERIFIED_KINDS = {
+    DedupKey.Kind.NAME_COMPANY: NAME_COMPANY_SIMILARITY,
+    DedupKey.Kind.MINHASH: NEAR_DUPLICATE_SIMILARITY,
+}
+
+_rng = random.Random(0x5EED)  # fixed, so signatures stay comparable across processes and releases
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+
+_COMPANY_SUFFIX_RE = re.compile(
+    r"\b(?:pvt|private|ltd|limited|inc|llc|llp|corp|corporation|co|gmbh|plc)\b\.?"
+)
+
+DEDUP_LINKS_TOTAL = metrics.REGISTRY.counter(
+    "candidate_dedup_links_total", "Candidates linked to an existing record, by matching key.", ["kind"]
+)
+
+
+# --- normalization -------------------------------------------------------------------
+
+def normalize_email(value: str) -> str:
+    value = (value or "").strip().lower()
+    if "@" not in value:
+        return ""
+    user, domain = value.rsplit("@", 1)
+    user = user.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        user, domain = user.replace(".", ""), "gmail.com"
+    return f"{user}@{domain}" if user else ""
+
+
+def normalize_phone(value: str, region: str = "IN") -> str:
+    value = (value or "").strip()
+    if not value:
+        return ""
+    import phonenumbers
+
+    try:
+        number = phonenumbers.parse(value, region)
+    except phonenumbers.NumberParseException:
+        return ""
+    if not phonenumbers.is_possible_number(number):
+        return ""
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_name_company(name: str, company: str) -> str:
+    name_tokens = sorted(re.findall(r"[a-z]+", (name or "").casefold()))
+    company_norm = " ".join(re.findall(r"[a-z0-9&]+", _COMPANY_SUFFIX_RE.sub(" ", (company or "").casefold())))
+    if len(name_tokens) < 2 or not company_norm:
+        return ""
+    return f"{' '.join(name_tokens)}|{company_norm}"[:255]
+
+
+# --- MinHash -------------------------------------------------------------------------
+
+def shingles(text: str) -> Set[int]:
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    out: Set[int] = set()
+    for i in range(max(0, len(words) - SHINGLE_WORDS + 1)):
+        digest = hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode(), digest_size=8).digest()
+        out.add(int.from_bytes(digest, "big"))
+        if len(out) >= MAX_SHINGLES:
+            break
+    return out
+
+
+def minhash(shingle_set: Set[int]) -> List[int]:
+    """NUM_PERM minimums of the shingle hashes under XOR-masked permutations."""
+    if not shingle_set:
+        return []
+    return [min(map(mask.__xor__, shingle_set)) for mask in _MASKS]
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return array("Q", signature).tobytes()
+
+
+def unpack_signature(data: bytes) -> List[int]:
+    sig = array("Q")
+    sig.frombytes(bytes(data or b""))
+    return list(sig)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def band_keys(signature: Sequence[int]) -> List[str]:
+    keys = []
+    for band in range(BANDS if signature else 0):
+        rows = pack_signature(signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(f"{band}:{hashlib.blake2b(rows, digest_size=8).hexdigest()}")
+    return keys
+
+
+# --- indexing ------------------------------------------------------------------------
+
+def candidate_keys(candidate: Candidate, signature: Sequence[int]) -> List[Tuple[str, str]]:
+    keys: List[Tuple[str, str]] = []
+    email = normalize_email(candidate.primary_email)
+    if email:
+        keys.append((DedupKey.Kind.EMAIL, email))
+    phone = normalize_phone(candidate.primary_phone)
+    if phone:
+        keys.append((DedupKey.Kind.PHONE, phone))
+    name_company = normalize_name_company(candidate.name, candidate.latest_company)
+    if name_company:
+        keys.append((DedupKey.Kind.NAME_COMPANY, name_company))
+    keys.extend((DedupKey.Kind.MINHASH, k) for k in band_keys(signature))
+    return keys
+
+
+def fingerprint(text: str) -> Tuple[List[int], int]:
+    shingle_set = shingles(text)
+    return minhash(shingle_set), len(shingle_set)
+
+
+def index_candidates(rows: Iterable[Tuple[Candidate, str]]) -> None:
+    """Replace the blocking keys and fingerprints of (candidate, resume text) pairs in bulk."""
+    keys: List[DedupKey] = []
+    prints: List[CandidateFingerprint] = []
+    ids: List[int] = []
+    for candidate, text in rows:
+        signature, count = fingerprint(text)
+        ids.append(candidate.id)
+        prints.append(CandidateFingerprint(candidate_id=candidate.id, minhash=pack_signature(signature), shingles=count))
+        keys.extend(DedupKey(candidate_id=candidate.id, kind=k, value=v) for k, v in candidate_keys(candidate, signature))
+    with transaction.atomic():
+        DedupKey.objects.filter(candidate_id__in=ids).delete()
+        CandidateFingerprint.objects.filter(candidate_id__in=ids).delete()
+        DedupKey.objects.bulk_create(keys, batch_size=1000)
+        CandidateFingerprint.objects.bulk_create(prints, batch_size=1000)
+
+
+# --- linking -------------------------------------------------------------------------
+
+def _signatures(ids: Iterable[int]) -> Dict[int, List[int]]:
+    return {
+        cid: unpack_signature(data)
+        for cid, data in CandidateFingerprint.objects.filter(candidate_id__in=list(ids)).values_list(
+            "candidate_id", "minhash"
+        )
+    }
+
+
+def unindexed_candidates(chunk_size: int = 1000) -> Iterator[List[Tuple[Candidate, str]]]:
+    """Parsed candidates without a fingerprint, with their latest stored resume text, in chunks."""
+    qs = Candidate.objects.filter(
+        fingerprint__isnull=True, extraction_status=Candidate.ExtractionStatus.PARSED
+    ).order_by("id")
+    chunk: List[Candidate] = []
+
+    def with_text(cands: List[Candidate]) -> List[Tuple[Candidate, str]]:
+        texts: Dict[int, str] = {}
+        rows = (
+            ExtractionText.objects.filter(extraction__candidate_id__in=[c.id for c in cands])
+            .order_by("extraction__candidate_id", "-extraction__created_at")
+            .values_list("extraction__candidate_id", "codec", "data")
+        )
+        for cid, codec, data in rows:
+            if cid not in texts:
+                texts[cid] = decompress_text(codec, data)
+        return [(c, texts.get(c.id, "")) for c in cands]
+
+    for cand in qs.iterator(chunk_size=chunk_size):
+        chunk.append(cand)
+        if len(chunk) >= chunk_size:
+            yield with_text(chunk)
+            chunk = []
+    if chunk:
+        yield with_text(chunk)
+
+
+def _root(candidate_id: int) -> int:
+    seen = set()
+    while candidate_id not in seen:
+        seen.add(candidate_id)
+        parent = Candidate.objects.filter(id=candidate_id).values_list("duplicate_of_id", flat=True).first()
+        if parent is None:
+            break
+        candidate_id = parent
+    return candidate_id
+
+
+def _any_key(keys: Iterable[Tuple[str, str]]) -> Q:
+    q = Q()
+    for kind, value in keys:
+        q |= Q(kind=kind, value=value)
+    return q
+
+
+def find_match(candidate: Candidate) -> Optional[Tuple[int, str]]:
+    """(id of an existing candidate that is the same person, matching key kind), or None."""
+    keys = list(candidate.dedup_keys.values_list("kind", "value"))
+    if not keys:
+        return None
+    others = DedupKey.objects.exclude(candidate_id=candidate.id)
+    # size every bucket first so a generic key is dropped whole, never fetched in part
+    shared = []
+    for row in others.filter(_any_key(keys)).values("kind", "value").annotate(n=Count("id")):
+        if row["n"] < MAX_BUCKET:
+            shared.append((row["kind"], row["value"]))
+    if not shared:
+        return None
+    hits: Dict[Tuple[str, str], List[int]] = {}
+    for cid, kind, value in others.filter(_any_key(shared)).values_list("candidate_id", "kind", "value"):
+        hits.setdefault((kind, value), []).append(cid)
+
+    for kind in STRONG_KINDS:
+        matched = sorted(cid for (k, _), ids in hits.items() if k == kind for cid in ids)
+        if matched:
+            return matched[0], kind
+    to_check = {(cid, k) for (k, _), ids in hits.items() if k in VERIFIED_KINDS for cid in ids}
+    if not to_check:
+        return None
+    sigs = _signatures({candidate.id} | {cid for cid, _ in to_check})
+    mine = sigs.get(candidate.id, [])
+    for cid, kind in sorted(to_check):
+        if similarity(mine, sigs.get(cid, [])) >= VERIFIED_KINDS[kind]:
+            return cid, kind
+    return None
+
+
+def merge_into(duplicate: Candidate, canonical: Candidate) -> None:
+    """Move the duplicate's resumes, extractions and documents onto canonical and fill its blanks."""
+    from apps.documents.models import Document, DocumentRequest, DocumentSubmission
+
+    from .models import Extraction, Resume
+
+    for model in (Resume, Extraction, Document, DocumentRequest, DocumentSubmission):
+        model.objects.filter(candidate_id=duplicate.id).update(candidate_id=canonical.id)
+    filled = []
+    for column in ("name", "primary_email", "primary_phone", "latest_company", "designation"):
+        if not getattr(canonical, column) and getattr(duplicate, column):
+            setattr(canonical, column, getattr(duplicate, column))
+            filled.append(column)
+    if filled:
+        canonical.save(update_fields=filled + ["updated_at"])
+
+
+def link_candidate(candidate: Candidate, text: str) -> Optional[int]:
+    """
+    Index a freshly parsed candidate and, if an existing record is the same person, link
+    (or merge) the newer of the two into the older. Returns the canonical id on a match.
+    """
+    index_candidates([(candidate, text)])
+    match = find_match(candidate)
+    if match is None:
+        return None
+    other, kind = match
+    root = _root(other)
+    if root == candidate.id:
+        return None
+    canonical_id, duplicate_id = min(root, candidate.id), max(root, candidate.id)
+    with transaction.atomic():
+        # re-point the newer cluster (its root and everything linked to it) at the older root
+        Candidate.objects.filter(Q(id=duplicate_id) | Q(duplicate_of_id=duplicate_id)).update(
+            duplicate_of_id=canonical_id
+        )
+        if getattr(settings, "DEDUP_MODE", "link") == "merge":
+            merge_into(Candidate.objects.get(id=duplicate_id), Candidate.objects.get(id=canonical_id))
+    DEDUP_LINKS_TOTAL.inc(kind=kind)
+    if candidate.id == duplicate_id:
+        candidate.duplicate_of_id = canonical_id
+    return canonical_id
+
+
+# --- batch ---------------------------------------------------------------------------
+
+class UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:  # path compression
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        # the smaller (older) id stays the root
+        if rb < ra:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.parent.setdefault(ra, ra)
+        return True
+
+    def clusters(self) -> Dict[int, List[int]]:
+        out: Dict[int, List[int]] = {}
+        for x in list(self.parent):
+            out.setdefault(self.find(x), []).append(x)
+        return out
+
+
+def _buckets(kinds: Sequence[str], chunk_size: int) -> Iterator[Tuple[str, List[int]]]:
+    """Stream (kind, candidate ids) for each key shared by 2..MAX_BUCKET candidates, via the (kind, value) index."""
+    rows = (
+        DedupKey.objects.filter(kind__in=kinds)
+        .order_by("kind", "value")
+        .values_list("kind", "value", "candidate_id")
+        .iterator(chunk_size=chunk_size)
+    )
+    current: Optional[Tuple[str, str]] = None
+    ids: List[int] = []
+    for kind, value, cid in rows:
+        if (kind, value) != current:
+            if 1 < len(ids) <= MAX_BUCKET:
+                yield current[0], ids
+            current, ids = (kind, value), []
+        ids.append(cid)
+    if current and 1 < len(ids) <= MAX_BUCKET:
+        yield current[0], ids
+
+
+def find_clusters(
+    *, chunk_size: int = 10000, progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Tuple[UnionFind, Dict[str, int]]:
+    """
+    Cluster all indexed candidates: union on shared email/phone keys, then verify
+    name+company and MinHash buckets by signature similarity, loading signatures a
+    batch of buckets at a time.
+    """
+    uf = UnionFind()
+    stats = {"strong_buckets": 0, "verified_buckets": 0, "pairs_checked": 0, "links": 0}
+    for _, ids in _buckets(STRONG_KINDS, chunk_size):
+        stats["strong_buckets"] += 1
+        for cid in ids[1:]:
+            stats["links"] += uf.union(ids[0], cid)
+    if progress:
+        progress(stats)
+
+    pending: List[Tuple[str, List[int]]] = []
+    pending_ids: Set[int] = set()
+
+    def verify() -> None:
+        sigs = _signatures(pending_ids)
+        for kind, ids in pending:
+            threshold = VERIFIED_KINDS[kind]
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    if uf.find(a) == uf.find(b):
+                        continue
+                    stats["pairs_checked"] += 1
+                    if similarity(sigs.get(a, []), sigs.get(b, [])) >= threshold:
+                        stats["links"] += uf.union(a, b)
+        pending.clear()
+        pending_ids.clear()
+        if progress:
+            progress(stats)
+
+    for kind, ids in _buckets(tuple(VERIFIED_KINDS), chunk_size):
+        stats["verified_buckets"] += 1
+        pending.append((kind, ids))
+        pending_ids.update(ids)
+        if len(pending_ids) >= chunk_size:
+            verify()
+    if pending:
+        verify()
+    return uf, stats
+
+
+def apply_clusters(uf: UnionFind, *, dry_run: bool = False, chunk_size: int = 1000) -> int:
+    """Point every non-root cluster member at its root; return how many rows changed."""
+    desired: Dict[int, Optional[int]] = {}
+    for root, members in uf.clusters().items():
+        desired[root] = None
+        for m in members:
+            if m != root:
+                desired[m] = root
+    ids = sorted(desired)
+    changed = 0
+    merge = getattr(settings, "DEDUP_MODE", "link") == "merge"
+    for i in range(0, len(ids), chunk_size):
+        batch = Candidate.objects.in_bulk(ids[i:i + chunk_size])
+        updates = []
+        for cid, cand in batch.items():
+            target = desired[cid]
+            # roots keep any manual link they already have; members move to their root
+            if target is not None and cand.duplicate_of_id != target:
+                cand.duplicate_of_id = target
+                updates.append(cand)
+        changed += len(updates)
+        if dry_run or not updates:
+            continue
+        with transaction.atomic():
+            Candidate.objects.bulk_update(updates, ["duplicate_of"], batch_size=chunk_size)
+            if merge:
+                roots = Candidate.objects.in_bulk({c.duplicate_of_id for c in updates})
+                for cand in updates:
+                    merge_into(cand, roots[cand.duplicate_of_id])
+    return changed
@@ -0,0 +1,198 @@
+"""
+Bulk export of candidates with their latest extraction, as CSV, JSONL or Parquet. Rows
+are read with a chunked iterator() (a server-side cursor on PostgreSQL) and each format
+writer turns one chunk into bytes before the next is fetched, so memory stays flat
+however many rows are exported. Served by GET /api/candidates/export and
+`manage.py export_candidates`.
+
+Email and phone are masked like the list API unless the caller asks otherwise.
+"""
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.db.models import OuterRef, QuerySet, Subquery
+
+from . import skill_index
+from .metrics import REGISTRY
+from .models import Candidate, Extraction, mask_email, mask_phone
+
+COLUMNS = [
+    "id", "name", "email", "phone", "latest_company", "designation", "extraction_status",
+    "duplicate_of", "skills", "model_name", "extracted_at", "created_at", "updated_at",
+]
+FORMATS = ("csv", "jsonl", "parquet")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_ROWS_TOTAL = REGISTRY.counter("candidate_export_rows_total", "Candidate rows exported, by format.", ["format"])
+
+
+class ExportError(Exception):
+    pass
+
+
+def available_formats() -> List[str]:
+    """FORMATS minus parquet when pyarrow is not installed (checked without importing it)."""
+    return [f for f in FORMATS if f != "parquet" or importlib.util.find_spec("pyarrow") is not None]
+
+
+def export_queryset(status: Optional[str] = None) -> QuerySet:
+    latest = Extraction.objects.filter(candidate_id=OuterRef("pk")).order_by("-created_at").values("id")[:1]
+    qs = Candidate.objects.order_by("id")
+    if status:
+        qs = qs.filter(extraction_status=status)
+    return qs.annotate(latest_extraction_id=Subquery(latest)).values(
+        "id", "name", "primary_email", "primary_phone", "latest_company", "designation",
+        "extraction_status", "duplicate_of_id", "created_at", "updated_at", "latest_extraction_id",
+    )
+
+
+def _chunks(qs: QuerySet, size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in qs.iterator(chunk_size=size):
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_row_chunks(
+    *, status: Optional[str] = None, masked: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """Export rows (dicts keyed by COLUMNS), chunk_size at a time; two extra queries per chunk."""
+    for chunk in _chunks(export_queryset(status), chunk_size):
+        ids = [r["latest_extraction_id"] for r in chunk if r["latest_extraction_id"]]
+        extractions = {
+            e["id"]: e for e in Extraction.objects.filter(id__in=ids).values("id", "model_name", "completed_at")
+        }
+        skills = skill_index.skills_of(r["id"] for r in chunk)
+        rows = []
+        for r in chunk:
+            ex = extractions.get(r["latest_extraction_id"]) or {}
+            email, phone = r["primary_email"], r["primary_phone"]
+            rows.append({
+                "id": r["id"],
+                "name": r["name"],
+                "email": mask_email(email) if masked else email,
+                "phone": mask_phone(phone) if masked else phone,
+                "latest_company": r["latest_company"],
+                "designation": r["designation"],
+                "extraction_status": r["extraction_status"],
+                "duplicate_of": r["duplicate_of_id"],
+                "skills": skills.get(r["id"], []),
+                "model_name": ex.get("model_name") or "",
+                "extracted_at": ex.get("completed_at"),
+                "created_at": r["created_at"],
+                "updated_at": r["updated_at"],
+            })
+        yield rows
+
+
+def _iso(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+def _csv(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        for r in rows:
+            writer.writerow([
+                r["id"], r["name"], r["email"], r["phone"], r["latest_company"], r["designation"],
+                r["extraction_status"], r["duplicate_of"] or "", ";".join(r["skills"]), r["model_name"],
+                _iso(r["extracted_at"]), _iso(r["created_at"]), _iso(r["updated_at"]),
+            ])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+        EXPORT_ROWS_TOTAL.inc(len(rows), format="csv")
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def _jsonl(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    for rows in chunks:
+        lines = []
+        for r in rows:
+            r = {**r, **{k: _iso(r[k]) or None for k in ("extracted_at", "created_at", "updated_at")}}
+            lines.append(json.dumps(r, ensure_ascii=False, separators=(",", ":")))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+        EXPORT_ROWS_TOTAL.inc(len(rows), format="jsonl")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain()."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def _parquet(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    ts = pa.timestamp("us", tz="UTC")
+    schema = pa.schema([
+        ("id", pa.int64()), ("name", pa.string()), ("email", pa.string()), ("phone", pa.string()),
+        ("latest_company", pa.string()), ("designation", pa.string()), ("extraction_status", pa.string()),
+        ("duplicate_of", pa.int64()), ("skills", pa.list_(pa.string())), ("model_name", pa.string()),
+        ("extracted_at", ts), ("created_at", ts), ("updated_at", ts),
+    ])
+    sink = _Sink()
+    # one row group per chunk: each is encoded and sent before the next chunk is read
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+            EXPORT_ROWS_TOTAL.inc(len(rows), format="parquet")
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {"csv": _csv, "jsonl": _jsonl, "parquet": _parquet}
+
+
+def stream_export(
+    fmt: str, *, status: Optional[str] = None, masked: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Encoded export in fmt, produced chunk by chunk."""
+    if fmt not in WRITERS:
+        raise ExportError(f"Unknown export format {fmt!r}; choose from {', '.join(FORMATS)}")
+    if fmt not in available_formats():
+        raise ExportError(f"{fmt} export needs pyarrow (pip install pyarrow)")
+    return WRITERS[fmt](iter_row_chunks(status=status, masked=masked, chunk_size=chunk_size))
@@ -0,0 +1,36 @@
+"""
+Field-level resume extractors.
+
+Each field (name, email, phone, ...) is a separate extractor registered by dotted path,
+so its module -- and any heavy dependency it declares -- is only imported the first time
+that field is requested. Profiles (settings.RESUME_EXTRACTOR_PROFILES) pick which fields
+run, e.g. a "bulk" profile without phone matching for large imports. Extractors read the
+section of the resume they care about through ResumeText.sections (see sections.py).
+"""
+from __future__ import annotations
+
+from .registry import (
+    ExtractorSpec,
+    available_fields,
+    fields_for_profile,
+    get_extractor,
+    register,
+    run_extractors,
+)
+from .result import ExtractionResult, skill_names
+from .sections import Section, SectionIndex
+from .text import ResumeText
+
+__all__ = [
+    "ExtractionResult",
+    "ExtractorSpec",
+    "ResumeText",
+    "Section",
+    "SectionIndex",
+    "available_fields",
+    "fields_for_profile",
+    "get_extractor",
+    "register",
+    "run_extractors",
+    "skill_names",
+]
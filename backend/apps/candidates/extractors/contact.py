@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+from .sections import CONTACT
+from .text import ResumeText
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+
+def extract_name(doc: ResumeText) -> Optional[Tuple[str, float]]:
+    # First non-empty line with 2-5 words, mostly alphabetic, preferably in the header block.
+    for ln in (doc.section_lines(CONTACT) or doc.lines)[:10]:
+        words = [w for w in re.split(r"\s+", ln) if w]
+        if 2 <= len(words) <= 5 and sum(ch.isalpha() for ch in ln) / max(1, len(ln)) > 0.7:
+            return ln, 0.6
+    return None
+
+
+def extract_email(doc: ResumeText) -> Optional[Tuple[str, float]]:
+    m = EMAIL_RE.search(doc.text)
+    return (m.group(0), 0.95) if m else None
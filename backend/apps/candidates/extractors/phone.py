@@ -0,0 +1,104 @@
+"""
+Phone extraction. A compiled regex finds digit runs that could be phone numbers and only
+those short windows are handed to phonenumbers for validation, instead of running
+PhoneNumberMatcher over the whole resume.
+
+"phone" is the first valid number in reading order and stops at it; "phones" collects
+every number and ranks them, which costs a full pass. Both are memoised on the ResumeText.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import phonenumbers
+
+from .text import ResumeText
+
+DEFAULT_REGION = "IN"
+
+# "+", "(" or a digit, then digits mixed with the separators people put in phone numbers,
+# on a single line; bounded so a table of figures cannot produce one giant run. The left
+# boundary is a lookbehind *after* the first character so the engine skips ahead cheaply.
+CANDIDATE_RE = re.compile(r"[+(\d](?<![\w+].)[\d \t().\-]{5,22}\d(?!\w)")
+MIN_DIGITS = 7
+
+# crude 10-digit fallback when validation finds nothing
+INDIAN_MOBILE_RE = re.compile(r"(?:\+91[-\s]?)?\b[6-9]\d{9}\b")
+
+
+class PhoneMatch(NamedTuple):
+    number: str  # E.164
+    start: int  # offset in the resume text
+    region: str  # ISO country code, "" if unknown
+    confidence: float
+
+
+def _rank_key(m: PhoneMatch) -> Tuple[int, int]:
+    # Home-region numbers first, then in reading order.
+    return (0 if m.region == DEFAULT_REGION else 1, m.start)
+
+
+def _validate(window: str, region: str) -> List[Tuple[int, phonenumbers.PhoneNumber]]:
+    """Valid numbers in one candidate run: a direct parse first, PhoneNumberMatcher if the run holds several."""
+    try:
+        number = phonenumbers.parse(window, region)
+        if phonenumbers.is_valid_number(number):
+            return [(0, number)]
+    except phonenumbers.NumberParseException:
+        pass
+    try:
+        return [(m.start, m.number) for m in phonenumbers.PhoneNumberMatcher(window, region)]
+    except Exception:
+        return []
+
+
+def _matches(text: str, region: str) -> Iterator[PhoneMatch]:
+    """Valid numbers in reading order, repeats included; the crude fallback is left to callers."""
+    for cand in CANDIDATE_RE.finditer(text):
+        start = cand.start()
+        window = cand.group(0)
+        if sum(ch.isdigit() for ch in window) < MIN_DIGITS:
+            continue
+        for offset, number in _validate(window, region):
+            num = phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+            if num:
+                where = phonenumbers.region_code_for_number(number) or ""
+                yield PhoneMatch(num, start + offset, where, 0.9 if where == region else 0.75)
+
+
+def _fallback(text: str) -> Iterator[PhoneMatch]:
+    for m in INDIAN_MOBILE_RE.finditer(text):
+        d = m.group(0).replace(" ", "").replace("-", "")
+        if not d.startswith("+"):
+            d = "+91" + d[-10:]
+        yield PhoneMatch(d, m.start(), "IN", 0.9)
+
+
+def first_phone_number(text: str, region: str = DEFAULT_REGION) -> Optional[PhoneMatch]:
+    """The first valid number in reading order, as PhoneNumberMatcher's first hit would be."""
+    return next(_matches(text, region), None) or next(_fallback(text), None)
+
+
+def find_phone_numbers(text: str, region: str = DEFAULT_REGION) -> Tuple[PhoneMatch, ...]:
+    """All distinct valid numbers in text, ranked by region (home first) then position."""
+    found: Dict[str, PhoneMatch] = {}
+    for m in _matches(text, region):
+        found.setdefault(m.number, m)
+    if not found:
+        for m in _fallback(text):
+            found.setdefault(m.number, m)
+    return tuple(sorted(found.values(), key=_rank_key))
+
+
+def extract_phone(doc: ResumeText) -> Optional[Tuple[str, float]]:
+    phone = doc.derived("phone", lambda d: first_phone_number(d.text))
+    # the first hit has always been stored at 0.9, whatever its region
+    return (phone.number, 0.9) if phone else None
+
+
+def extract_phones(doc: ResumeText) -> Optional[Tuple[List[str], Dict[str, float]]]:
+    phones = doc.derived("phones", lambda d: find_phone_numbers(d.text))
+    if not phones:
+        return None
+    return [p.number for p in phones], {p.number: p.confidence for p in phones}
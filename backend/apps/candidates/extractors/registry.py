@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import threading
+from typing import Any, Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from .result import ExtractionResult
+from .text import ResumeText
+
+logger = logging.getLogger(__name__)
+
+# An extractor takes the shared ResumeText and returns (value, confidence) or None.
+# For list-valued fields the confidence is per item: a dict, or for skills a parallel list.
+Extractor = Callable[[ResumeText], Optional[Tuple[Any, Any]]]
+
+
+class ExtractorSpec(NamedTuple):
+    field: str
+    target: str  # "package.module:function", imported on first use
+    requires: Tuple[str, ...] = ()  # importable modules the extractor needs
+
+
+_specs: Dict[str, ExtractorSpec] = {}
+_loaded: Dict[str, Extractor] = {}
+_lock = threading.Lock()
+
+
+def register(field: str, target: str, *, requires: Sequence[str] = ()) -> None:
+    """Register (or replace) the extractor for field without importing it."""
+    with _lock:
+        _specs[field] = ExtractorSpec(field, target, tuple(requires))
+        _loaded.pop(field, None)
+
+
+def _deps_present(spec: ExtractorSpec) -> bool:
+    return all(importlib.util.find_spec(mod) is not None for mod in spec.requires)
+
+
+def available_fields() -> List[str]:
+    """Registered fields whose declared dependencies are installed (checked without importing)."""
+    return [f for f, spec in _specs.items() if _deps_present(spec)]
+
+
+def get_extractor(field: str) -> Optional[Extractor]:
+    fn = _loaded.get(field)
+    if fn is not None:
+        return fn
+    spec = _specs.get(field)
+    if spec is None:
+        raise KeyError(f"No extractor registered for {field!r}")
+    if not _deps_present(spec):
+        logger.warning("Skipping %s extractor: missing %s", field, ", ".join(spec.requires))
+        return None
+    module_name, _, attr = spec.target.partition(":")
+    fn = getattr(importlib.import_module(module_name), attr)
+    with _lock:
+        _loaded[field] = fn
+    return fn
+
+
+def fields_for_profile(profile: Optional[str] = None) -> List[str]:
+    """
+    Fields enabled for profile in settings.RESUME_EXTRACTOR_PROFILES (default:
+    settings.RESUME_EXTRACTOR_PROFILE). Without a "default" entry every registered field runs.
+    """
+    profile = profile or getattr(settings, "RESUME_EXTRACTOR_PROFILE", "default")
+    profiles = getattr(settings, "RESUME_EXTRACTOR_PROFILES", {}) or {}
+    chosen = profiles.get(profile)
+    if chosen is None:
+        if profile != "default":
+            raise KeyError(f"Unknown extractor profile {profile!r}")
+        return list(_specs)
+    return [f for f in chosen if f in _specs]
+
+
+def run_extractors(
+    text: str,
+    *,
+    fields: Optional[Iterable[str]] = None,
+    profile: Optional[str] = None,
+    headings: Collection[str] = (),
+) -> ExtractionResult:
+    """Run the requested extractors (or the profile's) over text."""
+    doc = ResumeText(text, headings)
+    wanted = list(fields) if fields is not None else fields_for_profile(profile)
+    result = ExtractionResult()
+    for field in wanted:
+        fn = get_extractor(field)
+        if fn is None:
+            continue
+        found = fn(doc)
+        if found is None:
+            continue
+        result.set(field, *found)
+    return result
+
+
+register("name", "apps.candidates.extractors.contact:extract_name")
+register("email", "apps.candidates.extractors.contact:extract_email")
+register("phone", "apps.candidates.extractors.phone:extract_phone", requires=("phonenumbers",))
+register("phones", "apps.candidates.extractors.phone:extract_phones", requires=("phonenumbers",))
+register("company", "apps.candidates.extractors.work:extract_company")
+register("designation", "apps.candidates.extractors.work:extract_designation")
+register("skills", "apps.candidates.extractors.skills:extract_skills")
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .skills import SKILL_TAXONOMY
+
+SKILLS_FIELD = "skills"
+
+# Taxonomy skills interned to small ints in a fixed order, so an id means the same thing in
+# every process. Anything else an LLM produced stays a string on its own result (ids past
+# the taxonomy index that result's list), so nothing here grows with the documents seen.
+_TAXONOMY: Tuple[str, ...] = tuple(SKILL_TAXONOMY)
+_TAXONOMY_IDS: Dict[str, int] = {name: i for i, name in enumerate(_TAXONOMY)}
+_STATIC_SKILLS = len(_TAXONOMY)
+
+
+def skill_names(value: Any) -> List[Optional[str]]:
+    """
+    One name (or None) per entry of a raw skills value. LLM output is not always a list of
+    strings: a bare string is one skill, {"name": ...} objects give their name, numbers
+    are stringified, and anything else is None so callers can drop it with its confidence.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)) or not isinstance(value, (list, tuple)):
+        value = [value]
+    names: List[Optional[str]] = []
+    for entry in value:
+        if isinstance(entry, dict):
+            entry = entry.get("name", entry.get("skill"))
+        if isinstance(entry, (int, float)) and not isinstance(entry, bool):
+            entry = str(entry)
+        names.append(entry.strip() or None if isinstance(entry, str) else None)
+    return names
+
+
+def _pct(confidence: float) -> int:
+    # confidences are two-decimal scores, so a byte of percent holds them exactly
+    return max(0, min(100, round(float(confidence) * 100)))
+
+
+class ExtractionResult:
+    """
+    Fields found in one resume and their confidences. Scalar fields live in two small
+    dicts; skills, the only field that grows with the resume, are held as interned ids
+    with a parallel array of percent confidences instead of a list plus a dict of floats.
+    Names outside the taxonomy are kept in extra_skills and referenced by offset.
+    to_json() is the one place the stored fields_json / confidences_json are built.
+    """
+
+    __slots__ = ("values", "scores", "skill_ids", "skill_scores", "extra_skills")
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {}
+        self.scores: Dict[str, Any] = {}
+        self.skill_ids = array("H")
+        self.skill_scores = array("B")
+        self.extra_skills: List[str] = []
+
+    def set(self, field: str, value: Any, confidence: Union[float, Sequence[float], Dict[str, float]]) -> None:
+        """
+        Record an extractor's output. For skills, confidence is a sequence parallel to
+        value or a dict keyed by skill.
+        """
+        if field == SKILLS_FIELD:
+            self.set_skills(value, confidence)
+            return
+        self.values[field] = value
+        self.scores[field] = confidence
+
+    def set_skills(self, names: Any, confidence: Union[Sequence[float], Dict[str, float]]) -> None:
+        names = skill_names(names)
+        if isinstance(confidence, dict):
+            confidence = [confidence.get(n, 0.0) if n is not None else 0.0 for n in names]
+        extra: Dict[str, int] = {}
+        ids: List[int] = []
+        pcts: List[int] = []
+        for name, c in zip(names, confidence):
+            if name is None:
+                continue
+            sid = _TAXONOMY_IDS.get(name)
+            if sid is None:
+                sid = extra.setdefault(name, _STATIC_SKILLS + len(extra))
+            ids.append(sid)
+            pcts.append(_pct(c))
+        # only a result with tens of thousands of distinct non-taxonomy skills needs wide ids
+        self.skill_ids = array("H" if _STATIC_SKILLS + len(extra) <= 0xFFFF else "I", ids)
+        self.skill_scores = array("B", pcts)
+        self.extra_skills = list(extra)
+
+    def _name(self, sid: int) -> str:
+        return _TAXONOMY[sid] if sid < _STATIC_SKILLS else self.extra_skills[sid - _STATIC_SKILLS]
+
+    @property
+    def skills(self) -> List[str]:
+        return [self._name(i) for i in self.skill_ids]
+
+    def skill_confidences(self) -> Dict[str, float]:
+        return {self._name(i): p / 100 for i, p in zip(self.skill_ids, self.skill_scores)}
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field == SKILLS_FIELD:
+            return self.skills if self.skill_ids else default
+        return self.values.get(field, default)
+
+    def __contains__(self, field: str) -> bool:
+        return bool(self.skill_ids) if field == SKILLS_FIELD else field in self.values
+
+    def merge(self, fields: Dict[str, Any], confidences: Dict[str, Any]) -> None:
+        """
+        Fold in another extractor's dicts (the LLM's): its non-empty values win, and each
+        confidence becomes the higher of the two.
+        """
+        for field, value in fields.items():
+            if not value:
+                continue
+            if field == SKILLS_FIELD:
+                names = [n for n in skill_names(value) if n is not None]
+                if not names:
+                    continue
+                ours = self.skill_confidences()
+                theirs = confidences.get(SKILLS_FIELD)
+                theirs = theirs if isinstance(theirs, dict) else {}
+                self.set_skills(names, {s: max(ours.get(s, 0.0), theirs.get(s, 0.0)) for s in names})
+                continue
+            self.values[field] = value
+            if field in confidences:
+                self.scores[field] = max(self.scores.get(field, 0.0), confidences[field])
+
+    def to_json(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(fields_json, confidences_json) in the stored shape: skills as a list plus a per-skill dict."""
+        fields = dict(self.values)
+        confidences = dict(self.scores)
+        if self.skill_ids:
+            fields[SKILLS_FIELD] = self.skills
+            confidences[SKILLS_FIELD] = self.skill_confidences()
+        return fields, confidences
+
+    @classmethod
+    def from_json(cls, fields: Optional[Dict[str, Any]], confidences: Optional[Dict[str, Any]]) -> "ExtractionResult":
+        result = cls()
+        confidences = confidences or {}
+        for field, value in (fields or {}).items():
+            result.set(field, value, confidences.get(field, {} if field == SKILLS_FIELD else 0.0))
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExtractionResult):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def __repr__(self) -> str:
+        return f"ExtractionResult({self.values!r}, skills={self.skills!r})"
@@ -0,0 +1,120 @@
+"""
+Section segmentation: split a resume once into Contact / Summary / Experience / Education /
+Skills / ... spans with character offsets, so field extractors only read the part of the
+document they care about.
+
+Headings are recognised by their wording; when the text extractor saw layout information
+(a larger or bold font in a PDF, a heading style in a DOCX) it passes those lines as hints,
+which also lets unrecognised headings ("Awards") close the previous section. An all-caps
+line without a hint is a heading only if it starts with a known heading phrase: "ASHA
+VERMA" and "ACME ANALYTICS PVT LTD" are not headings.
+"""
+from __future__ import annotations
+
+import re
+from typing import Collection, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+CONTACT = "contact"
+SUMMARY = "summary"
+EXPERIENCE = "experience"
+EDUCATION = "education"
+SKILLS = "skills"
+PROJECTS = "projects"
+CERTIFICATIONS = "certifications"
+OTHER = "other"
+
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    CONTACT: ("contact", "contact details", "contact information", "personal details", "personal information"),
+    SUMMARY: ("summary", "profile", "objective", "about me", "professional summary", "career objective"),
+    EXPERIENCE: (
+        "experience", "work experience", "professional experience", "work history",
+        "employment", "employment history", "career history", "relevant experience",
+    ),
+    EDUCATION: ("education", "academics", "academic background", "qualifications", "education and training"),
+    SKILLS: (
+        "skills", "technical skills", "key skills", "core skills", "skills and tools",
+        "technologies", "tech stack", "core competencies", "tools",
+    ),
+    PROJECTS: ("projects", "key projects", "personal projects"),
+    CERTIFICATIONS: ("certifications", "certificates", "licenses and certifications"),
+}
+_HEADING_LOOKUP = {phrase: name for name, phrases in SECTION_HEADINGS.items() for phrase in phrases}
+
+_LINE_RE = re.compile(r"[^\n]+")
+_BULLET_RE = re.compile(r"^[\W\d_]+")
+_MAX_HEADING_WORDS = 5
+
+
+class Section(NamedTuple):
+    name: str
+    start: int  # first character of the body, after the heading line
+    end: int
+    heading: str
+
+
+def normalize_heading(line: str) -> str:
+    """Lower-case a candidate heading line and drop bullets, numbering and trailing punctuation."""
+    s = _BULLET_RE.sub("", line.strip().lower()).replace("&", "and")
+    s = re.sub(r"[\s:.\-–—|]+$", "", s)
+    return re.sub(r"\s+", " ", s)
+
+
+def _classify(line: str, hinted: bool) -> Optional[str]:
+    key = normalize_heading(line)
+    if not key or len(key.split()) > _MAX_HEADING_WORDS:
+        return None
+    if key in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[key]
+    stripped = line.strip()
+    if hinted or stripped.isupper():
+        # "EXPERIENCE (5 YEARS)"; all-caps alone is not enough, names and employers are
+        # often written that way
+        for phrase, name in _HEADING_LOOKUP.items():
+            if key.startswith(phrase + " "):
+                return name
+    # a styled heading we have no name for
+    return OTHER if hinted else None
+
+
+class SectionIndex:
+    """Sections of one document in reading order; text before the first heading is Contact."""
+
+    def __init__(self, text: str, sections: List[Section]) -> None:
+        self.text = text
+        self.sections = sections
+        self._by_name: Dict[str, List[Section]] = {}
+        for s in sections:
+            self._by_name.setdefault(s.name, []).append(s)
+
+    @classmethod
+    def build(cls, text: str, headings: Collection[str] = ()) -> "SectionIndex":
+        marks: List[Tuple[str, int, int, str]] = []  # name, heading start, body start, heading
+        for m in _LINE_RE.finditer(text):
+            line = m.group(0)
+            name = _classify(line, normalize_heading(line) in headings)
+            if name:
+                marks.append((name, m.start(), m.end(), line.strip()))
+        sections: List[Section] = []
+        first = marks[0][1] if marks else len(text)
+        if text[:first].strip():
+            sections.append(Section(CONTACT, 0, first, ""))
+        for i, (name, _, body, heading) in enumerate(marks):
+            end = marks[i + 1][1] if i + 1 < len(marks) else len(text)
+            sections.append(Section(name, body, end, heading))
+        return cls(text, sections)
+
+    def __iter__(self) -> Iterator[Section]:
+        return iter(self.sections)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def get(self, name: str) -> List[Section]:
+        return self._by_name.get(name, [])
+
+    def span(self, name: str) -> str:
+        """Text of every section called name, joined in document order ("" if absent)."""
+        return "\n".join(self.text[s.start:s.end] for s in self.get(name))
+
+    def offsets(self) -> List[Dict[str, object]]:
+        return [{"name": s.name, "start": s.start, "end": s.end, "heading": s.heading} for s in self.sections]
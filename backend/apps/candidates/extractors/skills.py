@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .sections import SKILLS
+from .text import ResumeText
+
+# token-ish skills; tune to your interests
+SKILL_TOKENS = {
+    "python", "django", "flask", "react", "javascript", "typescript",
+    "postgres", "postgresql", "sqlite", "redis", "docker", "kubernetes",
+    "aws", "gcp", "azure", "celery", "langchain", "pytorch", "tensorflow",
+    "nlp", "llm", "openai", "anthropic", "gpt", "fastapi",
+}
+
+SKILL_ALIASES = {"postgres": "postgresql"}
+
+# canonical skill names, in the order that fixes their interned ids (see result.py)
+SKILL_TAXONOMY = tuple(sorted({SKILL_ALIASES.get(sk, sk) for sk in SKILL_TOKENS}))
+
+
+def extract_skills(doc: ResumeText) -> Optional[Tuple[List[str], List[float]]]:
+    # Skills listed under a Skills heading are more certain than ones mentioned in passing.
+    listed = {SKILL_ALIASES.get(sk, sk) for sk in SKILL_TOKENS & doc.section_tokens(SKILLS)}
+    found = {SKILL_ALIASES.get(sk, sk) for sk in SKILL_TOKENS & doc.tokens}
+    if not found:
+        return None
+    skills = sorted(found)
+    return skills, [0.9 if sk in listed else 0.85 for sk in skills]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import re
+from functools import cached_property
+from typing import Any, Callable, Collection, Dict, List, Set
+
+from .sections import SectionIndex
+
+
+class ResumeText:
+    """Raw resume text plus the derived views extractors share, each computed at most once."""
+
+    def __init__(self, text: str, headings: Collection[str] = ()) -> None:
+        self.text = text or ""
+        # normalized heading lines reported by the text extractor's layout pass
+        self.headings = headings
+        self._section_lines: Dict[str, List[str]] = {}
+        self._derived: Dict[str, Any] = {}
+
+    @cached_property
+    def normalized(self) -> str:
+        return self.text.replace("\r", "")
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return _lines(self.normalized)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.normalized.lower()
+
+    @cached_property
+    def tokens(self) -> Set[str]:
+        return _tokens(self.lower)
+
+    @cached_property
+    def sections(self) -> SectionIndex:
+        return SectionIndex.build(self.normalized, self.headings)
+
+    def section_lines(self, name: str) -> List[str]:
+        """Non-empty lines of the named section(s); [] if the resume has none."""
+        if name not in self._section_lines:
+            self._section_lines[name] = _lines(self.sections.span(name))
+        return self._section_lines[name]
+
+    def section_tokens(self, name: str) -> Set[str]:
+        return _tokens(self.sections.span(name).lower())
+
+    def derived(self, key: str, build: Callable[["ResumeText"], Any]) -> Any:
+        """Memoise a value several extractors need (e.g. parsed roles) for this document."""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+
+def _lines(text: str) -> List[str]:
+    return [ln.strip() for ln in text.split("\n") if ln.strip()]
+
+
+def _tokens(lower: str) -> Set[str]:
+    return set(re.findall(r"[a-zA-Z+#.]+", lower))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Tuple
+
+from .sections import CONTACT, EXPERIENCE
+from .text import ResumeText
+
+DESIGNATION_HINTS = [
+    "software engineer", "senior software", "sde", "developer",
+    "data scientist", "machine learning", "ml engineer",
+    "frontend", "backend", "full stack", "tech lead", "engineering manager",
+]
+
+COMPANY_HINTS = [" at ", " @ ", "experience", "work history", "employment"]
+
+# "Senior Software Engineer at Acme Analytics (2019 - Present)"
+ROLE_RE = re.compile(r"^(?P<title>[^@]{2,80}?)\s+(?:at|@)\s+(?P<company>[A-Z0-9][^@]{1,80})$")
+# dates, locations and other trailers after the company name
+COMPANY_TRAILER_RE = re.compile(r"\s{2,}|\s[|(–—]|\s-\s|,|\s\d{4}\b")
+COMPANY_AFTER_AT_RE = re.compile(r"(?:\bat\b|\s@\s)\s*([A-Z][A-Za-z0-9& ._-]{2,})")
+
+# longest plausible headline line under the name
+MAX_HEADLINE_WORDS = 8
+
+
+def _parse_roles(doc: ResumeText) -> List[Tuple[str, str]]:
+    """(title, company) for each "Title at Company" line in the Experience section."""
+    roles = []
+    for ln in doc.section_lines(EXPERIENCE):
+        m = ROLE_RE.match(ln)
+        if m:
+            company = COMPANY_TRAILER_RE.split(m.group("company"), 1)[0].strip()
+            if company:
+                roles.append((m.group("title").strip(" -–—|,"), company))
+    return roles
+
+
+def _roles(doc: ResumeText) -> List[Tuple[str, str]]:
+    return doc.derived("roles", _parse_roles)
+
+
+def _is_designation(line: str) -> bool:
+    lnl = line.lower()
+    return any(h in lnl for h in DESIGNATION_HINTS)
+
+
+def extract_company(doc: ResumeText) -> Optional[Tuple[str, float]]:
+    roles = _roles(doc)
+    if roles:
+        return roles[0][1], 0.8
+    experience = doc.section_lines(EXPERIENCE)
+    if experience and not _is_designation(experience[0]):
+        # "Acme Analytics" on its own line, title on the next
+        return experience[0], 0.6
+    # No usable Experience section: look for " at X" near a hint anywhere.
+    for hint in COMPANY_HINTS:
+        idx = doc.lower.find(hint)
+        if idx != -1:
+            m = COMPANY_AFTER_AT_RE.search(doc.normalized[idx: idx + 120])
+            if m:
+                return m.group(1).strip().split("  ")[0], 0.5
+    return None
+
+
+def extract_designation(doc: ResumeText) -> Optional[Tuple[str, float]]:
+    # The headline under the name is the current title; otherwise the most recent role.
+    for ln in doc.section_lines(CONTACT)[:10]:
+        if len(ln.split()) <= MAX_HEADLINE_WORDS and _is_designation(ln):
+            return ln, 0.75
+    roles = _roles(doc)
+    if roles:
+        return roles[0][0], 0.7
+    for ln in doc.section_lines(EXPERIENCE)[:3]:
+        if _is_designation(ln):
+            return ln, 0.6
+    if all(s.name == CONTACT for s in doc.sections):
+        # no headings at all: fall back to the first lines of the document
+        for ln in doc.lines[:30]:
+            if _is_designation(ln):
+                return ln, 0.5
+    return None
@@ -0,0 +1,55 @@
+"""
+Resume text extraction by file format.
+
+sniff() identifies a file once from its leading bytes (and, for ZIP containers, their
+member names), never from the name or mime type the client sent. identify() consults
+those only for text sniff could not place (too many control characters), and only to
+pick a text format: binary content nobody recognises is rejected, not parsed. Each
+format's handler is registered by dotted path like the field extractors, so a handler
+and its optional dependency (olefile for .doc) are imported on first use. Handlers
+are generators yielding text a page or paragraph at a time: extract() stops reading
+once it has max_chars, and records bytes, characters and seconds per format so the
+throughput of each handler shows on /metrics.
+"""
+from __future__ import annotations
+
+from .registry import (
+    DOC,
+    DOCX,
+    HTML,
+    ODT,
+    PDF,
+    RTF,
+    TXT,
+    FormatSpec,
+    UnsupportedFormat,
+    available_formats,
+    extract,
+    for_name,
+    get_handler,
+    preload,
+    register,
+    spec,
+)
+from .sniff import identify, sniff
+
+__all__ = [
+    "DOC",
+    "DOCX",
+    "HTML",
+    "ODT",
+    "PDF",
+    "RTF",
+    "TXT",
+    "FormatSpec",
+    "UnsupportedFormat",
+    "available_formats",
+    "extract",
+    "for_name",
+    "get_handler",
+    "identify",
+    "preload",
+    "register",
+    "sniff",
+    "spec",
+]
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import io
+from typing import Dict, Iterator, Optional, Set
+
+from ..extractors.sections import normalize_heading
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    return paragraphs(io.BytesIO(data), headings)
+
+
+def paragraphs(buf: io.BytesIO, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """Each paragraph's text; if headings is given, add Heading/Title-styled or all-bold paragraphs."""
+    from docx import Document as DocxDocument
+
+    # python-docx resolves p.style through the styles part on every access (a scan of all
+    # styles for the default); a document has a handful of styles, so name each id once
+    style_names: Dict[Optional[str], str] = {}
+    for p in DocxDocument(buf).paragraphs:
+        text = p.text
+        if headings is not None and text.strip():
+            style_id = p._p.style
+            if style_id not in style_names:
+                style_names[style_id] = (p.style.name if p.style is not None else "") or ""
+            style = style_names[style_id]
+            runs = [r for r in p.runs if r.text.strip()]
+            if style.startswith(("Heading", "Title")) or (runs and all(r.bold for r in runs)):
+                headings.add(normalize_heading(text))
+        yield text
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional, Set
+
+from ..extractors.sections import normalize_heading
+from .text import decoded, encoding_of
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+# tags that end a line of text
+_BLOCKS = frozenset(
+    "address article aside blockquote br dd div dl dt figcaption footer form h1 h2 h3 h4 h5 h6 header hr "
+    "li main nav ol p pre section table tbody thead tfoot tr ul".split()
+)
+_HEADINGS = frozenset("h1 h2 h3 h4 h5 h6".split())
+_HIDDEN = frozenset("head script style template noscript svg".split())
+
+
+class _TextParser(HTMLParser):
+    def __init__(self, headings: Optional[Set[str]]) -> None:
+        super().__init__(convert_charrefs=True)
+        self.headings = headings
+        self.done: List[str] = []  # finished lines, taken by extract() after each feed
+        self._line: List[str] = []
+        self._hidden = 0
+        self._heading: Optional[List[str]] = None
+
+    def _break(self) -> None:
+        line = " ".join("".join(self._line).split())
+        self._line = []
+        if line:
+            self.done.append(line)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HIDDEN:
+            self._hidden += 1
+        elif tag in _BLOCKS:
+            self._break()
+            if tag in _HEADINGS:
+                self._heading = []
+        elif tag in ("td", "th"):
+            self._line.append("\t")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCKS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag in _HIDDEN:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in _BLOCKS:
+            if tag in _HEADINGS and self._heading is not None:
+                if self.headings is not None:
+                    key = normalize_heading("".join(self._heading))
+                    if key:
+                        self.headings.add(key)
+                self._heading = None
+            self._break()
+
+    def handle_data(self, data):
+        if self._hidden:
+            return
+        self._line.append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+
+    def close(self):
+        super().close()
+        self._break()
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """Visible text, one line per block element; h1-h6 text counts as headings."""
+    declared = _META_CHARSET.search(data[:4096])
+    parser = _TextParser(headings)
+    for piece in decoded(data, encoding_of(data, declared.group(1).decode("ascii") if declared else None)):
+        parser.feed(piece)
+        yield from parser.done
+        parser.done.clear()
+    parser.close()
+    yield from parser.done
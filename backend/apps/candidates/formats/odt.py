@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import Iterator, List, Optional, Set
+from xml.etree import ElementTree
+
+from ..extractors.sections import normalize_heading
+
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+_P, _H = f"{{{TEXT_NS}}}p", f"{{{TEXT_NS}}}h"
+_S, _TAB, _BREAK = f"{{{TEXT_NS}}}s", f"{{{TEXT_NS}}}tab", f"{{{TEXT_NS}}}line-break"
+_COUNT = f"{{{TEXT_NS}}}c"
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """
+    Each paragraph and heading (text:p, text:h) of content.xml, parsed incrementally
+    from the compressed member and discarded once read.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as z, z.open("content.xml") as content:
+        for _, el in ElementTree.iterparse(content, events=("end",)):
+            if el.tag not in (_P, _H):
+                continue
+            text = "".join(_text_of(el))
+            if el.tag == _H and headings is not None and text.strip():
+                headings.add(normalize_heading(text))
+            yield text
+            el.clear()
+
+
+def _text_of(el) -> List[str]:
+    parts = [el.text or ""]
+    for child in el:
+        if child.tag == _S:
+            parts.append(" " * int(child.get(_COUNT, "1")))
+        elif child.tag == _TAB:
+            parts.append("\t")
+        elif child.tag == _BREAK:
+            parts.append("\n")
+        elif child.tag not in (_P, _H):  # nested paragraphs (notes, frames) come out on their own
+            parts.extend(_text_of(child))
+        parts.append(child.tail or "")
+    return parts
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import io
+import math
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from .. import metrics
+from ..extractors.sections import normalize_heading
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """Each page's text; if headings is given, add lines set in a heading font to it."""
+    return pages(io.BytesIO(data), headings)
+
+
+def pages(buf: io.BytesIO, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(buf)
+    # pdf_preflight rejects larger files before they get here; this bounds direct callers
+    selected = reader.pages[: settings.PDF_MAX_PAGES or None]
+    metrics.PARSE_PAGES_TOTAL.inc(len(selected), format="pdf")
+    runs: List[Tuple[int, float, str, float, bool]] = []  # page, baseline y, text, size, bold
+
+    try:
+        for page_no, page in enumerate(selected):
+            visitor = None
+            if headings is not None:
+                def visitor(text, cm, tm, font_dict, font_size, _page=page_no):
+                    if text.strip():
+                        size = (font_size or 0) * (math.hypot(tm[2], tm[3]) or 1) * (math.hypot(cm[2], cm[3]) or 1)
+                        font = str((font_dict or {}).get("/BaseFont", ""))
+                        runs.append((_page, round(cm[5] + tm[5]), text, size, "Bold" in font or "Heavy" in font))
+            try:
+                text = page.extract_text(visitor_text=visitor) or ""
+            except Exception:
+                # ignore bad page; keep going
+                continue
+            yield text
+    finally:
+        # also when the reader stops early: headings of the pages read so far
+        if headings is not None:
+            headings.update(_heading_lines(runs))
+
+
+def _heading_lines(runs: List[Tuple[int, float, str, float, bool]]) -> Set[str]:
+    """Lines whose text is set larger than the body font, or bold when the body is not."""
+    if not runs:
+        return set()
+    weight: Dict[Tuple[float, bool], int] = {}
+    for _, _, text, size, bold in runs:
+        key = (round(size, 1), bold)
+        weight[key] = weight.get(key, 0) + len(text)
+    body_size, body_bold = max(weight, key=weight.get)
+    lines: Dict[Tuple[int, float], List[Tuple[str, bool]]] = {}
+    for page_no, y, text, size, bold in runs:
+        styled = round(size, 1) > body_size * 1.15 or (bold and not body_bold)
+        lines.setdefault((page_no, y), []).append((text, styled))
+    found = set()
+    for parts in lines.values():
+        if all(styled for _, styled in parts):
+            key = normalize_heading("".join(text for text, _ in parts))
+            if key:
+                found.add(key)
+    return found
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+PDF, DOCX, DOC, RTF, ODT, TXT, HTML = "pdf", "docx", "doc", "rtf", "odt", "txt", "html"
+
+# A handler takes the file's bytes and, if given, a set to add heading lines to, and
+# yields the text a page or paragraph at a time.
+Handler = Callable[[bytes, Optional[Set[str]]], Iterator[str]]
+
+
+class FormatSpec(NamedTuple):
+    name: str
+    target: str  # "package.module:function", imported on first use
+    mime: str
+    extensions: Tuple[str, ...]
+    requires: Tuple[str, ...] = ()  # importable modules the handler needs
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+_specs: Dict[str, FormatSpec] = {}
+_loaded: Dict[str, Handler] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, target: str, *, mime: str, extensions: Sequence[str], requires: Sequence[str] = ()) -> None:
+    """Register (or replace) the handler for a format without importing it."""
+    with _lock:
+        _specs[name] = FormatSpec(name, target, mime, tuple(extensions), tuple(requires))
+        _loaded.pop(name, None)
+
+
+def spec(name: str) -> FormatSpec:
+    return _specs[name]
+
+
+def _deps_present(s: FormatSpec) -> bool:
+    return all(importlib.util.find_spec(mod) is not None for mod in s.requires)
+
+
+def available_formats() -> List[str]:
+    """Registered formats whose declared dependencies are installed (checked without importing)."""
+    return [name for name, s in _specs.items() if _deps_present(s)]
+
+
+def get_handler(name: str) -> Optional[Handler]:
+    fn = _loaded.get(name)
+    if fn is not None:
+        return fn
+    s = _specs.get(name)
+    if s is None:
+        raise KeyError(f"No handler registered for {name!r}")
+    if not _deps_present(s):
+        logger.warning("Cannot read %s files: missing %s", name, ", ".join(s.requires))
+        return None
+    module_name, _, attr = s.target.partition(":")
+    fn = getattr(importlib.import_module(module_name), attr)
+    with _lock:
+        _loaded[name] = fn
+    return fn
+
+
+def preload(name: str) -> None:
+    """
+    Import name's handler and its declared dependencies now. A process about to fork
+    calls this: a child forked while another thread is importing a module inherits that
+    import's lock held, and hangs on its own first import of the module.
+    """
+    if get_handler(name) is not None:
+        for mod in _specs[name].requires:
+            importlib.import_module(mod)
+
+
+def for_name(filename: str = "", mime_type: str = "") -> Optional[str]:
+    """The format a file name's extension or a declared mime type stands for, if any."""
+    ext = os.path.splitext((filename or "").lower())[1]
+    mime_type = (mime_type or "").split(";")[0].strip().lower()
+    for s in _specs.values():
+        if ext in s.extensions or (mime_type and mime_type == s.mime):
+            return s.name
+    return None
+
+
+def extract(
+    data: bytes,
+    fmt: str,
+    *,
+    headings: Optional[Set[str]] = None,
+    max_chars: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> str:
+    """
+    Text of data read as fmt, lines joined by newlines. Reading stops once max_chars
+    characters are out; the rest of the file is never parsed. If stats is given,
+    stats["chunks"] is set to the number of pieces read (pages, for a PDF).
+    """
+    handler = get_handler(fmt)
+    if handler is None:
+        raise UnsupportedFormat(f"{fmt} files need {', '.join(_specs[fmt].requires)} installed")
+    started = time.perf_counter()
+    parts: List[str] = []
+    size = 0
+    chunks = handler(data, headings)
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk) + 1
+            if max_chars and size >= max_chars:
+                break
+    finally:
+        chunks.close()
+        if stats is not None:
+            stats["chunks"] = len(parts)
+        # throughput per format = rate(bytes or chars) / rate(seconds)
+        metrics.PARSE_BYTES_TOTAL.inc(len(data), format=fmt)
+        metrics.TEXT_EXTRACT_SECONDS_TOTAL.inc(time.perf_counter() - started, format=fmt)
+        metrics.TEXT_EXTRACT_CHARS_TOTAL.inc(size, format=fmt)
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+register(
+    PDF, "apps.candidates.formats.pdf:extract", mime="application/pdf", extensions=(".pdf",), requires=("pypdf",)
+)
+register(
+    DOCX, "apps.candidates.formats.docx:extract",
+    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document", extensions=(".docx",),
+    requires=("docx",),
+)
+register(
+    DOC, "apps.candidates.formats.doc:extract", mime="application/msword", extensions=(".doc",), requires=("olefile",)
+)
+register(RTF, "apps.candidates.formats.rtf:extract", mime="application/rtf", extensions=(".rtf",))
+register(
+    ODT, "apps.candidates.formats.odt:extract", mime="application/vnd.oasis.opendocument.text", extensions=(".odt",)
+)
+register(TXT, "apps.candidates.formats.text:extract", mime="text/plain", extensions=(".txt", ".text", ".md"))
+register(HTML, "apps.candidates.formats.html:extract", mime="text/html", extensions=(".html", ".htm"))
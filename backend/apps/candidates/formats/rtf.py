@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+from typing import Iterator, List, Optional, Set
+
+_TOKEN = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|[\r\n]+|([^\\{}\r\n]+)"
+)
+# groups that hold no document text
+_SKIPPED = frozenset(
+    "fonttbl colortbl stylesheet info pict object themedata colorschememapping latentstyles datastore "
+    "xmlnstbl listtable listoverridetable rsidtbl generator filetbl revtbl fldinst bkmkstart bkmkend".split()
+)
+_BREAKS = frozenset("par line row sect page".split())
+_CHARS = {
+    "tab": "\t", "cell": "\t", "emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022",
+    "lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d", "emspace": " ",
+    "enspace": " ", "qmspace": " ",
+}
+_SYMBOLS = {b"\\": "\\", b"{": "{", b"}": "}", b"~": "\u00a0", b"_": "\u2011"}
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """Text of each paragraph, read straight off the RTF token stream."""
+    encoding = "cp1252"
+    stack: List[tuple] = []
+    skip, uc = False, 1
+    fallback = 0  # characters after \uN standing in for it in non-Unicode readers
+    line: List[str] = []
+    pos, end = 0, len(data)
+    while pos < end:
+        m = _TOKEN.match(data, pos)
+        if m is None:
+            pos += 1
+            continue
+        pos = m.end()
+        word, arg, hexcode, symbol, brace, text = m.groups()
+        if brace is not None:
+            if brace == b"{":
+                stack.append((skip, uc))
+            elif stack:
+                skip, uc = stack.pop()
+            fallback = 0
+            continue
+        if word is not None:
+            w = word.decode("ascii")
+            if w == "bin":
+                pos += int(arg or 0)  # raw bytes; they could contain braces
+            elif w in _SKIPPED:
+                skip = True
+            elif skip:
+                pass
+            elif w in _BREAKS:
+                yield "".join(line)
+                line = []
+            elif w in _CHARS:
+                line.append(_CHARS[w])
+            elif w == "ansicpg" and arg:
+                encoding = f"cp{int(arg)}"
+            elif w == "uc" and arg:
+                uc = int(arg)
+            elif w == "u" and arg:
+                line.append(chr(int(arg) % 65536))
+                fallback = uc
+            continue
+        if symbol is not None:
+            if symbol == b"*":
+                skip = True  # an optional destination this reader does not know
+            elif skip:
+                pass
+            elif symbol in (b"\n", b"\r"):  # same as \par
+                yield "".join(line)
+                line = []
+            elif symbol in _SYMBOLS:
+                line.append(_SYMBOLS[symbol])
+            continue
+        if fallback:
+            if hexcode is not None:
+                fallback -= 1
+                continue
+            if text is not None:
+                cut = min(fallback, len(text))
+                text, fallback = text[cut:], fallback - cut
+        if skip:
+            continue
+        if hexcode is not None:
+            line.append(bytes([int(hexcode, 16)]).decode(encoding, "replace"))
+        elif text:
+            line.append(text.decode(encoding, "replace"))
+    if line:
+        yield "".join(line)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import io
+import os
+import re
+import zipfile
+from typing import BinaryIO, Optional, Tuple, Union
+
+from .registry import DOC, DOCX, HTML, ODT, PDF, RTF, TXT, for_name
+from .text import utf16_order
+
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP_MAGIC = b"PK\x03\x04"
+ODT_MIMETYPE = b"application/vnd.oasis.opendocument.text"
+WORD_STREAM = "WordDocument".encode("utf-16-le")  # directory entry name in a Word 97-2003 file
+
+_HTML_START = re.compile(rb"\s*(?:<!--.*?-->\s*)*<(?:!doctype\s+html|html|head|body)\b", re.I | re.S)
+_UTF_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+TEXT_PROBE = 8192
+HEAD_PROBE = 65536  # the OLE2 directory naming the WordDocument stream sits near the start
+
+
+def sniff(data: Union[bytes, BinaryIO]) -> Optional[str]:
+    """
+    The format of data judged by its content alone, or None if it is none of ours. data
+    is the file's bytes or a seekable binary file, of which only the first HEAD_PROBE
+    bytes (and a ZIP's central directory) are read.
+    """
+    return _from_content(*_head(data))
+
+
+def identify(data: Union[bytes, BinaryIO], name: str = "", mime_type: str = "") -> Optional[str]:
+    """
+    sniff(data), except that text sniff could not place (too many control characters)
+    is taken as whatever text format the name or mime type says. Binary content is never
+    identified by its name.
+    """
+    head, size, container = _head(data)
+    fmt = _from_content(head, size, container)
+    if fmt is None and _textish(head[:TEXT_PROBE]):
+        named = for_name(name, mime_type)
+        fmt = named if named in (TXT, HTML) else None
+    return fmt
+
+
+def _head(data: Union[bytes, BinaryIO]) -> Tuple[bytes, int, Union[bytes, BinaryIO]]:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data[:HEAD_PROBE]), len(data), data
+    pos = data.tell()
+    data.seek(0, os.SEEK_END)
+    size = data.tell()
+    data.seek(0)
+    head = data.read(HEAD_PROBE)
+    data.seek(pos)
+    return head, size, data
+
+
+def _from_content(head: bytes, size: int, container: Union[bytes, BinaryIO]) -> Optional[str]:
+    if b"%PDF-" in head[:1024]:
+        return PDF
+    if head.startswith(ZIP_MAGIC):
+        return _zip_format(container)
+    if head.startswith(OLE2_MAGIC):
+        # Excel and PowerPoint files are OLE2 containers too
+        return DOC if WORD_STREAM in head else None
+    if head.lstrip().startswith(b"{\\rtf"):
+        return RTF
+    probe = head[:TEXT_PROBE]
+    text = _as_text(probe, cut=size > len(probe))
+    if text is None:
+        return None
+    return HTML if _HTML_START.match(text.encode("utf-8", "ignore")) else TXT
+
+
+def _zip_format(container: Union[bytes, BinaryIO]) -> Optional[str]:
+    src = io.BytesIO(container) if isinstance(container, (bytes, bytearray, memoryview)) else container
+    pos = src.tell()
+    try:
+        # reads the central directory at the end, and the mimetype member if there is one
+        with zipfile.ZipFile(src) as z:
+            names = set(z.namelist())
+            if "word/document.xml" in names:
+                return DOCX
+            if "mimetype" in names and z.read("mimetype").strip() == ODT_MIMETYPE:
+                return ODT
+    except (zipfile.BadZipFile, KeyError, OSError):
+        pass
+    finally:
+        src.seek(pos)
+    return None
+
+
+def _as_text(head: bytes, cut: bool) -> Optional[str]:
+    """head decoded if it looks like text: a BOM, UTF-16, or UTF-8/Latin-1 without control bytes."""
+    if head.startswith(_UTF_BOMS):
+        return head.decode("utf-8-sig" if head.startswith(_UTF_BOMS[0]) else "utf-16", "ignore")
+    utf16 = utf16_order(head)
+    if utf16:
+        text = head.decode(utf16, "ignore")
+    elif b"\x00" in head:
+        return None
+    else:
+        try:
+            text = head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            if cut and e.reason == "unexpected end of data":  # a character cut off at the probe's end
+                text = head[: e.start].decode("utf-8")
+            else:
+                text = head.decode("latin-1")
+    return text if _controls(text) <= len(text) // 100 else None
+
+
+def _textish(head: bytes) -> bool:
+    """Text by a looser measure than _as_text: no NULs, and at most a tenth control characters."""
+    if not head or b"\x00" in head:
+        return False
+    return _controls(head.decode("latin-1")) <= len(head) // 10
+
+
+def _controls(text: str) -> int:
+    return sum(1 for ch in text if ord(ch) < 32 and ch not in "\t\n\r\f")
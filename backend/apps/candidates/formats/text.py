@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import codecs
+import re
+from typing import Iterator, Optional, Set
+
+CHUNK = 64 * 1024
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+
+def utf16_order(data: bytes) -> Optional[str]:
+    """ "utf-16-le" or "utf-16-be" for UTF-16 without a BOM, told by the NUL high bytes of Latin text."""
+    sample = data[:4096]
+    pairs = len(sample) // 2
+    if pairs < 8:
+        return None
+    even, odd = sample[0:pairs * 2:2].count(0), sample[1:pairs * 2:2].count(0)
+    if odd >= pairs * 0.4 and even <= pairs * 0.05:
+        return "utf-16-le"
+    if even >= pairs * 0.4 and odd <= pairs * 0.05:
+        return "utf-16-be"
+    return None
+
+
+def encoding_of(data: bytes, declared: Optional[str] = None) -> str:
+    """BOM or UTF-16 byte pattern, then a declared charset Python knows, then UTF-8 if the start decodes, else cp1252."""
+    for bom, name in _BOMS:
+        if data.startswith(bom):
+            return name
+    utf16 = utf16_order(data)
+    if utf16:
+        return utf16
+    if declared:
+        try:
+            return codecs.lookup(declared).name
+        except LookupError:
+            pass
+    try:
+        data[:CHUNK].decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # a character cut off at the probe's end is still UTF-8
+        return "utf-8" if len(data) > CHUNK and e.reason == "unexpected end of data" else "cp1252"
+
+
+def decoded(data: bytes, encoding: str) -> Iterator[str]:
+    """data decoded CHUNK bytes at a time."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for start in range(0, len(data), CHUNK):
+        yield decoder.decode(data[start:start + CHUNK])
+    yield decoder.decode(b"", final=True)
+
+
+def lines(pieces: Iterator[str]) -> Iterator[str]:
+    """Complete lines out of a stream of text pieces."""
+    pending = ""
+    for piece in pieces:
+        buf = pending + piece
+        held = "\r" if buf.endswith("\r") else ""  # may be the first half of \r\n
+        parts = re.split(r"\r\n|\r|\n", buf[: len(buf) - len(held)])
+        pending = parts.pop() + held
+        yield from parts
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+
+def extract(data: bytes, headings: Optional[Set[str]] = None) -> Iterator[str]:
+    """Each line of a plain-text resume (no layout, so no headings)."""
+    return lines(decoded(data, encoding_of(data)))
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import path
+
+from apps.candidates import aio
+from apps.candidates.benchmarking import percentile, render_pdf, scratch_database
+from apps.candidates.models import Candidate, Resume
+from apps.candidates.views import UploadResumeAsyncView, UploadResumeView
+from apps.documents.views import RequestDocumentsAsyncView, RequestDocumentsView
+from .loadtest import _multipart
+
+MODES = ("wsgi-sync", "asgi-sync", "asgi-async")
+
+# seconds each send blocks in _SlowSMTPBackend; set from --smtp-seconds
+SMTP_SECONDS = 0.0
+
+
+class _SlowSMTPBackend(EmailBackend):
+    """locmem backend that stalls like a slow SMTP server."""
+
+    def send_messages(self, messages):
+        time.sleep(SMTP_SECONDS)
+        return super().send_messages(messages)
+
+
+def _urlconf(name: str, upload_view, request_view) -> types.ModuleType:
+    conf = types.ModuleType(name)
+    conf.urlpatterns = [
+        path("api/candidates/upload", upload_view.as_view()),
+        path("api/candidates/<int:candidate_id>/request-documents", request_view.as_view()),
+    ]
+    return conf
+
+
+SYNC_URLS = _urlconf("bench_sync_urls", UploadResumeView, RequestDocumentsView)
+ASYNC_URLS = _urlconf("bench_async_urls", UploadResumeAsyncView, RequestDocumentsAsyncView)
+
+
+def _pieces(body: bytes, chunks: int) -> List[bytes]:
+    size = max(1, -(-len(body) // chunks))
+    return [body[i: i + size] for i in range(0, len(body), size)]
+
+
+class _SlowInput(io.RawIOBase):
+    """wsgi.input that hands the body over piece by piece, sleeping before each piece but the first."""
+
+    def __init__(self, pieces: List[bytes], delay: float) -> None:
+        self.pieces = list(pieces)
+        self.delay = delay
+        self.buf = b""
+        self.sent = 0
+
+    def read(self, size: int = -1) -> bytes:
+        # like a socket file: block until size bytes (or the whole body) have arrived
+        want = float("inf") if size is None or size < 0 else size
+        while len(self.buf) < want and self.pieces:
+            if self.sent:
+                time.sleep(self.delay)
+            self.buf += self.pieces.pop(0)
+            self.sent += 1
+        n = len(self.buf) if want == float("inf") else size
+        out, self.buf = self.buf[:n], self.buf[n:]
+        return out
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+class Command(BaseCommand):
+    help = (
+        "Open N concurrent slow connections against one server process and report how many "
+        "it serves at once: WSGI with a fixed thread pool, ASGI with the sync views, and ASGI "
+        "with the async views. Clients trickle their request body over --upload-seconds; "
+        "for --endpoint request, each email send also blocks for --smtp-seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=100)
+        parser.add_argument("--endpoint", choices=("upload", "request"), default="upload")
+        parser.add_argument("--upload-seconds", type=float, default=1.0, help="time each client takes to send its body")
+        parser.add_argument("--chunks", type=int, default=5, help="pieces each body is sent in")
+        parser.add_argument("--smtp-seconds", type=float, default=0.5)
+        parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads (gunicorn --threads)")
+        parser.add_argument("--modes", default=",".join(MODES))
+        parser.add_argument("--json", action="store_true", help="print the report as JSON")
+
+    def handle(self, *args, **options):
+        global SMTP_SECONDS
+        SMTP_SECONDS = options["smtp_seconds"]
+        modes = [m for m in options["modes"].split(",") if m]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s) {sorted(unknown)}; choose from {', '.join(MODES)}")
+
+        report: Dict[str, Dict] = {}
+        with scratch_database(), override_settings(
+            EMAIL_BACKEND=f"{__name__}._SlowSMTPBackend", ALLOWED_HOSTS=["*"]
+        ):
+            candidate = Candidate.objects.create(name="Bench Candidate", primary_email="bench@example.com")
+            path_, body, ctype = self._request(options["endpoint"], candidate.id)
+            pieces = _pieces(body, options["chunks"])
+            delay = options["upload_seconds"] / max(1, len(pieces) - 1)
+            for mode in modes:
+                urls = ASYNC_URLS if mode == "asgi-async" else SYNC_URLS
+                gauge = _InFlight()
+                with override_settings(ROOT_URLCONF=urls):
+                    if mode == "wsgi-sync":
+                        latencies, errors, wall = self._wsgi(path_, pieces, ctype, delay, gauge, options)
+                    else:
+                        latencies, errors, wall = asyncio.run(self._asgi(path_, pieces, ctype, delay, gauge, options))
+                    # sends the async views dispatched finish under the bench settings
+                    aio.drain()
+                report[mode] = {
+                    "connections": options["connections"],
+                    "errors": errors,
+                    "wall_s": round(wall, 3),
+                    "per_sec": round(len(latencies) / wall, 1) if wall else 0.0,
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                    # most connections the process was reading/handling at the same moment
+                    "peak_in_flight": gauge.peak,
+                }
+            self._drain_parses()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"{'mode':<11} {'conns':>6} {'err':>4} {'wall_s':>7} {'req/s':>7} {'p50ms':>8} "
+            f"{'p95ms':>8} {'in-flight':>9}"
+        )
+        for mode, r in report.items():
+            self.stdout.write(
+                f"{mode:<11} {r['connections']:>6} {r['errors']:>4} {r['wall_s']:>7} {r['per_sec']:>7} "
+                f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['peak_in_flight']:>9}"
+            )
+
+    def _request(self, endpoint: str, candidate_id: int) -> Tuple[str, bytes, str]:
+        if endpoint == "upload":
+            pdf = render_pdf([["Bench Resume", "Software Engineer", "bench@example.com", "python django"]])
+            body, ctype = _multipart({"file": ("resume.pdf", pdf, "application/pdf")})
+            return "/api/candidates/upload", body, ctype
+        body = json.dumps({"channel": "EMAIL"}).encode()
+        return f"/api/candidates/{candidate_id}/request-documents", body, "application/json"
+
+    def _wsgi(self, path_: str, pieces: List[bytes], ctype: str, delay: float, gauge: "_InFlight", options):
+        app = WSGIHandler()
+        body_len = sum(len(p) for p in pieces)
+
+        def one() -> Tuple[float, bool]:
+            status: List[str] = []
+            environ = {
+                "REQUEST_METHOD": "POST", "PATH_INFO": path_, "SCRIPT_NAME": "", "QUERY_STRING": "",
+                "CONTENT_TYPE": ctype, "CONTENT_LENGTH": str(body_len), "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": "testserver",
+                "wsgi.input": _SlowInput(pieces, delay), "wsgi.url_scheme": "http", "wsgi.errors": io.StringIO(),
+                "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False, "wsgi.version": (1, 0),
+            }
+            with gauge:
+                response = app(environ, lambda s, headers, exc_info=None: status.append(s))
+                b"".join(response)
+                response.close()
+            return time.perf_counter(), status[0].startswith("201")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            futures = [pool.submit(one) for _ in range(options["connections"])]
+            results = [f.result() for f in futures]
+        wall = time.perf_counter() - started
+        # every client connects at the start, so waiting for a free thread counts against latency
+        return [done - started for done, _ in results], sum(1 for _, ok in results if not ok), wall
+
+    async def _asgi(self, path_: str, pieces: List[bytes], ctype: str, delay: float, gauge: "_InFlight", options):
+        app = ASGIHandler()
+        body_len = sum(len(p) for p in pieces)
+
+        async def one() -> Tuple[float, bool]:
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                "scheme": "http", "path": path_, "raw_path": path_.encode(), "query_string": b"", "root_path": "",
+                "headers": [
+                    (b"host", b"testserver"), (b"content-type", ctype.encode()),
+                    (b"content-length", str(body_len).encode()),
+                ],
+                "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+            }
+            remaining = list(pieces)
+            status: List[int] = []
+
+            async def receive():
+                if remaining:
+                    if len(remaining) < len(pieces):
+                        await asyncio.sleep(delay)
+                    piece = remaining.pop(0)
+                    return {"type": "http.request", "body": piece, "more_body": bool(remaining)}
+                # the handler keeps listening for a disconnect while it responds
+                await asyncio.Future()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+
+            with gauge:
+                await app(scope, receive, send)
+            return time.perf_counter(), status[0] == 201
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(options["connections"])))
+        wall = time.perf_counter() - started
+        return [done - started for done, _ in results], sum(1 for _, ok in results if not ok), wall
+
+    def _drain_parses(self, timeout: float = 60.0) -> None:
+        """Let background parses started by uploads finish before the scratch DB goes away."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not Resume.objects.filter(status=Resume.Status.PARSING).exists():
+                return
+            time.sleep(0.2)
+
+
+
+class _InFlight:
+    """Count of requests inside the server right now, and the highest it reached."""
+
+    def __init__(self) -> None:
+        self.now = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "_InFlight":
+        with self._lock:
+            self.now += 1
+            self.peak = max(self.peak, self.now)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with self._lock:
+            self.now -= 1
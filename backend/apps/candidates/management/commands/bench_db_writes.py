@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+from apps.candidates import writes
+from apps.candidates.benchmarking import render_pdf, scratch_database, summarize
+from apps.candidates.models import Candidate, Resume
+from apps.candidates.parsing import parse_resume
+
+SAMPLE_LINES = [
+    "Asha Verma",
+    "Senior Software Engineer",
+    "asha.verma@example.com  +91 98765 43210",
+    "Experience",
+    "Backend Engineer at Acme Analytics Pvt Ltd",
+    "Built django, postgres, redis and celery services on aws.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run parse_resume from N concurrent workers against a scratch database and report "
+        "write throughput and lock failures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument("--per-worker", type=int, default=25, help="resumes parsed by each worker")
+        parser.add_argument(
+            "--untuned", action="store_true",
+            help="drop the SQLite connection OPTIONS (WAL, busy_timeout, ...) for comparison",
+        )
+        parser.add_argument(
+            "--write-mode", choices=("immediate", "batch"), default=None,
+            help="override settings.PARSE_WRITE_MODE; batch also honours the two options below",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--flush-seconds", type=float, default=None)
+
+    def handle(self, *args, **options):
+        pdf = render_pdf([SAMPLE_LINES])
+        overrides = {
+            name: options[opt]
+            for name, opt in (
+                ("PARSE_WRITE_MODE", "write_mode"),
+                ("PARSE_WRITE_BATCH_SIZE", "batch_size"),
+                ("PARSE_WRITE_FLUSH_SECONDS", "flush_seconds"),
+            )
+            if options[opt] is not None
+        }
+        with override_settings(**overrides):
+            for workers in options["workers"]:
+                with scratch_database(options={} if options["untuned"] else None):
+                    self._report(workers, self._run(workers, options["per_worker"], pdf))
+
+    def _seed(self, n: int, pdf: bytes) -> List[int]:
+        candidates = Candidate.objects.bulk_create(
+            [Candidate(extraction_status=Candidate.ExtractionStatus.PARSING) for _ in range(n)]
+        )
+        name = default_storage.save("resumes/bench/resume.pdf", ContentFile(pdf))
+        # bulk_create skips post_save, so the parse-on-create signal does not fire
+        resumes = Resume.objects.bulk_create(
+            [
+                Resume(
+                    candidate=c, file=name, original_name="resume.pdf",
+                    mime_type="application/pdf", size_bytes=len(pdf), status=Resume.Status.PARSING,
+                )
+                for c in candidates
+            ]
+        )
+        return [r.id for r in resumes]
+
+    def _run(self, workers: int, per_worker: int, pdf: bytes) -> Dict:
+        ids = self._seed(workers * per_worker, pdf)
+        latencies: List[float] = []
+        errors: Dict[str, int] = {}
+        lock = threading.Lock()
+
+        def work(chunk: List[int]) -> None:
+            try:
+                for rid in chunk:
+                    t0 = time.perf_counter()
+                    try:
+                        parse_resume(rid)
+                    except Exception as e:  # noqa: BLE001 - failures are what we measure
+                        with lock:
+                            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - t0)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=work, args=(ids[i::workers],)) for i in range(workers)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # batch mode: results still buffered count towards the run
+        writes.flush()
+        wall = time.perf_counter() - started
+
+        stats = summarize(latencies, wall)
+        stats["workers"] = workers
+        stats["errors"] = errors
+        stats["parsed"] = Resume.objects.filter(status=Resume.Status.PARSED).count()
+        stats["failed"] = Resume.objects.filter(status=Resume.Status.FAILED).count()
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cur:
+                stats["journal_mode"] = cur.execute("PRAGMA journal_mode").fetchone()[0]
+        return stats
+
+    def _report(self, workers: int, stats: Dict) -> None:
+        self.stdout.write(
+            f"workers={workers:<3} parsed={stats['parsed']:<5} failed={stats['failed']:<4} "
+            f"resumes/s={stats['per_sec']:<8} p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms "
+            f"journal={stats.get('journal_mode', '-')} writes={settings.PARSE_WRITE_MODE} "
+            f"errors={stats['errors'] or '-'}"
+        )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import io
+import json
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.candidates.benchmarking import scratch_database, summarize
+from apps.candidates import formats
+from apps.candidates.corpus import ALL_FORMATS, CorpusDoc, generate_corpus
+from apps.candidates.models import Candidate, Resume
+from apps.candidates.parsing import (
+    extract_fields_heuristics,
+    extract_text_from_docx,
+    extract_text_from_pdf,
+    parse_resume,
+)
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "parser_baseline.json"
+STAGES = ("pdf_text", "docx_text", "formats", "heuristics", "end_to_end")
+
+
+def _timed(items: List, fn: Callable) -> Dict:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _end_to_end(docs: List[CorpusDoc]) -> Dict:
+    with scratch_database():
+        resumes = []
+        for d in docs:
+            cand = Candidate.objects.create(extraction_status=Candidate.ExtractionStatus.PARSING)
+            name = default_storage.save(f"resumes/bench/{d.name}", ContentFile(d.data))
+            resumes.append(Resume(candidate=cand, file=name, original_name=d.name, size_bytes=len(d.data)))
+        # bulk_create skips the parse-on-create signal; we call parse_resume ourselves
+        ids = [r.id for r in Resume.objects.bulk_create(resumes)]
+        return _timed(ids, parse_resume)
+
+
+def _accuracy(docs: List[CorpusDoc], texts: List[str]) -> Dict[str, float]:
+    """Share of documents where each expected field came out exactly right."""
+    hits: Dict[str, int] = {}
+    for d, text in zip(docs, texts):
+        result = extract_fields_heuristics(text)
+        for field, want in d.expected.items():
+            hits[field] = hits.get(field, 0) + (result.get(field) == want)
+    return {field: round(n / len(docs), 3) for field, n in sorted(hits.items())}
+
+
+def _formats(n: int, seed: int) -> Dict:
+    """
+    Sniff and extract every upload format (each handler whose dependencies are installed),
+    and the share of expected fields heuristics get right, per format.
+    """
+    docs = [d for d in generate_corpus(n, seed=seed, formats=ALL_FORMATS) if d.fmt in formats.available_formats()]
+    texts: Dict[str, List] = {}
+    for fmt in {d.fmt for d in docs}:
+        formats.get_handler(fmt)  # handlers import lazily; keep that out of the timings
+
+    def read(d: CorpusDoc) -> None:
+        fmt = formats.sniff(d.data)
+        if fmt != d.fmt:
+            raise CommandError(f"{d.name} sniffed as {fmt}")
+        headings: set = set()
+        texts[d.name] = (formats.extract(d.data, fmt, headings=headings), headings)
+
+    stats = _timed(docs, read)
+    right: Dict[str, List[int]] = {}
+    for d in docs:
+        result = extract_fields_heuristics(texts[d.name][0], headings=texts[d.name][1])
+        tally = right.setdefault(d.fmt, [0, 0])
+        tally[0] += sum(result.get(field) == want for field, want in d.expected.items())
+        tally[1] += len(d.expected)
+    stats["accuracy"] = {fmt: round(ok / total, 3) for fmt, (ok, total) in sorted(right.items())}
+    return stats
+
+
+def _run_stage(stage: str, n: int, seed: int, out) -> None:
+    """Child-process body: build the inputs, time the stage, report peak RSS."""
+    docs = list(generate_corpus(n, seed=seed))
+    pdfs = [d.data for d in docs if d.fmt == "pdf"]
+    docxs = [d.data for d in docs if d.fmt == "docx"]
+    if stage == "formats":
+        stats = _formats(n, seed)
+    elif stage == "pdf_text":
+        stats = _timed(pdfs, lambda b: extract_text_from_pdf(io.BytesIO(b)))
+    elif stage == "docx_text":
+        stats = _timed(docxs, lambda b: extract_text_from_docx(io.BytesIO(b)))
+    elif stage == "heuristics":
+        read = {"pdf": extract_text_from_pdf, "docx": extract_text_from_docx}
+        texts = [read[d.fmt](io.BytesIO(d.data)) for d in docs]
+        stats = _timed(texts, extract_fields_heuristics)
+        stats["accuracy"] = _accuracy(docs, texts)
+    else:
+        stats = _end_to_end(docs)
+    stats["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    out.send(stats)
+    out.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark text extraction, heuristics and end-to-end parse_resume over a synthetic "
+        "corpus; report docs/sec, p50/p99 and peak RSS per stage (and field accuracy for "
+        "heuristics, per upload format for formats) and compare to a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=60)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="allowed relative slowdown in docs/sec or p99 before failing (default 0.25)",
+        )
+        parser.add_argument("--write-corpus", type=Path, help="also dump the corpus files to this directory")
+
+    def handle(self, *args, **options):
+        if options["write_corpus"]:
+            options["write_corpus"].mkdir(parents=True, exist_ok=True)
+            for d in generate_corpus(options["docs"], seed=options["seed"]):
+                (options["write_corpus"] / d.name).write_bytes(d.data)
+
+        results: Dict[str, Dict] = {}
+        ctx = multiprocessing.get_context("fork")
+        for stage in options["stages"]:
+            # one fresh process per stage so peak RSS is attributable to that stage
+            connections.close_all()
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_run_stage, args=(stage, options["docs"], options["seed"], send))
+            proc.start()
+            send.close()
+            try:
+                stats = recv.recv()
+            except EOFError:
+                raise CommandError(f"Stage {stage} crashed (exit code {proc.exitcode}).")
+            finally:
+                proc.join()
+            results[stage] = stats
+            self.stdout.write(
+                f"{stage:<11} docs/s={stats['per_sec']:<9} p50={stats['p50_ms']:<9}ms "
+                f"p99={stats['p99_ms']:<9}ms peak_rss={stats['peak_rss_mb']}MB (n={stats['count']})"
+            )
+            if "accuracy" in stats:
+                self.stdout.write("  accuracy " + " ".join(f"{k}={v}" for k, v in stats["accuracy"].items()))
+
+        baseline_path: Path = options["baseline"]
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"docs": options["docs"], "seed": options["seed"], "stages": results}
+            baseline_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline written to {baseline_path}")
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline to record one.")
+            return
+
+        baseline = json.loads(baseline_path.read_text())["stages"]
+        regressions = self._compare(results, baseline, options["tolerance"])
+        if regressions:
+            raise CommandError("Parser performance regressed:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("Within tolerance of baseline."))
+
+    def _compare(self, results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+        problems = []
+        for stage, now in results.items():
+            base = baseline.get(stage)
+            if not base:
+                continue
+            if base["per_sec"] and now["per_sec"] < base["per_sec"] * (1 - tolerance):
+                problems.append(f"{stage}: docs/s {now['per_sec']} < baseline {base['per_sec']}")
+            if base["p99_ms"] and now["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+                problems.append(f"{stage}: p99 {now['p99_ms']}ms > baseline {base['p99_ms']}ms")
+            accuracy = now.get("accuracy", {})
+            for field, was in base.get("accuracy", {}).items():
+                # accuracy is deterministic for a given corpus: any drop is a regression
+                if accuracy.get(field, 0.0) < was:
+                    problems.append(f"{stage}: {field} accuracy {accuracy.get(field, 0.0)} < baseline {was}")
+        return problems
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+import random
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import phonenumbers
+from django.core.management.base import BaseCommand
+
+from apps.candidates.benchmarking import summarize
+from apps.candidates.corpus import generate_corpus
+from apps.candidates.extractors.phone import find_phone_numbers, first_phone_number
+from apps.candidates.parsing import extract_text_from_docx, extract_text_from_pdf
+
+# Extra contact lines mixed into the corpus so multi-number and foreign cases are exercised.
+EXTRA_CONTACTS = [
+    "Alternate: 080-4123 5678",
+    "US cell: +1 (415) 555-2671",
+    "Office +44 20 7946 0958",
+    "Home 022 2345 6789 / 98200 12345",
+]
+
+
+def full_text_first(text: str) -> Optional[str]:
+    """The previous approach: PhoneNumberMatcher over the whole text, first hit wins."""
+    for match in phonenumbers.PhoneNumberMatcher(text, "IN"):
+        return phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
+    return None
+
+
+def full_text_all(text: str) -> Set[str]:
+    """PhoneNumberMatcher over the whole text, collecting every number."""
+    return {
+        phonenumbers.format_number(m.number, phonenumbers.PhoneNumberFormat.E164)
+        for m in phonenumbers.PhoneNumberMatcher(text, "IN")
+    }
+
+
+def prefiltered(text: str) -> Set[str]:
+    return {p.number for p in find_phone_numbers(text)}
+
+
+def prefiltered_first(text: str) -> Optional[str]:
+    match = first_phone_number(text)
+    return match.number if match else None
+
+
+def _timed(texts: List[str], fn: Callable[[str], object]) -> Dict:
+    latencies = []
+    started = time.perf_counter()
+    for t in texts:
+        t0 = time.perf_counter()
+        fn(t)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare regex-prefiltered phone extraction with PhoneNumberMatcher over the full "
+        "text (first hit, and all numbers) on the synthetic corpus: docs/sec, p50/p99 and "
+        "whether both find the same numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=60)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=3, help="timing passes per engine (best is reported)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        texts: List[str] = []
+        for d in generate_corpus(options["docs"], seed=options["seed"]):
+            buf = io.BytesIO(d.data)
+            text = extract_text_from_pdf(buf) if d.fmt == "pdf" else extract_text_from_docx(buf)
+            if rng.random() < 0.5:
+                text = text + "\n" + "\n".join(rng.sample(EXTRA_CONTACTS, k=rng.randint(1, 2)))
+            texts.append(text)
+        self.stdout.write(
+            f"{len(texts)} docs, mean {sum(map(len, texts)) // max(1, len(texts))} chars"
+        )
+
+        engines = {
+            "first_hit": full_text_first,
+            "prefilter_first": prefiltered_first,
+            "full_text": full_text_all,
+            "prefilter": prefiltered,
+        }
+        results = {}
+        for name, fn in engines.items():
+            runs = [_timed(texts, fn) for _ in range(max(1, options["repeat"]))]
+            results[name] = max(runs, key=lambda r: r["per_sec"])
+            r = results[name]
+            self.stdout.write(f"{name:<15} docs/s={r['per_sec']:<9} p50={r['p50_ms']:<8}ms p99={r['p99_ms']}ms")
+
+        same_first = sum(1 for t in texts if full_text_first(t) == prefiltered_first(t))
+        same_sets = sum(1 for t in texts if full_text_all(t) == prefiltered(t))
+        found = sum(len(prefiltered(t)) for t in texts)
+
+        def ratio(new: str, old: str) -> float:
+            base = results[old]["per_sec"]
+            return results[new]["per_sec"] / base if base else 0.0
+
+        self.stdout.write(
+            f"prefilter_first vs first_hit (the phone field): x{ratio('prefilter_first', 'first_hit'):.1f} "
+            f"docs/s; same number on {same_first}/{len(texts)} docs"
+        )
+        self.stdout.write(
+            f"prefilter vs full_text (the phones field): x{ratio('prefilter', 'full_text'):.1f} docs/s; "
+            f"identical number sets on {same_sets}/{len(texts)} docs; {found} numbers found"
+        )
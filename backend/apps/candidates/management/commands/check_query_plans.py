@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import QuerySet
+
+from apps.candidates.models import Candidate, Extraction, Resume
+from apps.documents.models import Document, DocumentRequest
+
+
+def hot_queries() -> List[Tuple[str, Callable[[], QuerySet]]]:
+    """The queries that list/detail views, dashboards and the portal issue on every hit."""
+    return [
+        ("candidate list page", lambda: Candidate.objects.order_by("-created_at")[:25]),
+        ("candidates by status", lambda: Candidate.objects.filter(extraction_status=Candidate.ExtractionStatus.PARSING)),
+        ("latest extraction", lambda: Extraction.objects.filter(candidate_id=1).order_by("-created_at")[:1]),
+        ("resumes by status", lambda: Resume.objects.filter(status=Resume.Status.PARSING)),
+        ("documents by candidate+kind", lambda: Document.objects.filter(candidate_id=1, kind=Document.Kind.PAN)),
+        ("portal token lookup", lambda: DocumentRequest.objects.filter(magic_token="x")),
+    ]
+
+
+def plan_problems(plan: str, vendor: str) -> List[str]:
+    """Return the reasons a plan is not index-backed (empty list = ok)."""
+    problems: List[str] = []
+    if vendor == "sqlite":
+        for line in plan.splitlines():
+            if "SCAN" in line and "USING" not in line:
+                problems.append(f"full scan: {line.strip()}")
+            if "USE TEMP B-TREE" in line:
+                problems.append(f"sort without index: {line.strip()}")
+    elif vendor == "postgresql":
+        if "Seq Scan" in plan:
+            problems.append("sequential scan")
+        if "Sort" in plan and "Index" not in plan:
+            problems.append("sort without index")
+    return problems
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN each hot query and fail if any of them is not served by an index."
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Plan checks are not implemented for {vendor}.")
+
+        if vendor == "postgresql":
+            # Tiny tables make seq scans cheapest; force the planner to show what it
+            # would do at scale.
+            with connection.cursor() as cur:
+                cur.execute("SET enable_seqscan = off")
+
+        failed = 0
+        for label, build in hot_queries():
+            plan = build().explain()
+            problems = plan_problems(plan, vendor)
+            if problems:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {label}: {'; '.join(problems)}"))
+                self.stdout.write(plan)
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok   {label}"))
+                if options["verbosity"] > 1:
+                    self.stdout.write(plan)
+
+        if failed:
+            raise CommandError(f"{failed} hot query plan(s) are not index-backed.")
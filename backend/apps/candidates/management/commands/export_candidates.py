@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.candidates import export
+from apps.candidates.models import Candidate
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every candidate with its latest extraction to a CSV, JSONL or Parquet file "
+        "in constant memory. Email and phone are masked unless --no-mask is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=export.FORMATS, default="csv")
+        parser.add_argument("--output", "-o", default="-", help="file to write, or - for stdout (default)")
+        parser.add_argument("--status", choices=Candidate.ExtractionStatus.values, default=None)
+        parser.add_argument("--no-mask", action="store_true", help="write email/phone unmasked")
+        parser.add_argument("--chunk-size", type=int, default=export.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        fmt = options["format"]
+        try:
+            body = export.stream_export(
+                fmt, status=options["status"], masked=not options["no_mask"], chunk_size=options["chunk_size"]
+            )
+        except export.ExportError as e:
+            raise CommandError(str(e))
+
+        to_stdout = options["output"] == "-"
+        out = sys.stdout.buffer if to_stdout else open(options["output"], "wb")
+        started = time.perf_counter()
+        written = 0
+        try:
+            for piece in body:
+                out.write(piece)
+                written += len(piece)
+        finally:
+            if to_stdout:
+                out.flush()
+            else:
+                out.close()
+        if not to_stdout:
+            elapsed = time.perf_counter() - started
+            self.stderr.write(f"Wrote {written / 1e6:.1f} MB of {fmt} to {options['output']} in {elapsed:.1f}s.")
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.utils import timezone
+
+from apps.candidates import scheduler, writes
+from apps.candidates.benchmarking import percentile, render_pdf, scratch_database, summarize
+from apps.candidates.models import Candidate, Extraction
+
+ENDPOINTS = ("list", "detail", "upload", "submit")
+DEFAULT_MIX = "list=50,detail=35,upload=10,submit=5"
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args, **kwargs) -> None:
+        pass
+
+
+class _QueryCountingApp:
+    """WSGI wrapper that tallies DB queries per endpoint on the request thread."""
+
+    def __init__(self, app: WSGIHandler, classify: Callable[[str, str], str]) -> None:
+        self.app = app
+        self.classify = classify
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        count = [0]
+
+        def counter(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            response = self.app(environ, start_response)
+        with self._lock:
+            self.queries[self.classify(environ["REQUEST_METHOD"], environ["PATH_INFO"])].append(count[0])
+        return response
+
+
+def _classify(method: str, path: str) -> str:
+    if path.endswith("/upload"):
+        return "upload"
+    if path.endswith("/submit-documents"):
+        return "submit"
+    if path.rstrip("/").endswith("/candidates"):
+        return "list"
+    return "detail"
+
+
+def _multipart(fields: Dict[str, Tuple[str, bytes, str]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, (filename, data, ctype) in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {ctype}\r\n\r\n".encode() + data + b"\r\n"
+        )
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N candidates into a scratch database, start the API in-process and drive mixed "
+        "list/detail/upload/submit traffic; report throughput, latency percentiles and DB "
+        "queries per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed-candidates", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=15.0, help="seconds of traffic")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+        parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+        parser.add_argument("--json", action="store_true", help="print the report as JSON")
+
+    def handle(self, *args, **options):
+        mix = self._parse_mix(options["mix"])
+        with scratch_database():
+            ids = self._seed(options["seed_candidates"])
+            app = _QueryCountingApp(WSGIHandler(), _classify)
+            server = ThreadedWSGIServer(("127.0.0.1", options["port"]), _QuietHandler)
+            server.set_app(app)
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+            server_thread.start()
+            try:
+                samples, wall = self._drive(base, ids, mix, options["concurrency"], options["duration"])
+            finally:
+                server.shutdown()
+                server.server_close()
+            self._drain_parses()
+            report = self._report(samples, app.queries, wall)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"{'endpoint':<8} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50ms':>8} "
+            f"{'p95ms':>8} {'p99ms':>8} {'q/req':>6}"
+        )
+        for name, r in report.items():
+            self.stdout.write(
+                f"{name:<8} {r['count']:>6} {r['errors']:>4} {r['per_sec']:>8} {r['p50_ms']:>8} "
+                f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['queries_per_request']:>6}"
+            )
+
+    def _parse_mix(self, raw: str) -> Dict[str, int]:
+        mix = {}
+        for part in raw.split(","):
+            name, _, weight = part.partition("=")
+            if name not in ENDPOINTS or not weight.isdigit():
+                raise CommandError(f"Bad --mix entry {part!r}; use e.g. {DEFAULT_MIX}")
+            mix[name] = int(weight)
+        return mix
+
+    def _seed(self, n: int) -> List[int]:
+        now = timezone.now()
+        cands = Candidate.objects.bulk_create(
+            [
+                Candidate(
+                    name=f"Seed Candidate {i}", primary_email=f"seed{i}@example.com",
+                    primary_phone=f"+9198{i:08d}", latest_company="Acme Analytics",
+                    designation="Software Engineer", extraction_status=Candidate.ExtractionStatus.PARSED,
+                )
+                for i in range(n)
+            ],
+            batch_size=500,
+        )
+        Extraction.objects.bulk_create(
+            [
+                Extraction(
+                    candidate=c, status=Extraction.Status.COMPLETED, completed_at=now,
+                    fields_json={"name": c.name, "skills": ["python", "django"]},
+                    confidences_json={"name": 0.6, "skills": {"python": 0.85, "django": 0.85}},
+                )
+                for c in cands
+            ],
+            batch_size=500,
+        )
+        return [c.id for c in cands]
+
+    def _drive(self, base: str, ids: List[int], mix: Dict[str, int], concurrency: int, duration: float):
+        pdf = render_pdf([["Load Test", "Software Engineer", "load@example.com", "python django"]])
+        names, weights = zip(*mix.items())
+        samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def request_for(kind: str, rng: random.Random) -> urllib.request.Request:
+            if kind == "list":
+                page = rng.randint(1, max(1, len(ids) // 25))
+                return urllib.request.Request(f"{base}/api/candidates?page={page}")
+            if kind == "detail":
+                return urllib.request.Request(f"{base}/api/candidates/{rng.choice(ids)}")
+            if kind == "upload":
+                body, ctype = _multipart({"file": ("resume.pdf", pdf, "application/pdf")})
+                return urllib.request.Request(
+                    f"{base}/api/candidates/upload", data=body, headers={"Content-Type": ctype}
+                )
+            body, ctype = _multipart({"pan_file": ("pan.pdf", pdf, "application/pdf")})
+            return urllib.request.Request(
+                f"{base}/api/candidates/{rng.choice(ids)}/submit-documents",
+                data=body, headers={"Content-Type": ctype},
+            )
+
+        def client(seed: int) -> None:
+            rng = random.Random(seed)
+            local: List[Tuple[str, float, bool]] = []
+            while time.monotonic() < deadline:
+                kind = rng.choices(names, weights)[0]
+                req = request_for(kind, rng)
+                t0 = time.perf_counter()
+                ok = True
+                try:
+                    with urllib.request.urlopen(req, timeout=30) as resp:
+                        resp.read()
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                local.append((kind, time.perf_counter() - t0, ok))
+            with lock:
+                for kind, latency, ok in local:
+                    samples[kind].append((latency, ok))
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return samples, time.perf_counter() - started
+
+    def _drain_parses(self, timeout: float = 120.0) -> None:
+        """
+        Let the parses queued by uploads finish, and their buffered outcomes be written,
+        before the scratch DB goes away; otherwise a parse still running in a forked child
+        is killed at exit and logged as a crash.
+        """
+        if not scheduler.drain(timeout):
+            self.stderr.write(f"Parses still queued or running after {timeout:.0f}s; tearing down anyway.")
+        writes.flush()
+
+    def _report(self, samples, queries: Dict[str, List[int]], wall: float) -> Dict[str, Dict]:
+        report = {}
+        for kind in ENDPOINTS:
+            if kind not in samples:
+                continue
+            latencies = [lat for lat, _ in samples[kind]]
+            row = summarize(latencies, wall)
+            row["errors"] = sum(1 for _, ok in samples[kind] if not ok)
+            row["p95_ms"] = round(percentile(latencies, 95) * 1000, 3)
+            counts = queries.get(kind, [])
+            row["queries_per_request"] = round(sum(counts) / len(counts), 1) if counts else 0
+            report[kind] = row
+        return report
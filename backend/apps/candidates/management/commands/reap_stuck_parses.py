@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.candidates import writes
+from apps.candidates.parsing import parse_resume
+from apps.candidates.watchdog import reap_stuck
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-parse resumes stuck in PARSING for longer than PARSE_STUCK_SECONDS (failing them "
+        "after PARSE_MAX_ATTEMPTS attempts) and settle candidates left PARSING. Server "
+        "processes do this every PARSE_WATCHDOG_INTERVAL_SECONDS; run it from cron when that is 0."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stuck-seconds", type=float, default=None, help="override PARSE_STUCK_SECONDS")
+        parser.add_argument("--dry-run", action="store_true", help="report what would be done without doing it")
+
+    def handle(self, *args, **options):
+        # requeued resumes are parsed here, one after another, before the command exits
+        done = reap_stuck(stuck_seconds=options["stuck_seconds"], dry_run=options["dry_run"], requeue=parse_resume)
+        writes.flush()
+        prefix = "Would have " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}requeued {done.get('requeued', 0)}, failed {done.get('failed', 0)} and settled "
+            f"{done.get('settled', 0)} candidate(s)."
+        )
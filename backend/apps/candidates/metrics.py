@@ -0,0 +1,259 @@
+"""
+In-process metrics for the parse pipeline, rendered in the Prometheus text format at
+/metrics. Values are per process; scrape every worker (or sum them) when running more
+than one.
+"""
+from __future__ import annotations
+
+import bisect
+import contextlib
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else _fmt_value(bound)
+                labels = _fmt_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets=buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+    def _counters(self) -> List[Counter]:
+        with self._lock:
+            return [m for m in self._metrics.values() if isinstance(m, Counter)]
+
+    def counter_values(self) -> Dict[str, Dict[LabelKey, float]]:
+        return {c.name: dict(c._values) for c in self._counters()}
+
+    def counter_deltas(self, before: Dict[str, Dict[LabelKey, float]]) -> Dict[str, Dict[LabelKey, float]]:
+        """How much each counter grew since before (a counter_values() result)."""
+        deltas: Dict[str, Dict[LabelKey, float]] = {}
+        for name, values in self.counter_values().items():
+            old = before.get(name, {})
+            grown = {key: v - old.get(key, 0) for key, v in values.items() if v != old.get(key, 0)}
+            if grown:
+                deltas[name] = grown
+        return deltas
+
+    def add_counter_deltas(self, deltas: Dict[str, Dict[LabelKey, float]]) -> None:
+        """Fold in counts made elsewhere, e.g. by a parse stage run in a child process."""
+        counters = {c.name: c for c in self._counters()}
+        for name, values in deltas.items():
+            counter = counters.get(name)
+            if counter is None:
+                continue
+            for key, amount in values.items():
+                counter.inc(amount, **dict(zip(counter.labelnames, key)))
+
+    def _after_fork(self) -> None:
+        # a lock held by another thread at fork() would stay held forever in the child
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+
+
+REGISTRY = Registry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY._after_fork)
+
+PARSE_STAGE_SECONDS = REGISTRY.histogram(
+    "resume_parse_stage_seconds", "Time spent in each parse stage.", ["stage"]
+)
+PARSE_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "resume_parse_queue_wait_seconds", "Time between queueing a resume and a worker picking it up, by priority class.",
+    ["priority"], buckets=DEFAULT_BUCKETS + (120.0, 300.0, 900.0, 1800.0, 3600.0),
+)
+PARSE_QUEUE_DEPTH = REGISTRY.gauge("resume_parse_queue_depth", "Resumes waiting for a parse worker.", ["priority"])
+PARSE_REJECTED_TOTAL = REGISTRY.counter(
+    "resume_parse_rejected_total", "Uploads refused because their priority class's queue was full.", ["priority"]
+)
+PARSES_TOTAL = REGISTRY.counter("resume_parses_total", "Finished parses by outcome.", ["status"])
+PARSE_FAILURES_TOTAL = REGISTRY.counter(
+    "resume_parse_failures_total", "Failed parses by stage and exception type.", ["stage", "exception"]
+)
+PARSE_BYTES_TOTAL = REGISTRY.counter(
+    "resume_parse_bytes_total", "Resume bytes read for text extraction, by detected format.", ["format"]
+)
+TEXT_EXTRACT_SECONDS_TOTAL = REGISTRY.counter(
+    "resume_text_extract_seconds_total", "Time spent in each format's text extraction handler.", ["format"]
+)
+TEXT_EXTRACT_CHARS_TOTAL = REGISTRY.counter(
+    "resume_text_extract_chars_total", "Characters of text produced by each format's handler.", ["format"]
+)
+PARSE_PAGES_TOTAL = REGISTRY.counter("resume_parse_pages_total", "Document pages processed.", ["format"])
+LLM_TOKENS_TOTAL = REGISTRY.counter("resume_llm_tokens_total", "LLM tokens used by extraction.", ["kind"])
+PARSE_WRITE_BATCH_ROWS = REGISTRY.histogram(
+    "resume_parse_write_batch_rows", "Parse results committed per write transaction.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+PARSE_TIMEOUTS_TOTAL = REGISTRY.counter(
+    "resume_parse_timeouts_total", "Parse stages stopped at their deadline, by stage and how the work was stopped.",
+    ["stage", "action"],
+)
+PARSE_RECOVERIES_TOTAL = REGISTRY.counter(
+    "resume_parse_recoveries_total", "Parses found stuck in PARSING by the watchdog, by what was done.", ["action"]
+)
+PDF_PREFLIGHT_TOTAL = REGISTRY.counter(
+    "resume_pdf_preflight_total", "PDFs inspected before parsing, by route (normal, constrained, rejected).", ["route"]
+)
+OCR_PAGES_TOTAL = REGISTRY.counter("ocr_pages_total", "Page images recognised by Tesseract.")
+OCR_CACHE_TOTAL = REGISTRY.counter("ocr_cache_total", "OCR cache lookups by result.", ["result"])
+
+
+@contextlib.contextmanager
+def stage_timer(stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """Observe the block's duration in PARSE_STAGE_SECONDS and, if given, timings[f"{stage}_ms"]."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        PARSE_STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[f"{stage}_ms"] = round(elapsed * 1000, 2)
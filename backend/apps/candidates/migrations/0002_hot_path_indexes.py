@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="candidate",
+            index=models.Index(fields=["-created_at"], name="cand_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=models.Index(fields=["extraction_status"], name="cand_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="extraction",
+            index=models.Index(fields=["candidate", "-created_at"], name="extr_cand_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="resume",
+            index=models.Index(fields=["status"], name="resume_status_idx"),
+        ),
+    ]
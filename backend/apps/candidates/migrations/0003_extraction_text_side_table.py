@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:00
+
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copies of the codec in apps/candidates/models.py as of this migration, so later
+# changes to the live helpers cannot change what this migration writes or reads back.
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:  # optional; zlib is used when it is missing
+        return None
+    return zstandard
+
+
+def compress_text(text):
+    raw = (text or "").encode("utf-8")
+    zstd = _zstd()
+    if zstd is not None:
+        return "zstd", zstd.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress_text(codec, data):
+    data = bytes(data or b"")
+    if not data:
+        return ""
+    if codec == "zstd":
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read this extraction text")
+        return zstd.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def move_raw_text_out(apps, schema_editor):
+    Extraction = apps.get_model("candidates", "Extraction")
+    ExtractionText = apps.get_model("candidates", "ExtractionText")
+    batch = []
+    rows = Extraction.objects.exclude(raw_text="").values_list("id", "raw_text")
+    for ex_id, text in rows.iterator(chunk_size=500):
+        codec, data = compress_text(text)
+        batch.append(ExtractionText(extraction_id=ex_id, codec=codec, data=data, size_chars=len(text)))
+        if len(batch) >= 500:
+            ExtractionText.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ExtractionText.objects.bulk_create(batch)
+
+
+def move_raw_text_back(apps, schema_editor):
+    Extraction = apps.get_model("candidates", "Extraction")
+    ExtractionText = apps.get_model("candidates", "ExtractionText")
+    for t in ExtractionText.objects.iterator(chunk_size=500):
+        Extraction.objects.filter(id=t.extraction_id).update(raw_text=decompress_text(t.codec, t.data))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0002_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExtractionText",
+            fields=[
+                ("extraction", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="text", serialize=False, to="candidates.extraction")),
+                ("codec", models.CharField(choices=[("zlib", "zlib"), ("zstd", "zstd")], default="zlib", max_length=8)),
+                ("data", models.BinaryField(default=b"")),
+                ("size_chars", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(move_raw_text_out, move_raw_text_back),
+        migrations.RemoveField(
+            model_name="extraction",
+            name="raw_text",
+        ),
+    ]
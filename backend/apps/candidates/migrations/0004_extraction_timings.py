@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0003_extraction_text_side_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="extraction",
+            name="timings_json",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
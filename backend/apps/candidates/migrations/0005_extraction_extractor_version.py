@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0004_extraction_timings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="extraction",
+            name="extractor_version",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0005_extraction_extractor_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidateFingerprint",
+            fields=[
+                ("candidate", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="fingerprint", serialize=False, to="candidates.candidate")),
+                ("minhash", models.BinaryField(default=b"")),
+                ("shingles", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="candidate",
+            name="duplicate_of",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="duplicates", to="candidates.candidate"),
+        ),
+        migrations.CreateModel(
+            name="DedupKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("email", "Email"), ("phone", "Phone (E.164)"), ("name_company", "Name + company"), ("minhash", "MinHash LSH band")], max_length=16)),
+                ("value", models.CharField(max_length=255)),
+                ("candidate", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="dedup_keys", to="candidates.candidate")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["kind", "value"], name="dedupkey_kind_value_idx")],
+            },
+        ),
+    ]
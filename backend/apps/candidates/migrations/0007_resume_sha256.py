@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0006_dedup_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="sha256",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH = 1000
+
+# Frozen copy of skill_index.normalize and the extractor's alias map as of this migration,
+# so later changes to either cannot change what this backfill writes.
+NAME_MAX = 100
+SKILL_ALIASES = {"postgres": "postgresql"}
+
+
+def normalize(name):
+    key = " ".join(str(name).split()).lower()
+    return SKILL_ALIASES.get(key, key)[:NAME_MAX]
+
+
+def backfill_skills(apps, schema_editor):
+    """
+    One pass over completed extractions, newest first per candidate: the first row seen
+    for each candidate is its latest, and its skills become CandidateSkill rows.
+    """
+    Extraction = apps.get_model("candidates", "Extraction")
+    Skill = apps.get_model("candidates", "Skill")
+    CandidateSkill = apps.get_model("candidates", "CandidateSkill")
+    skill_ids = {}
+    pending = {}
+
+    def flush():
+        names = {n for skills in pending.values() for n in skills} - set(skill_ids)
+        if names:
+            Skill.objects.bulk_create([Skill(name=n) for n in sorted(names)], ignore_conflicts=True)
+            skill_ids.update(Skill.objects.filter(name__in=names).values_list("name", "id"))
+        CandidateSkill.objects.bulk_create([
+            CandidateSkill(candidate_id=cid, skill_id=skill_ids[name], confidence=conf)
+            for cid, skills in pending.items()
+            for name, conf in skills.items()
+        ])
+        pending.clear()
+
+    rows = (
+        Extraction.objects.filter(status="COMPLETED")
+        .order_by("candidate_id", "-created_at")
+        .values_list("candidate_id", "fields_json", "confidences_json")
+    )
+    last = None
+    for cid, fields, confs in rows.iterator(chunk_size=BATCH):
+        if cid == last:
+            continue
+        last = cid
+        scores = (confs or {}).get("skills") or {}
+        skills = {}
+        for name in (fields or {}).get("skills") or []:
+            key = normalize(name)
+            if key:
+                skills[key] = max(skills.get(key, 0.0), float(scores.get(name, 0.0)))
+        if skills:
+            pending[cid] = skills
+        if len(pending) >= BATCH:
+            flush()
+    if pending:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0007_resume_sha256"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Skill",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CandidateSkill",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("confidence", models.FloatField(default=0.0)),
+                ("candidate", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="candidate_skills", to="candidates.candidate")),
+                ("skill", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="candidate_skills", to="candidates.skill")),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("skill", "candidate"), name="candskill_skill_cand_uniq")],
+            },
+        ),
+        # dropping the tables on reverse is enough
+        migrations.RunPython(backfill_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0008_skill_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="parse_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="parse_started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0009_resume_parse_attempts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="extractiontext",
+            name="headings_json",
+            field=models.JSONField(default=list),
+        ),
+    ]
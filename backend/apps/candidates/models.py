@@ -1,8 +1,35 @@
 from __future__ import annotations
 
+import zlib
+from typing import Collection, Tuple
+
 from django.db import models
 from django.utils import timezone
 
+try:
+    import zstandard as _zstd  # optional; zlib is used when it is missing
+except Exception:
+    _zstd = None
+
+
+def mask_email(value: str) -> str:
+    v = (value or "").strip()
+    if not v or "@" not in v:
+        return ""
+    user, domain = v.split("@", 1)
+    if len(user) <= 1:
+        masked_user = "*"
+    else:
+        masked_user = user[0] + "*" * max(1, len(user) - 1)
+    return f"{masked_user}@{domain}"
+
+
+def mask_phone(value: str) -> str:
+    v = (value or "").strip()
+    if len(v) <= 4:
+        return v
+    return f"{'*' * (len(v) - 4)}{v[-4:]}"
+
 
 class Candidate(models.Model):
     class ExtractionStatus(models.TextChoices):
@@ -19,26 +46,25 @@ class Candidate(models.Model):
     extraction_status = models.CharField(
         max_length=16, choices=ExtractionStatus.choices, default=ExtractionStatus.PENDING
     )
+    # set by dedup (see dedup.py) to the canonical (oldest) record for the same person
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates"
+    )
 
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="cand_created_idx"),
+            models.Index(fields=["extraction_status"], name="cand_status_idx"),
+        ]
+
     def masked_email(self) -> str:
-        v = (self.primary_email or "").strip()
-        if not v or "@" not in v:
-            return ""
-        user, domain = v.split("@", 1)
-        if len(user) <= 1:
-            masked_user = "*"
-        else:
-            masked_user = user[0] + "*" * max(1, len(user) - 1)
-        return f"{masked_user}@{domain}"
+        return mask_email(self.primary_email)
 
     def masked_phone(self) -> str:
-        v = (self.primary_phone or "").strip()
-        if len(v) <= 4:
-            return v
-        return f"{'*' * (len(v) - 4)}{v[-4:]}"
+        return mask_phone(self.primary_phone)
 
     def __str__(self) -> str:
         return self.name or f"Candidate #{self.pk}"
@@ -62,9 +88,18 @@ class Resume(models.Model):
     original_name = models.CharField(max_length=255, blank=True, default="")
     mime_type = models.CharField(max_length=128, blank=True, default="")
     size_bytes = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")  # content address, see apps.storage
 
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
     uploaded_at = models.DateTimeField(default=timezone.now)
+    # the latest parse attempt; the watchdog (watchdog.py) recovers ones that never finish
+    parse_started_at = models.DateTimeField(null=True, blank=True)
+    parse_attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="resume_status_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Resume {self.original_name} for {self.candidate_id}"
@@ -83,14 +118,153 @@ class Extraction(models.Model):
         Resume, on_delete=models.SET_NULL, related_name="extractions", null=True, blank=True
     )
 
-    raw_text = models.TextField(blank=True, default="")
     fields_json = models.JSONField(default=dict)        # normalized extracted fields
     confidences_json = models.JSONField(default=dict)   # per-field confidence 0..1
+    timings_json = models.JSONField(default=dict, blank=True)  # per-stage ms, queue wait
     model_name = models.CharField(max_length=128, blank=True, default="heuristics")
+    extractor_version = models.PositiveSmallIntegerField(default=0)  # parsing.EXTRACTOR_VERSION used
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.STARTED)
 
     created_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # latest extraction per candidate: WHERE candidate_id = ? ORDER BY created_at DESC
+            models.Index(fields=["candidate", "-created_at"], name="extr_cand_created_idx"),
+        ]
+
+    @property
+    def raw_text(self) -> str:
+        """Lazily load (one query) and decompress the raw text; "" if none was stored."""
+        try:
+            return self.text.get_text()
+        except ExtractionText.DoesNotExist:
+            return ""
+
     def __str__(self) -> str:
         return f"Extraction {self.id} for {self.candidate_id}"
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    raw = (text or "").encode("utf-8")
+    if _zstd is not None:
+        return ExtractionText.Codec.ZSTD, _zstd.ZstdCompressor(level=6).compress(raw)
+    return ExtractionText.Codec.ZLIB, zlib.compress(raw, 6)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    data = bytes(data or b"")
+    if not data:
+        return ""
+    if codec == ExtractionText.Codec.ZSTD:
+        if _zstd is None:
+            raise RuntimeError("zstandard is required to read this extraction text")
+        return _zstd.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class ExtractionText(models.Model):
+    """
+    Raw resume text for an Extraction, compressed and kept out of the extractions table
+    so list/detail queries never read it. headings_json keeps the layout heading hints the
+    text extractor found, which the text alone cannot reproduce, so a re-extraction
+    segments sections exactly as the original parse did.
+    """
+
+    class Codec(models.TextChoices):
+        ZLIB = "zlib", "zlib"
+        ZSTD = "zstd", "zstd"
+
+    extraction = models.OneToOneField(
+        Extraction, on_delete=models.CASCADE, primary_key=True, related_name="text"
+    )
+    codec = models.CharField(max_length=8, choices=Codec.choices, default=Codec.ZLIB)
+    data = models.BinaryField(default=b"")
+    size_chars = models.PositiveIntegerField(default=0)
+    headings_json = models.JSONField(default=list)
+
+    @classmethod
+    def store(cls, extraction: Extraction, text: str, headings: Collection[str] = ()) -> "ExtractionText":
+        codec, data = compress_text(text)
+        obj, _ = cls.objects.update_or_create(
+            extraction=extraction,
+            defaults={
+                "codec": codec, "data": data, "size_chars": len(text or ""), "headings_json": sorted(headings),
+            },
+        )
+        return obj
+
+    def get_text(self) -> str:
+        return decompress_text(self.codec, self.data)
+
+    def __str__(self) -> str:
+        return f"Text for extraction {self.extraction_id} ({self.size_chars} chars, {self.codec})"
+
+
+class Skill(models.Model):
+    """A distinct skill name (normalized by skill_index.normalize). Rows are never deleted."""
+
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CandidateSkill(models.Model):
+    """
+    One skill of a candidate's latest completed extraction, with its confidence. The
+    queryable copy of that extraction's fields_json["skills"]; see skill_index.py.
+    """
+
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name="candidate_skills")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="candidate_skills")
+    confidence = models.FloatField(default=0.0)  # 0..1
+
+    class Meta:
+        constraints = [
+            # also the lookup index: WHERE skill_id IN (...) -> candidate_id, no table access
+            models.UniqueConstraint(fields=["skill", "candidate"], name="candskill_skill_cand_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.skill_id} for {self.candidate_id} ({self.confidence:.2f})"
+
+
+class DedupKey(models.Model):
+    """
+    Blocking index for duplicate detection: one row per normalized key of a candidate.
+    Candidates sharing a (kind, value) are the only ones ever compared.
+    """
+
+    class Kind(models.TextChoices):
+        EMAIL = "email", "Email"
+        PHONE = "phone", "Phone (E.164)"
+        NAME_COMPANY = "name_company", "Name + company"
+        MINHASH = "minhash", "MinHash LSH band"
+
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name="dedup_keys")
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "value"], name="dedupkey_kind_value_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}={self.value} for {self.candidate_id}"
+
+
+class CandidateFingerprint(models.Model):
+    """MinHash signature of a candidate's latest resume text, for near-duplicate checks."""
+
+    candidate = models.OneToOneField(
+        Candidate, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint"
+    )
+    minhash = models.BinaryField(default=b"")  # packed unsigned 64-bit values
+    shingles = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Fingerprint for {self.candidate_id} ({self.shingles} shingles)"
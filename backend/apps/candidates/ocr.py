@@ -0,0 +1,252 @@
+"""
+Optional OCR for scanned resumes and ID documents, using a local Tesseract binary.
+
+Text extraction stays the fast path: OCR only runs when a PDF's extracted text is too
+sparse for its page count (or the file is an image), and is skipped entirely unless
+settings.OCR_ENABLED is set and the binary is on PATH. Pages are downscaled before
+recognition so per-page latency stays bounded, every Tesseract process is pinned to one
+thread, and at most OCR_MAX_WORKERS of them run at once in a process -- the CPU budget.
+An extraction forked into a child process (see watchdog.py) runs its OCR one page at a
+time on a slot its parent holds for it from the same budget (slot_for_child()), so
+forking does not multiply the budget. Pages are decoded and recognised a few at a time,
+not all at once. Results are cached on disk by the SHA-256 of the file.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import importlib
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MIME_PREFIX = "image/"
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_budget: Optional[threading.BoundedSemaphore] = None
+# set in the parent thread that holds a slot for a forked child; the child, a copy of
+# that thread, sees it and OCRs on the held slot
+_local = threading.local()
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "OCR_ENABLED", False)) and shutil.which(settings.OCR_TESSERACT_CMD) is not None
+
+
+def preload() -> None:
+    """Import what OCR imports lazily, so a child forked after this never imports it (see watchdog.py)."""
+    if enabled():
+        for module in ("PIL.Image", "pypdf"):
+            with contextlib.suppress(ImportError):
+                importlib.import_module(module)
+
+
+def _executor() -> ThreadPoolExecutor:
+    # Threads only wait on Tesseract subprocesses; the pool size is the CPU budget.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.OCR_MAX_WORKERS, thread_name_prefix="ocr")
+        return _pool
+
+
+def _slots() -> threading.BoundedSemaphore:
+    global _budget
+    with _pool_lock:
+        if _budget is None:
+            _budget = threading.BoundedSemaphore(max(1, settings.OCR_MAX_WORKERS))
+        return _budget
+
+
+@contextlib.contextmanager
+def slot_for_child() -> Iterator[None]:
+    """
+    Hold one OCR slot around work run in a forked child, which then OCRs on that slot
+    alone. A killed child cannot leak it: the parent releases it.
+    """
+    if not enabled():
+        yield
+        return
+    with _slots():
+        _local.child_slot = True
+        try:
+            yield
+        finally:
+            _local.child_slot = False
+
+
+def _forget_pool() -> None:
+    # the pool's threads do not survive fork(); a child (see watchdog.py) builds its own,
+    # and its copy of the budget is meaningless
+    global _pool, _pool_lock, _budget
+    _pool, _pool_lock, _budget = None, threading.Lock(), None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool)
+
+
+def is_sparse(text: str, pages: int) -> bool:
+    """True when text has fewer than OCR_MIN_CHARS_PER_PAGE non-space characters per page."""
+    chars = sum(1 for ch in text if not ch.isspace())
+    return chars < settings.OCR_MIN_CHARS_PER_PAGE * max(1, pages)
+
+
+def _cache_path(digest: str) -> Path:
+    # the key covers the settings that change the output, not just the file
+    key = f"{digest}-{settings.OCR_LANG}-{settings.OCR_MAX_DIMENSION}"
+    return Path(settings.OCR_CACHE_DIR) / digest[:2] / f"{key}.txt"
+
+
+def _cached(data: bytes, run: Callable[[], Tuple[str, bool]]) -> str:
+    """run() -> (text, complete); only complete output is cached, as entries never expire."""
+    path = _cache_path(hashlib.sha256(data).hexdigest())
+    if path.exists():
+        metrics.OCR_CACHE_TOTAL.inc(result="hit")
+        return path.read_text(encoding="utf-8")
+    metrics.OCR_CACHE_TOTAL.inc(result="miss")
+    text, complete = run()
+    if not complete:
+        # a page failed (often a timeout under load): the next request OCRs it again
+        return text
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return text
+
+
+def _prepare(image) -> bytes:
+    """Grayscale, downscale to OCR_MAX_DIMENSION on the long side, encode as PNG."""
+    from PIL import Image
+
+    img = image.convert("L")
+    limit = settings.OCR_MAX_DIMENSION
+    if max(img.size) > limit:
+        img.thumbnail((limit, limit), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _tesseract_in_budget(png: bytes) -> str:
+    with _slots():
+        return _tesseract(png)
+
+
+def _tesseract(png: bytes) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".png") as fh:
+        fh.write(png)
+        fh.flush()
+        env = {**os.environ, "OMP_THREAD_LIMIT": "1"}
+        with metrics.stage_timer("ocr_page"):
+            proc = subprocess.run(
+                [settings.OCR_TESSERACT_CMD, fh.name, "stdout", "-l", settings.OCR_LANG, "--psm", "3"],
+                capture_output=True,
+                timeout=settings.OCR_PAGE_TIMEOUT_SECONDS,
+                env=env,
+                check=False,
+            )
+    if proc.returncode != 0:
+        raise RuntimeError(f"tesseract exited {proc.returncode}: {proc.stderr.decode(errors='replace')[:200]}")
+    metrics.OCR_PAGES_TOTAL.inc()
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+def _recognise(images: Iterable) -> Tuple[str, bool]:
+    """
+    (text, complete): OCR of page images within the shared budget, failed pages left
+    empty and complete False if there were any. Only as many pages as can be recognised
+    at once are decoded and waiting at any time.
+    """
+    held = getattr(_local, "child_slot", False)
+    in_flight = 1 if held else max(1, settings.OCR_MAX_WORKERS)
+    run = _tesseract if held else _tesseract_in_budget
+    pending: Deque[Tuple[int, Future]] = deque()
+    pages = []
+    failed = 0
+
+    def collect() -> None:
+        nonlocal failed
+        i, fut = pending.popleft()
+        try:
+            pages.append(fut.result())
+        except (subprocess.TimeoutExpired, RuntimeError, OSError):
+            logger.warning("OCR failed on page %s", i + 1, exc_info=True)
+            pages.append("")
+            failed += 1
+
+    for i, img in enumerate(images):
+        if len(pending) >= in_flight:
+            collect()
+        pending.append((i, _executor().submit(run, _prepare(img))))
+    while pending:
+        collect()
+    return "\n".join(pages), not failed
+
+
+def _pdf_page_images(data: bytes) -> Iterator:
+    """The largest embedded image of each page (scans carry one image per page), a page at a time."""
+    from pypdf import PdfReader
+
+    for page in PdfReader(io.BytesIO(data)).pages:
+        try:
+            candidates = [img.image for img in page.images if img.image is not None]
+        except Exception:
+            continue
+        if candidates:
+            yield max(candidates, key=lambda im: im.size[0] * im.size[1])
+
+
+def ocr_pdf(data: bytes) -> str:
+    return _cached(data, lambda: _recognise(_pdf_page_images(data)))
+
+
+def ocr_image(data: bytes) -> str:
+    from PIL import Image
+
+    def run() -> Tuple[str, bool]:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            return _recognise([img])
+
+    return _cached(data, run)
+
+
+def text_with_ocr_fallback(data: bytes, text: str, *, mime_type: str = "", pages: Optional[int] = None) -> str:
+    """
+    Return text, or OCR output when OCR is enabled and text is too sparse for the
+    document (images are always OCR'd). Falls back to text if OCR produced nothing.
+    pages is the PDF's page count if the caller has it from extracting text.
+    """
+    if not enabled():
+        return text
+    if mime_type.startswith(IMAGE_MIME_PREFIX):
+        return ocr_image(data) or text
+    if pages is None:
+        from pypdf import PdfReader
+
+        try:
+            pages = len(PdfReader(io.BytesIO(data)).pages)
+        except Exception:
+            return text
+    if not is_sparse(text, pages):
+        return text
+    with metrics.stage_timer("ocr"):
+        ocr_text = ocr_pdf(data)
+    return ocr_text if ocr_text.strip() else text
@@ -1,228 +1,218 @@
 from __future__ import annotations
 
+import contextlib
 import io
-import re
+import logging
 import threading
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import Any, Callable, Collection, Dict, Optional, Set, Tuple
 
-import phonenumbers
 from django.conf import settings
+from django.db.models import F
 from django.utils import timezone
-from pypdf import PdfReader
-from docx import Document as DocxDocument
 
-from .models import Candidate, Resume, Extraction
+from . import formats, metrics, ocr, pdf_preflight, scheduler, watchdog, writes
+from .extractors import ExtractionResult, run_extractors, skill_names
+from .models import Resume
+# re-exported: reextract and older callers import these from here
+from .writes import CANDIDATE_FIELDS, apply_fields_to_candidate  # noqa: F401
 
+logger = logging.getLogger(__name__)
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-# token-ish skills; tune to your interests
-SKILL_TOKENS = {
-    "python", "django", "flask", "react", "javascript", "typescript",
-    "postgres", "postgresql", "sqlite", "redis", "docker", "kubernetes",
-    "aws", "gcp", "azure", "celery", "langchain", "pytorch", "tensorflow",
-    "nlp", "llm", "openai", "anthropic", "gpt", "fastapi",
-}
+RAW_TEXT_MAX_CHARS = 300000  # stored compressed; the cap just bounds pathological files
 
-DESIGNATION_HINTS = [
-    "software engineer", "senior software", "sde", "developer",
-    "data scientist", "machine learning", "ml engineer",
-    "frontend", "backend", "full stack", "tech lead", "engineering manager",
-]
+# Bump whenever an extractor in apps/candidates/extractors changes; `manage.py reextract`
+# then refreshes stored extractions below this version from their raw text.
+EXTRACTOR_VERSION = 5
 
-COMPANY_HINTS = [" at ", " @ ", "experience", "work history", "employment"]
+# resumes queued or being parsed by this process
+_in_flight: Set[int] = set()
+_in_flight_lock = threading.Lock()
 
 
-def queue_parse_resume(resume_id: int) -> None:
-    """Spawn a daemon thread to parse a resume by id."""
-    t = threading.Thread(target=parse_resume, args=(resume_id,), daemon=True)
-    t.start()
+def is_in_flight(resume_id: int) -> bool:
+    with _in_flight_lock:
+        return resume_id in _in_flight
 
 
-def parse_resume(resume_id: int) -> None:
-    resume = Resume.objects.select_related("candidate").get(id=resume_id)
-    candidate = resume.candidate
+def queue_parse_resume(
+    resume_id: int, *, profile: Optional[str] = None, priority: str = scheduler.BULK, tenant: str = ""
+) -> None:
+    """
+    Queue a resume for this process's parse workers (see scheduler.py). A resume already
+    queued or being parsed here is not queued twice.
+    """
+    with _in_flight_lock:
+        if resume_id in _in_flight:
+            return
+        _in_flight.add(resume_id)
+    watchdog.ensure_running()
+    scheduler.get().submit(scheduler.Job(resume_id, priority=priority, tenant=tenant, profile=profile))
 
-    extraction = Extraction.objects.create(
-        candidate=candidate,
-        resume=resume,
-        status=Extraction.Status.STARTED,
-        model_name="heuristics",
+
+def run_job(job: scheduler.Job) -> None:
+    try:
+        parse_resume(job.resume_id, enqueued_at=job.enqueued_at, profile=job.profile)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(job.resume_id)
+
+
+def parse_resume(resume_id: int, *, enqueued_at: Optional[float] = None, profile: Optional[str] = None) -> None:
+    """
+    Extract text and fields for one resume, then persist the result (or the failure) in a
+    single transaction -- or buffer it for a batched write when PARSE_WRITE_MODE is "batch".
+    Text extraction and the LLM call are cut off at their deadlines (see watchdog.py).
+    """
+    timings: Dict[str, float] = {}
+    if enqueued_at is not None:
+        # the scheduler observes it in PARSE_QUEUE_WAIT_SECONDS, by priority class
+        timings["queue_wait_ms"] = round(max(0.0, time.monotonic() - enqueued_at) * 1000, 2)
+    started = time.perf_counter()
+
+    # the watchdog requeues or fails parses still running PARSE_STUCK_SECONDS after this
+    Resume.objects.filter(id=resume_id).update(
+        parse_started_at=timezone.now(), parse_attempts=F("parse_attempts") + 1
+    )
+    resume = Resume.objects.select_related("candidate").get(id=resume_id)
+    outcome = writes.ParseOutcome(
+        resume=resume, candidate=resume.candidate, timings=timings, extractor_version=EXTRACTOR_VERSION
     )
 
+    stage = "preflight"
     try:
+        # Size up PDFs before pypdf sees them (raises PdfRejected past the hard limits)
+        with metrics.stage_timer("preflight", timings):
+            data = read_resume(resume)
+            report = pdf_preflight.check(data)
         # Extract plain text
-        text = extract_text_from_file(resume)
+        stage = "extract_text"
+        with metrics.stage_timer("extract_text", timings):
+            text, headings = extract_text_guarded(data, resume.original_name or "", resume.mime_type or "", report)
         # Heuristics
-        fields, conf = extract_fields_heuristics(text)
+        stage = "heuristics"
+        with metrics.stage_timer("heuristics", timings):
+            result = extract_fields_heuristics(text, profile=profile, headings=headings)
         # Optional LLM enhancement
         if getattr(settings, "USE_LLM", False):
-            llm_fields, llm_conf, llm_model = try_llm_extract(text)
+            stage = "llm"
+            with metrics.stage_timer("llm", timings):
+                llm_fields, llm_conf, llm_model = watchdog.run_with_deadline(
+                    "llm", try_llm_extract, text, timeout=settings.PARSE_LLM_TIMEOUT_SECONDS
+                )
             if llm_fields:
-                fields.update({k: v for k, v in llm_fields.items() if v})
-                for k, v in llm_conf.items():
-                    conf[k] = max(conf.get(k, 0.0), v)
-                extraction.model_name = llm_model or "heuristics+llm"
-
-        # Update candidate
-        candidate.name = fields.get("name", candidate.name or "")
-        candidate.primary_email = fields.get("email", candidate.primary_email or "")
-        candidate.primary_phone = fields.get("phone", candidate.primary_phone or "")
-        candidate.latest_company = fields.get("company", candidate.latest_company or "")
-        candidate.designation = fields.get("designation", candidate.designation or "")
-        candidate.extraction_status = Candidate.ExtractionStatus.PARSED
-        candidate.save(update_fields=[
-            "name", "primary_email", "primary_phone", "latest_company",
-            "designation", "extraction_status", "updated_at",
-        ])
-
-        # Persist extraction
-        extraction.raw_text = text[:300000]  # avoid huge blobs
-        extraction.fields_json = fields
-        extraction.confidences_json = conf
-        extraction.status = Extraction.Status.COMPLETED
-        extraction.completed_at = timezone.now()
-        extraction.save(update_fields=[
-            "raw_text", "fields_json", "confidences_json", "status", "completed_at"
-        ])
-
-        resume.status = Resume.Status.PARSED
-        resume.save(update_fields=["status"])
-
+                result.merge(llm_fields, llm_conf)
+                outcome.model_name = llm_model or "heuristics+llm"
+        outcome.result = result
+        # raw text goes to the compressed side table
+        outcome.text = text[:RAW_TEXT_MAX_CHARS]
+        outcome.headings = sorted(headings)
     except Exception as e:  # noqa: BLE001
-        candidate.extraction_status = Candidate.ExtractionStatus.FAILED
-        candidate.save(update_fields=["extraction_status", "updated_at"])
-        extraction.status = Extraction.Status.FAILED
-        extraction.save(update_fields=["status"])
-        resume.status = Resume.Status.FAILED
-        resume.save(update_fields=["status"])
-        # For a personal project, noisy errors help.
-        import traceback
-        traceback.print_exc()
-
-
-def extract_text_from_file(resume: Resume) -> str:
-    name = (resume.original_name or "").lower()
+        outcome.failed_stage, outcome.exception = stage, type(e).__name__
+        logger.exception("Parsing resume %s failed during %s", resume_id, stage)
+    # db_write is only observed in the histogram: it cannot be stored in the row it times.
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    writes.save(outcome)
+
+
+def extract_text_guarded(
+    data: bytes,
+    name: str,
+    mime_type: str,
+    report: Optional[pdf_preflight.PdfReport],
+    read: Optional[Callable[[bytes, str, str], Any]] = None,
+) -> Any:
+    """
+    read(data, name, mime_type) -- text_and_headings by default -- under the text
+    extraction deadline, in a resource-limited child when preflight (report) routed the
+    PDF as constrained. Every untrusted upload's text is read through here.
+    """
+    read = read or text_and_headings
+    constrained = report is not None and report.route == pdf_preflight.CONSTRAINED
+    forks = constrained or settings.PARSE_TEXT_ISOLATION == watchdog.PROCESS
+    child_ocr = contextlib.nullcontext()
+    if forks:
+        fmt = formats.identify(data, name, mime_type)
+        _import_before_fork(fmt)
+        # a forked child's OCR runs on a slot held here (see ocr.py); only PDFs and
+        # images can need OCR, so other formats fork without taking one
+        if fmt == formats.PDF or mime_type.startswith(ocr.IMAGE_MIME_PREFIX):
+            child_ocr = ocr.slot_for_child()
+    if constrained:
+        logger.info("Reading a large PDF (%s) in a constrained worker", report.reason)
+        with pdf_preflight.constrained_slot(), child_ocr:
+            return watchdog.run_with_deadline(
+                "extract_text", read, data, name, mime_type,
+                timeout=settings.PARSE_TEXT_TIMEOUT_SECONDS, rlimits=pdf_preflight.rlimits(),
+            )
+    with child_ocr:
+        return watchdog.run_with_deadline(
+            "extract_text", read, data, name, mime_type,
+            timeout=settings.PARSE_TEXT_TIMEOUT_SECONDS, isolation=settings.PARSE_TEXT_ISOLATION,
+        )
+
+
+def _import_before_fork(fmt: Optional[str]) -> None:
+    # the child must find the parser's lazy imports done (see formats.preload)
+    if fmt is not None:
+        formats.preload(fmt)
+    ocr.preload()
+
+
+def read_resume(resume: Resume) -> bytes:
+    # bytes are counted per detected format by formats.extract()
     with resume.file.open("rb") as fh:
-        data = fh.read()
-    if name.endswith(".pdf") or (resume.mime_type or "").startswith("application/pdf"):
-        return extract_text_from_pdf(io.BytesIO(data))
-    if name.endswith(".docx") or "officedocument.wordprocessingml.document" in (resume.mime_type or ""):
-        return extract_text_from_docx(io.BytesIO(data))
-    # fallback: try pdf first, then docx
-    try:
-        return extract_text_from_pdf(io.BytesIO(data))
-    except Exception:
-        return extract_text_from_docx(io.BytesIO(data))
-
-
-def extract_text_from_pdf(buf: io.BytesIO) -> str:
-    reader = PdfReader(buf)
-    chunks: List[str] = []
-    for page in reader.pages:
-        try:
-            chunks.append(page.extract_text() or "")
-        except Exception:
-            # ignore bad page; keep going
-            continue
-    return "\n".join(chunks)
-
-
-def extract_text_from_docx(buf: io.BytesIO) -> str:
-    doc = DocxDocument(buf)
-    return "\n".join(p.text for p in doc.paragraphs)
-
-
-def extract_fields_heuristics(text: str) -> Tuple[Dict[str, str], Dict[str, float]]:
-    t = text or ""
-    t_norm = t.replace("\r", "")
-    lines = [ln.strip() for ln in t_norm.split("\n") if ln.strip()]
-    lower = t_norm.lower()
-
-    fields: Dict[str, str] = {}
-    conf: Dict[str, float] = {}
-
-    # Name guess: first non-empty line with 2-5 words, mostly alphabetic.
-    name = ""
-    for ln in lines[:10]:
-        words = [w for w in re.split(r"\s+", ln) if w]
-        if 2 <= len(words) <= 5 and sum(ch.isalpha() for ch in ln) / max(1, len(ln)) > 0.7:
-            name = ln
-            break
-    if name:
-        fields["name"] = name
-        conf["name"] = 0.6
-
-    # Email(s)
-    emails = EMAIL_RE.findall(t)
-    if emails:
-        fields["email"] = emails[0]
-        conf["email"] = 0.95
-
-    # Phone(s) – prefer Indian numbers (+91 or 10 digits)
-    phone_val = ""
-    try:
-        for match in phonenumbers.PhoneNumberMatcher(t, "IN"):
-            num = phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
-            if num:
-                phone_val = num
-                break
-    except Exception:
-        pass
-    if not phone_val:
-        # crude 10-digit fallback
-        digits = re.findall(r"(?:\+91[-\s]?)?\b[6-9]\d{9}\b", t)
-        if digits:
-            d = digits[0].replace(" ", "").replace("-", "")
-            if not d.startswith("+"):
-                d = "+91" + d[-10:]
-            phone_val = d
-    if phone_val:
-        fields["phone"] = phone_val
-        conf["phone"] = 0.9
-
-    # Company guess: look for " at X" or under Experience sections
-    company = ""
-    for hint in COMPANY_HINTS:
-        idx = lower.find(hint)
-        if idx != -1:
-            seg = t_norm[idx: idx + 120]
-            # Take the token after " at " or " @ "
-            m = re.search(r"(?:\bat\b|\s@\s)([A-Z][A-Za-z0-9& ._-]{2,})", seg)
-            if m:
-                company = m.group(1).strip().split("  ")[0]
-                break
-    if not company:
-        # fallback: next line after "Experience"
-        for i, ln in enumerate(lines):
-            if ln.lower().startswith("experience"):
-                company = lines[i + 1] if i + 1 < len(lines) else ""
-                break
-    if company:
-        fields["company"] = company
-        conf["company"] = 0.55
-
-    # Designation guess
-    designation = ""
-    for ln in lines[:30]:
-        lnl = ln.lower()
-        if any(h in lnl for h in DESIGNATION_HINTS):
-            designation = ln
-            break
-    if designation:
-        fields["designation"] = designation
-        conf["designation"] = 0.6
-
-    # Skills based on token inclusion
-    skills_found: List[str] = []
-    lower_tokens = set(re.findall(r"[a-zA-Z+#.]+", lower))
-    for sk in SKILL_TOKENS:
-        if sk in lower_tokens:
-            skills_found.append(sk if sk != "postgres" else "postgresql")
-    if skills_found:
-        fields["skills"] = sorted(set(skills_found))
-        conf["skills"] = {sk: 0.85 for sk in fields["skills"]}
-
-    return fields, conf
+        return fh.read()
+
+
+def text_and_headings(data: bytes, name: str, mime_type: str) -> Tuple[str, Set[str]]:
+    """extract_text_from_bytes plus the heading lines it found; what a sandboxed extraction returns."""
+    headings: Set[str] = set()
+    return extract_text_from_bytes(data, name, mime_type, headings), headings
+
+
+def extract_text_from_file(resume: Resume, headings: Optional[Set[str]] = None) -> str:
+    return extract_text_from_bytes(read_resume(resume), resume.original_name or "", resume.mime_type or "", headings)
+
+
+def extract_text_from_bytes(data: bytes, name: str, mime_type: str, headings: Optional[Set[str]] = None) -> str:
+    """
+    Text of a resume in any supported format (see formats/), identified from its bytes;
+    the name and mime type only pick a text format for text the bytes leave undecided.
+    """
+    fmt = formats.identify(data, name, mime_type)
+    if fmt is None:
+        raise formats.UnsupportedFormat(f"Unrecognised resume format ({name or mime_type or 'no name'})")
+    stats: Dict[str, int] = {}
+    text = formats.extract(data, fmt, headings=headings, max_chars=RAW_TEXT_MAX_CHARS, stats=stats)
+    if fmt == formats.PDF:
+        # scanned PDFs have (almost) no text layer; OCR them if enabled
+        text = ocr.text_with_ocr_fallback(data, text, pages=stats["chunks"])
+    return text
+
+
+def extract_text_from_pdf(buf: io.BytesIO, headings: Optional[Set[str]] = None) -> str:
+    """Page text joined by newlines; if headings is given, add lines set in a heading font to it."""
+    from .formats.pdf import pages
+
+    return "\n".join(pages(buf, headings))
+
+
+def extract_text_from_docx(buf: io.BytesIO, headings: Optional[Set[str]] = None) -> str:
+    """Paragraph text joined by newlines; if headings is given, add Heading/Title-styled or all-bold paragraphs."""
+    from .formats.docx import paragraphs
+
+    return "\n".join(paragraphs(buf, headings))
+
+
+def extract_fields_heuristics(
+    text: str, *, profile: Optional[str] = None, headings: Collection[str] = ()
+) -> ExtractionResult:
+    """
+    Run the field extractors enabled for profile (settings.RESUME_EXTRACTOR_PROFILE by
+    default). headings are layout hints from the text extractor for section segmentation.
+    """
+    return run_extractors(text, profile=profile, headings=headings)
 
 
 def try_llm_extract(text: str) -> Tuple[Optional[Dict[str, str]], Dict[str, float], Optional[str]]:
@@ -236,7 +226,8 @@ def try_llm_extract(text: str) -> Tuple[Optional[Dict[str, str]], Dict[str, floa
     import json
     from openai import OpenAI
 
-    client = OpenAI(api_key=getattr(settings, "OPENAI_API_KEY", ""))
+    # the client gives up on its own before the stage deadline abandons the thread
+    client = OpenAI(api_key=getattr(settings, "OPENAI_API_KEY", ""), timeout=settings.PARSE_LLM_TIMEOUT_SECONDS or None)
     model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
 
     # Trim text so you don’t pay to send megabytes
@@ -259,6 +250,11 @@ def try_llm_extract(text: str) -> Tuple[Optional[Dict[str, str]], Dict[str, floa
         response_format={"type": "json_object"},
     )
 
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        metrics.LLM_TOKENS_TOTAL.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+        metrics.LLM_TOKENS_TOTAL.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
     raw = resp.choices[0].message.content or "{}"
     fields = json.loads(raw)
 
@@ -271,7 +267,7 @@ def try_llm_extract(text: str) -> Tuple[Optional[Dict[str, str]], Dict[str, floa
         "designation": 0.75 if fields.get("designation") else 0.0,
     }
     if isinstance(fields.get("skills"), list):
-        conf["skills"] = {s: 0.9 for s in fields["skills"]}
+        conf["skills"] = {s: 0.9 for s in skill_names(fields["skills"]) if s is not None}
 
     return fields, conf, model
 
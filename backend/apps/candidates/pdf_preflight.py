@@ -0,0 +1,278 @@
+"""
+A cheap look at an uploaded PDF before pypdf parses it. pypdf trusts the file: page
+count, object count and how far a stream inflates are whatever the PDF says, so one
+crafted upload (a FlateDecode bomb, 100,000 pages, a broken xref that forces a full
+rebuild) can cost gigabytes and minutes in a parse worker.
+
+inspect() never builds the object graph. It reads the header and the trailer's
+startxref (checking it points at an xref table or stream), takes /Size and the page
+tree's /Count from the raw bytes, and inflates FlateDecode streams -- every layer of a
+chained filter -- in bounded chunks that are counted and dropped (object streams are
+kept, up to a cap, to look inside them). Image codecs are counted at their stored size;
+a stream with any other filter (LZW, ASCII85, an indirect /Filter, ...) cannot be sized
+this way. check() then sorts the file into one of three routes:
+
+- rejected, raising PdfRejected, past PDF_MAX_PAGES, PDF_MAX_OBJECTS or
+  PDF_MAX_INFLATED_MB;
+- constrained, past PDF_LARGE_PAGES, PDF_LARGE_OBJECTS or PDF_LARGE_INFLATED_MB, with
+  a broken xref, or with a stream it could not size. Text extraction then runs in a child process with an address
+  space and CPU limit (resource.setrlimit), at most PDF_CONSTRAINED_WORKERS at a time;
+- normal, for everything else.
+"""
+from __future__ import annotations
+
+import bisect
+import contextlib
+import logging
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from . import metrics, watchdog
+
+try:
+    import resource  # POSIX only; without it large PDFs are parsed unconstrained
+except ImportError:  # pragma: no cover
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+NORMAL, CONSTRAINED, REJECTED = "normal", "constrained", "rejected"
+MB = 1024 * 1024
+
+_HEADER = re.compile(rb"%PDF-(\d\.\d)")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_AT_XREF = re.compile(rb"\s*(?:xref\b|\d+\s+\d+\s+obj\b)")
+# bounded, and anchored after a non-digit: unbounded runs backtrack quadratically over
+# the digit/whitespace runs in compressed stream bytes
+_OBJ = re.compile(rb"(?<!\d)\d{1,10}\s{1,32}\d{1,5}\s{1,32}obj\b")
+_SIZE = re.compile(rb"/Size\s+(\d+)")
+_PAGE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+_PAGES_COUNT = re.compile(rb"/Type\s*/Pages\b(?:(?!>>).){0,512}?/Count\s+(\d+)|/Count\s+(\d+)(?:(?!<<).){0,512}?/Type\s*/Pages\b", re.S)
+_STREAM = re.compile(rb">>\s*stream(?:\r\n|\n|\r)")
+_FILTER = re.compile(rb"/Filter\b\s*(?:/([^\s/\[\]<>()%]+)|\[([^\]]*)\]|(.{0,32}))", re.S)
+_FILTER_NAME = re.compile(rb"/([^\s/\[\]<>()%]+)")
+_ENDOBJ = re.compile(rb"endobj\b")
+FLATE = {b"FlateDecode", b"Fl"}
+# decoded by PIL for OCR only, never by pypdf's text extraction: counted as stored
+IMAGE_CODECS = {b"DCTDecode", b"DCT", b"JPXDecode", b"JBIG2Decode", b"CCITTFaxDecode", b"CCF"}
+_OBJSTM = re.compile(rb"/Type\s*/ObjStm\b")
+_OBJSTM_N = re.compile(rb"/N\s+(\d+)")
+
+INFLATE_CHUNK = MB
+OBJSTM_KEEP = 4 * MB  # object-stream bytes kept per stream to look for pages
+
+
+class PdfRejected(Exception):
+    pass
+
+
+@dataclass
+class PdfReport:
+    version: str
+    size_bytes: int
+    pages: int  # estimate: page objects seen, or the page tree's /Count, whichever is larger
+    objects: int  # trailer /Size, or objects seen, whichever is larger
+    streams: int
+    inflated_bytes: int  # stored size for streams not inflated; stops counting past the budget
+    xref_ok: bool  # startxref points at an xref table or stream; if not, pypdf rebuilds it
+    uninspected: str = ""  # first stream filter that could not be sized, e.g. "LZWDecode"
+    route: str = NORMAL
+    reason: str = ""
+
+
+def is_pdf(data: bytes) -> bool:
+    return _HEADER.search(data[:1024]) is not None
+
+
+def _filters(head: bytes) -> Optional[List[bytes]]:
+    """
+    The /Filter chain in a stream dictionary ([] without one), or None if it cannot be
+    read: an indirect reference, anything but names in the array, or /Filter twice.
+    """
+    found = list(_FILTER.finditer(head))
+    if not found:
+        return []
+    if len(found) > 1:
+        return None
+    name, array, other = found[0].groups()
+    if name is not None:
+        return [name]
+    if array is None:
+        return None
+    names = _FILTER_NAME.findall(array)
+    return names if _FILTER_NAME.sub(b"", array).strip() == b"" else None
+
+
+def _inflate_layer(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """One Flate layer over a stream of chunks, yielding at most INFLATE_CHUNK bytes at a time."""
+    d = zlib.decompressobj()
+    for chunk in chunks:
+        while chunk and not d.eof:
+            out = d.decompress(chunk, INFLATE_CHUNK)
+            if out:
+                yield out
+            chunk = d.unconsumed_tail
+            if not out:
+                break
+        if d.eof:
+            return
+
+
+def _inflate(raw: bytes, layers: int, budget: int, keep: int) -> Tuple[int, bytes]:
+    """
+    Size of raw after layers chained Flate decodes (stopping past budget) and the first
+    keep bytes of it. Layers are piped a chunk at a time, so none is held whole.
+    """
+    chunks: Iterable[bytes] = (raw,)
+    for _ in range(layers):
+        chunks = _inflate_layer(chunks)
+    size, kept = 0, []
+    try:
+        for out in chunks:
+            size += len(out)
+            if keep > 0:
+                kept.append(out[:keep])
+                keep -= len(kept[-1])
+            if size > budget:
+                break
+    except zlib.error:
+        pass  # corrupt data: count what inflated; pypdf will skip or fail on it
+    return size, b"".join(kept)
+
+
+def inspect(data: bytes, *, inflate_budget: Optional[int] = None) -> PdfReport:
+    """Estimate a PDF's size in pages, objects and inflated stream bytes without parsing it."""
+    header = _HEADER.search(data[:1024])
+    budget = inflate_budget if inflate_budget is not None else settings.PDF_MAX_INFLATED_MB * MB
+    tail = data[-2048:]
+    starts = _STARTXREF.findall(tail)
+    xref_ok = bool(starts) and int(starts[-1]) < len(data) and _AT_XREF.match(data, int(starts[-1])) is not None
+
+    streams = inflated = packed = 0
+    uninspected = ""
+    objects = [m.start() for m in _OBJ.finditer(data)]
+    page_markers = len(_PAGE.findall(data))
+    page_counts = [int(a or b) for a, b in _PAGES_COUNT.findall(data)]
+    for m in _STREAM.finditer(data):
+        streams += 1
+        start = m.end()
+        end = data.find(b"endstream", start)
+        end = len(data) if end < 0 else end
+        # the stream's dictionary runs from its "N G obj" header, however long it is
+        i = bisect.bisect_left(objects, m.start())
+        head_start = objects[i - 1] if i else 0
+        closed = None
+        for closed in _ENDOBJ.finditer(data, head_start, m.start()):
+            pass
+        head = data[closed.end() if closed else head_start:m.start()]
+        filters = _filters(head)
+        while filters and filters[-1] in IMAGE_CODECS:
+            filters.pop()
+        other = b"/Filter" if filters is None else next((f for f in filters if f not in FLATE), None)
+        if other is not None or not filters:
+            uninspected = uninspected or (other or b"").decode("latin-1")
+            inflated += end - start
+            continue
+        objstm = _OBJSTM.search(head) is not None
+        size, content = _inflate(data[start:end], len(filters), budget - inflated, OBJSTM_KEEP if objstm else 0)
+        inflated += size
+        if objstm:
+            n = _OBJSTM_N.search(head)
+            packed += int(n.group(1)) if n else 0
+            page_markers += len(_PAGE.findall(content))
+            page_counts += [int(a or b) for a, b in _PAGES_COUNT.findall(content)]
+        if inflated > budget:
+            break
+    sizes = [int(s) for s in _SIZE.findall(data)]
+    return PdfReport(
+        version=header.group(1).decode() if header else "",
+        size_bytes=len(data),
+        pages=max([page_markers] + page_counts),
+        objects=max([len(objects) + packed] + sizes),
+        streams=streams,
+        inflated_bytes=inflated,
+        xref_ok=xref_ok,
+        uninspected=uninspected,
+    )
+
+
+def check(data: bytes) -> Optional[PdfReport]:
+    """
+    None for data that is not a PDF; otherwise its report with .route set to NORMAL or
+    CONSTRAINED. Raises PdfRejected for files past the hard limits.
+    """
+    if not is_pdf(data):
+        return None
+    report = inspect(data)
+    over = _over(report, settings.PDF_MAX_PAGES, settings.PDF_MAX_OBJECTS, settings.PDF_MAX_INFLATED_MB)
+    if over:
+        report.route, report.reason = REJECTED, over
+    else:
+        large = _over(report, settings.PDF_LARGE_PAGES, settings.PDF_LARGE_OBJECTS, settings.PDF_LARGE_INFLATED_MB)
+        if not large and not report.xref_ok:
+            large = "broken xref"
+        if not large and report.uninspected:
+            large = f"stream filter {report.uninspected} not inspected"
+        if large and not can_constrain():
+            logger.warning("PDF needs a constrained worker (%s) but resource limits are unavailable", large)
+        elif large:
+            report.route, report.reason = CONSTRAINED, large
+    metrics.PDF_PREFLIGHT_TOTAL.inc(route=report.route)
+    if report.route == REJECTED:
+        raise PdfRejected(f"PDF rejected: {report.reason}")
+    return report
+
+
+def _over(report: PdfReport, pages: int, objects: int, inflated_mb: float) -> str:
+    if pages and report.pages > pages:
+        return f"{report.pages} pages > {pages}"
+    if objects and report.objects > objects:
+        return f"{report.objects} objects > {objects}"
+    if inflated_mb and report.inflated_bytes > inflated_mb * MB:
+        return f"streams inflate past {inflated_mb:g} MB"
+    return ""
+
+
+def can_constrain() -> bool:
+    return resource is not None and watchdog.can_fork()
+
+
+def rlimits() -> Dict[int, Tuple[int, int]]:
+    """Limits for a constrained worker: address space on top of what it inherits, and CPU time."""
+    limits: Dict[int, Tuple[int, int]] = {}
+    if settings.PDF_CONSTRAINED_MEMORY_MB:
+        # the forked child starts with the parent's mappings; only growth is limited
+        cap = _address_space() + settings.PDF_CONSTRAINED_MEMORY_MB * MB
+        limits[resource.RLIMIT_AS] = (cap, cap)
+    if settings.PDF_CONSTRAINED_CPU_SECONDS:
+        cpu = int(settings.PDF_CONSTRAINED_CPU_SECONDS)
+        limits[resource.RLIMIT_CPU] = (cpu, cpu + 1)  # SIGXCPU first, SIGKILL a second later
+    return limits
+
+
+def _address_space() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def constrained_slot() -> Iterator[None]:
+    """Hold one of PDF_CONSTRAINED_WORKERS slots, so large PDFs queue behind each other."""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(max(1, settings.PDF_CONSTRAINED_WORKERS))
+    with _slots:
+        yield
@@ -0,0 +1,144 @@
+"""
+Re-run field extraction over stored raw text and layout heading hints after the
+heuristics change, without re-reading any resume files. Driven by `manage.py reextract`.
+"""
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.db import connections, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .extractors import ExtractionResult
+from . import skill_index
+from .models import Candidate, Extraction, decompress_text
+from .parsing import CANDIDATE_FIELDS, EXTRACTOR_VERSION, apply_fields_to_candidate, extract_fields_heuristics
+
+# (extraction id, codec, compressed text, heading hints)
+WorkItem = Tuple[int, str, bytes, List[str]]
+# (extraction id, result)
+WorkResult = Tuple[int, ExtractionResult]
+
+
+def _extract(item: WorkItem) -> WorkResult:
+    ex_id, codec, data, headings = item
+    return ex_id, extract_fields_heuristics(decompress_text(codec, data), headings=headings or ())
+
+
+def stale_extractions():
+    """
+    Completed, heuristics-only extractions below the current version that still have raw
+    text. Extractions enriched by an LLM are left alone: re-running heuristics would
+    overwrite the model's answers.
+    """
+    latest = (
+        Extraction.objects.filter(candidate_id=OuterRef("candidate_id"))
+        .order_by("-created_at")
+        .values("id")[:1]
+    )
+    return (
+        Extraction.objects.filter(
+            status=Extraction.Status.COMPLETED,
+            model_name="heuristics",
+            extractor_version__lt=EXTRACTOR_VERSION,
+            text__isnull=False,
+        )
+        .annotate(latest_id=Subquery(latest))
+        .order_by("id")
+        .values_list("id", "candidate_id", "latest_id", "text__codec", "text__data", "text__headings_json")
+    )
+
+
+def _chunks(rows, size: int) -> Iterator[List[tuple]]:
+    chunk: List[tuple] = []
+    for row in rows.iterator(chunk_size=size):
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _apply(chunk: List[tuple], results: List[WorkResult], dry_run: bool) -> int:
+    """Write one chunk of results; return how many candidates changed."""
+    by_id = dict(results)
+    extractions = []
+    for ex_id, result in by_id.items():
+        fields, conf = result.to_json()
+        extractions.append(
+            Extraction(id=ex_id, fields_json=fields, confidences_json=conf, extractor_version=EXTRACTOR_VERSION)
+        )
+    # Only the candidate's latest extraction drives its columns.
+    latest_for = {cand_id: ex_id for ex_id, cand_id, latest_id, *_ in chunk if ex_id == latest_id}
+    candidates = Candidate.objects.in_bulk(list(latest_for))
+    changed: List[Candidate] = []
+    columns = set()
+    for cand_id, ex_id in latest_for.items():
+        cand = candidates.get(cand_id)
+        if cand is None:
+            continue
+        diff = apply_fields_to_candidate(cand, by_id[ex_id])
+        if diff:
+            changed.append(cand)
+            columns.update(diff)
+    if dry_run:
+        return len(changed)
+    with transaction.atomic():
+        Extraction.objects.bulk_update(
+            extractions, ["fields_json", "confidences_json", "extractor_version"], batch_size=500
+        )
+        skill_index.replace({
+            cand_id: skill_index.confidences(by_id[ex_id])
+            for cand_id, ex_id in latest_for.items() if cand_id in candidates
+        })
+        if changed:
+            # bulk_update bypasses auto_now, so stamp updated_at explicitly
+            now = timezone.now()
+            for cand in changed:
+                cand.updated_at = now
+            Candidate.objects.bulk_update(
+                changed, sorted(columns & set(CANDIDATE_FIELDS.values())) + ["updated_at"], batch_size=500
+            )
+    return len(changed)
+
+
+def run_reextraction(
+    *,
+    processes: int = 0,
+    chunk_size: int = 500,
+    dry_run: bool = False,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """
+    Stream stale extractions in chunks, run heuristics across `processes` workers
+    (0 = cpu count, 1 = in-process) and bulk-write the results chunk by chunk.
+    """
+    stats = {"extractions": 0, "candidates_changed": 0}
+    processes = processes or multiprocessing.cpu_count()
+    pool = None
+    if processes > 1:
+        # fork before touching the DB so children never inherit an open connection
+        connections.close_all()
+        pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"))
+        pool.submit(int).result()  # fork-context pools start every worker on first submit
+    try:
+        for chunk in _chunks(stale_extractions(), chunk_size):
+            items: List[WorkItem] = [
+                (ex_id, codec, bytes(data), headings) for ex_id, _, _, codec, data, headings in chunk
+            ]
+            if pool is not None:
+                results = list(pool.map(_extract, items, chunksize=max(1, len(items) // (processes * 4))))
+            else:
+                results = [_extract(item) for item in items]
+            stats["candidates_changed"] += _apply(chunk, results, dry_run)
+            stats["extractions"] += len(chunk)
+            if progress:
+                progress(stats)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return stats
@@ -0,0 +1,242 @@
+"""
+Who parses next. Each process parses with a fixed pool of PARSE_WORKERS threads fed
+from two priority classes:
+
+- interactive: an upload someone is waiting on (the upload views, by default);
+- bulk: imports (?priority=bulk on upload), programmatic Resume creates and watchdog
+  requeues.
+
+Waiting interactive jobs go first, but when both classes have work every
+PARSE_BULK_EVERY-th job is a bulk one, so a backfill keeps moving under steady
+interactive traffic. PARSE_INTERACTIVE_RESERVED of the workers only take interactive
+jobs: a new upload never waits for a bulk parse that is already running.
+
+Within a class jobs are queued per tenant (the uploader, or the batch named on upload)
+and tenants take turns, so one recruiter's 5,000-resume import delays another's next
+resume by one parse, not by 5,000.
+
+admit() is the admission control: it raises Overloaded once a class already holds
+PARSE_QUEUE_MAX_<CLASS> jobs, with a Retry-After estimate from the queue depth and
+recent parse times. Only the upload views ask; jobs queued by signals or the
+watchdog are always accepted.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BULK = "interactive", "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+class Overloaded(Exception):
+    def __init__(self, priority: str, retry_after: int) -> None:
+        super().__init__(f"The {priority} parse queue is full; retry in {retry_after}s.")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    resume_id: int
+    priority: str = BULK
+    tenant: str = ""
+    profile: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _ClassQueue:
+    """One priority class: a FIFO per tenant, served round-robin."""
+
+    def __init__(self) -> None:
+        self.tenants: "OrderedDict[str, Deque[Job]]" = OrderedDict()
+        self.depth = 0
+
+    def put(self, job: Job) -> None:
+        self.tenants.setdefault(job.tenant, deque()).append(job)
+        self.depth += 1
+
+    def pop(self) -> Job:
+        tenant, jobs = next(iter(self.tenants.items()))
+        job = jobs.popleft()
+        if jobs:
+            self.tenants.move_to_end(tenant)
+        else:
+            del self.tenants[tenant]
+        self.depth -= 1
+        return job
+
+
+class Scheduler:
+    def __init__(
+        self,
+        run: Callable[[Job], None],
+        *,
+        workers: int,
+        reserved: int = 0,
+        bulk_every: int = 0,
+        limits: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.run = run
+        self.workers = max(1, workers)
+        self.reserved = min(max(0, reserved), self.workers - 1)
+        self.bulk_every = bulk_every
+        self.limits = limits or {}
+        self._cond = threading.Condition()
+        self._queues = {p: _ClassQueue() for p in PRIORITIES}
+        self._queued: Set[int] = set()
+        self._since_bulk = 0
+        self._running = 0
+        self._parse_seconds = 2.0  # moving average, for Retry-After
+        self._threads: List[threading.Thread] = []
+
+    def admit(self, priority: str) -> None:
+        """Raise Overloaded if priority's queue is at its limit (0 = unlimited)."""
+        limit = self.limits.get(priority, 0)
+        with self._cond:
+            depth = self._queues[priority].depth
+        if limit and depth >= limit:
+            metrics.PARSE_REJECTED_TOTAL.inc(priority=priority)
+            raise Overloaded(priority, self.retry_after(priority))
+
+    def retry_after(self, priority: str) -> int:
+        """Seconds until priority's current backlog should have drained."""
+        with self._cond:
+            depth = self._queues[priority].depth
+            if priority == BULK:
+                depth += self._queues[INTERACTIVE].depth  # mostly served first
+        workers = self.workers if priority == INTERACTIVE else self.workers - self.reserved
+        return min(3600, max(1, math.ceil(depth * self._parse_seconds / workers)))
+
+    def submit(self, job: Job) -> None:
+        with self._cond:
+            self._queues[job.priority].put(job)
+            self._queued.add(job.resume_id)
+            self._gauge()
+            self._cond.notify_all()
+            self._start()
+
+    def is_queued(self, resume_id: int) -> bool:
+        with self._cond:
+            return resume_id in self._queued
+
+    def depth(self, priority: str) -> int:
+        with self._cond:
+            return self._queues[priority].depth
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no job is queued or running; False if timeout ran out first."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._running and not any(q.depth for q in self._queues.values()), timeout
+            )
+
+    def _start(self) -> None:
+        while len(self._threads) < self.workers:
+            interactive_only = len(self._threads) < self.reserved
+            t = threading.Thread(
+                target=self._work, args=(interactive_only,), daemon=True,
+                name=f"parse-worker-{len(self._threads)}{'-interactive' if interactive_only else ''}",
+            )
+            self._threads.append(t)
+            t.start()
+
+    def _gauge(self) -> None:
+        for p, q in self._queues.items():
+            metrics.PARSE_QUEUE_DEPTH.set(q.depth, priority=p)
+
+    def _take(self, interactive_only: bool) -> Optional[Job]:
+        interactive, bulk = self._queues[INTERACTIVE], self._queues[BULK]
+        bulk_turn = bool(bulk.depth) and not interactive_only and (
+            not interactive.depth or (self.bulk_every > 0 and self._since_bulk >= self.bulk_every - 1)
+        )
+        if bulk_turn:
+            self._since_bulk = 0
+            job = bulk.pop()
+        elif interactive.depth:
+            if bulk.depth:
+                self._since_bulk += 1
+            job = interactive.pop()
+        else:
+            return None
+        self._queued.discard(job.resume_id)
+        self._gauge()
+        return job
+
+    def _work(self, interactive_only: bool) -> None:
+        while True:
+            with self._cond:
+                job = self._take(interactive_only)
+                while job is None:
+                    self._cond.wait()
+                    job = self._take(interactive_only)
+                self._running += 1
+            metrics.PARSE_QUEUE_WAIT_SECONDS.observe(time.monotonic() - job.enqueued_at, priority=job.priority)
+            started = time.monotonic()
+            try:
+                self.run(job)
+            except Exception:
+                logger.exception("Parse job for resume %s failed", job.resume_id)
+            finally:
+                self._parse_seconds = 0.9 * self._parse_seconds + 0.1 * (time.monotonic() - started)
+                close_old_connections()
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get() -> Scheduler:
+    """This process's scheduler, created (with settings read) on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from .parsing import run_job
+
+            _scheduler = Scheduler(
+                run_job,
+                workers=settings.PARSE_WORKERS,
+                reserved=settings.PARSE_INTERACTIVE_RESERVED,
+                bulk_every=settings.PARSE_BULK_EVERY,
+                limits={INTERACTIVE: settings.PARSE_QUEUE_MAX_INTERACTIVE, BULK: settings.PARSE_QUEUE_MAX_BULK},
+            )
+        return _scheduler
+
+
+def admit(priority: str) -> None:
+    get().admit(priority)
+
+
+def drain(timeout: Optional[float] = None) -> bool:
+    """Wait for this process's parses to finish (see Scheduler.join); True if none were started."""
+    return _scheduler is None or _scheduler.join(timeout)
+
+
+def is_queued(resume_id: int) -> bool:
+    return _scheduler is not None and _scheduler.is_queued(resume_id)
+
+
+def _forget() -> None:
+    # the workers do not survive fork(); a child that parses starts its own
+    global _scheduler, _scheduler_lock
+    _scheduler, _scheduler_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget)
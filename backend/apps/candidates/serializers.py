@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional
 from django.utils import timezone
 from rest_framework import serializers
 
+from . import formats, scheduler
 from .models import Candidate, Resume, Extraction
 
 
@@ -21,6 +22,7 @@ class CandidateListSerializer(serializers.ModelSerializer):
             "phone",
             "latest_company",
             "extraction_status",
+            "duplicate_of",
             "created_at",
         ]
 
@@ -41,6 +43,7 @@ class CandidateDetailSerializer(serializers.ModelSerializer):
             "id",
             "profile",
             "extraction_status",
+            "duplicate_of",
             "documents",
             "created_at",
             "updated_at",
@@ -92,6 +95,9 @@ class ResumeUploadResponseSerializer(serializers.Serializer):
 
 class ResumeUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
+    # bulk imports should pass priority=bulk and a batch name (see scheduler.py)
+    priority = serializers.ChoiceField(choices=scheduler.PRIORITIES, default=scheduler.INTERACTIVE)
+    batch = serializers.CharField(max_length=64, required=False, allow_blank=True, default="")
 
     def create(self, validated_data):
         # Not used (we handle in the view).
@@ -101,14 +107,13 @@ class ResumeUploadSerializer(serializers.Serializer):
         max_mb = int(self.context.get("MAX_UPLOAD_MB", 10))
         if f.size > max_mb * 1024 * 1024:
             raise serializers.ValidationError(f"File too large (>{max_mb} MB).")
-        # Minimal content type check; deeper sniffing can be added.
-        allowed = {
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        }
-        if getattr(f, "content_type", None) not in allowed:
-            # Let PDFs without content_type slide in some browsers.
-            name = (getattr(f, "name", "") or "").lower()
-            if not (name.endswith(".pdf") or name.endswith(".docx")):
-                raise serializers.ValidationError("Only PDF or DOCX resumes are supported.")
+        # The format comes from the content, not the name or content type sent; only the
+        # head of the file (and a ZIP's directory) is read
+        fmt = formats.identify(f, getattr(f, "name", "") or "", getattr(f, "content_type", "") or "")
+        supported = formats.available_formats()
+        if fmt not in supported:
+            raise serializers.ValidationError(
+                f"Unsupported resume format; upload {', '.join(x.upper() for x in supported)}."
+            )
+        f.resume_format = fmt  # read by the upload views
         return f
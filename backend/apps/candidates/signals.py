@@ -1,26 +1,25 @@
 from __future__ import annotations
 
-import threading
 from django.db.models.signals import post_save
 from django.db import transaction
 from django.dispatch import receiver
 
+from . import scheduler
 from .models import Resume
-from .parsing import parse_resume
+from .parsing import queue_parse_resume
 
 
 @receiver(post_save, sender=Resume)
 def parse_on_resume_create(sender, instance: Resume, created: bool, **kwargs):
     """
-    When a Resume is created, kick parsing after the surrounding transaction commits.
-    This duplicates queue_parse_resume in views, but also covers any programmatic creates.
+    When a Resume is created, queue its parse after the surrounding transaction commits.
+    The only place parses are queued from on upload: the upload views set parse_priority
+    and parse_tenant on the instance; programmatic creates are bulk work.
     """
     if not created:
         return
 
-    def _start():
-        t = threading.Thread(target=parse_resume, args=(instance.id,), daemon=True)
-        t.start()
-
+    priority = getattr(instance, "parse_priority", scheduler.BULK)
+    tenant = getattr(instance, "parse_tenant", "")
     # Ensure DB row is visible and file committed before parsing
-    transaction.on_commit(_start)
+    transaction.on_commit(lambda: queue_parse_resume(instance.id, priority=priority, tenant=tenant))
@@ -0,0 +1,109 @@
+"""
+Candidates' current skills as rows: Skill (one per distinct name) and CandidateSkill
+(candidate, skill, confidence), mirroring the skills of each candidate's latest
+completed extraction. "Candidates with django AND postgres" and skill facet counts
+are then lookups on the (skill, candidate) index instead of loading every
+extraction's fields_json.
+
+Rows are replaced with the rest of a parse result (writes.py), refreshed by
+reextract, and were backfilled from existing extractions by migration 0008. The
+extraction's own fields_json keeps the skills exactly as that extraction produced them.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from django.db.models import Count, QuerySet
+
+from .extractors import ExtractionResult
+from .extractors.skills import SKILL_ALIASES
+from .models import Candidate, CandidateSkill, Skill
+
+NAME_MAX = 100
+MATCH_ALL, MATCH_ANY = "all", "any"
+
+
+def normalize(name: str) -> str:
+    """Lowercased, whitespace-collapsed and mapped through the extractor's aliases."""
+    key = " ".join(str(name).split()).lower()
+    return SKILL_ALIASES.get(key, key)[:NAME_MAX]
+
+
+def confidences(result: ExtractionResult) -> Dict[str, float]:
+    """Normalized skill name -> confidence for one extraction result."""
+    out: Dict[str, float] = {}
+    for name, confidence in result.skill_confidences().items():
+        key = normalize(name)
+        if key:
+            out[key] = max(out.get(key, 0.0), confidence)
+    return out
+
+
+def skill_ids(names: Iterable[str]) -> Dict[str, int]:
+    """Ids for normalized names, creating Skill rows for new ones."""
+    names = set(names)
+    if not names:
+        return {}
+    ids = dict(Skill.objects.filter(name__in=names).values_list("name", "id"))
+    missing = names - set(ids)
+    if missing:
+        # ignore_conflicts: a concurrent writer may add the same name first
+        Skill.objects.bulk_create([Skill(name=n) for n in sorted(missing)], ignore_conflicts=True)
+        ids.update(Skill.objects.filter(name__in=missing).values_list("name", "id"))
+    return ids
+
+
+def replace(skills_by_candidate: Mapping[int, Mapping[str, float]]) -> None:
+    """Make each candidate's CandidateSkill rows exactly the given name -> confidence map."""
+    if not skills_by_candidate:
+        return
+    ids = skill_ids(name for skills in skills_by_candidate.values() for name in skills)
+    CandidateSkill.objects.filter(candidate_id__in=list(skills_by_candidate)).delete()
+    CandidateSkill.objects.bulk_create(
+        [
+            CandidateSkill(candidate_id=candidate_id, skill_id=ids[name], confidence=confidence)
+            for candidate_id, skills in skills_by_candidate.items()
+            for name, confidence in skills.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def skills_of(candidate_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Current skill names per candidate (candidates without any are left out)."""
+    out: Dict[int, List[str]] = {}
+    rows = (
+        CandidateSkill.objects.filter(candidate_id__in=list(candidate_ids))
+        .order_by("candidate_id", "id")
+        .values_list("candidate_id", "skill__name")
+    )
+    for candidate_id, name in rows:
+        out.setdefault(candidate_id, []).append(name)
+    return out
+
+
+def with_skills(
+    names: Iterable[str], queryset: Optional[QuerySet] = None, match: str = MATCH_ALL
+) -> QuerySet:
+    """Candidates having all (or, with match="any", at least one) of the named skills."""
+    names = {normalize(n) for n in names} - {""}
+    queryset = Candidate.objects.all() if queryset is None else queryset
+    if not names:
+        return queryset
+    links = CandidateSkill.objects.filter(skill__name__in=names)
+    if match == MATCH_ALL and len(names) > 1:
+        links = links.values("candidate_id").annotate(n=Count("skill_id")).filter(n=len(names))
+    return queryset.filter(id__in=links.values("candidate_id"))
+
+
+def facets(candidates: Optional[QuerySet] = None, limit: int = 20) -> List[Dict[str, object]]:
+    """Most common skills, with how many candidates have each, within candidates if given."""
+    links = CandidateSkill.objects.all()
+    if candidates is not None:
+        links = links.filter(candidate_id__in=candidates.order_by().values("id"))
+    rows = (
+        links.values("skill_id", "skill__name")
+        .annotate(n=Count("candidate_id"))
+        .order_by("-n", "skill__name")[:limit]
+    )
+    return [{"skill": r["skill__name"], "candidates": r["n"]} for r in rows]
@@ -1,9 +1,22 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import CandidateListView, CandidateDetailView, UploadResumeView
+from .views import (
+    CandidateListView,
+    CandidateDetailView,
+    CandidateExportView,
+    SkillFacetView,
+    UploadResumeView,
+    UploadResumeAsyncView,
+)
+
+# ASYNC_VIEWS: same route, async view (serve config.asgi under an ASGI server)
+upload_view = UploadResumeAsyncView if settings.ASYNC_VIEWS else UploadResumeView
 
 urlpatterns = [
-    path("candidates/upload", UploadResumeView.as_view(), name="upload-resume"),
+    path("candidates/upload", upload_view.as_view(), name="upload-resume"),
+    path("candidates/export", CandidateExportView.as_view(), name="candidates-export"),
+    path("candidates/skills", SkillFacetView.as_view(), name="candidates-skills"),
     path("candidates", CandidateListView.as_view(), name="candidates-list"),
     path("candidates/<int:pk>", CandidateDetailView.as_view(), name="candidates-detail"),
 ]
@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import mimetypes
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.storage import blobs
+from apps.storage.models import Blob
+from . import export, formats, scheduler, skill_index
+from .aio import AsyncAPIView
 from .models import Candidate, Resume, Extraction
 from .serializers import (
     CandidateListSerializer,
@@ -16,51 +23,198 @@ from .serializers import (
     ResumeUploadSerializer,
     ResumeUploadResponseSerializer,
 )
-from .parsing import queue_parse_resume
+
+
+def _skill_filter(request, queryset):
+    """?skills=django,postgres keeps candidates with all of them (any of them with skills_match=any)."""
+    names = [n for n in request.query_params.get("skills", "").split(",") if n.strip()]
+    if not names:
+        return queryset
+    match = request.query_params.get("skills_match", skill_index.MATCH_ALL)
+    return skill_index.with_skills(names, queryset, match=match)
 
 
 class CandidateListView(generics.ListAPIView):
+    """GET /candidates[?skills=django,postgres[&skills_match=any]]"""
     queryset = Candidate.objects.order_by("-created_at")
     serializer_class = CandidateListSerializer
 
+    def get_queryset(self):
+        return _skill_filter(self.request, super().get_queryset())
+
+
+class SkillFacetView(APIView):
+    """
+    GET /candidates/skills[?skills=django][&top=20]
+    How many candidates have each skill, among those matching the optional skills filter.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            top = max(1, min(int(request.query_params.get("top", 20)), 200))
+        except ValueError:
+            top = 20
+        candidates = _skill_filter(request, Candidate.objects.all())
+        return Response({"candidates": candidates.count(), "skills": skill_index.facets(candidates, limit=top)})
+
 
 class CandidateDetailView(generics.RetrieveAPIView):
     queryset = Candidate.objects.all()
     serializer_class = CandidateDetailSerializer
 
 
+class CandidateExportView(APIView):
+    """
+    GET /candidates/export?format=csv|jsonl|parquet[&status=PARSED][&masked=false]
+    Streams every candidate with its latest extraction. Email/phone are masked unless
+    masked=false is passed and settings.EXPORT_ALLOW_UNMASKED is on.
+    """
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= names the export file type here, not a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.query_params.get("format", "csv")
+        masked = request.query_params.get("masked", "true").lower() not in ("0", "false", "no")
+        if not masked and not getattr(settings, "EXPORT_ALLOW_UNMASKED", False):
+            return Response({"detail": "Unmasked exports are disabled."}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            body = export.stream_export(
+                fmt, status=request.query_params.get("status") or None, masked=masked,
+                chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", export.DEFAULT_CHUNK_SIZE),
+            )
+        except export.ExportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(body, content_type=export.CONTENT_TYPES[fmt])
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        response["Content-Disposition"] = f'attachment; filename="candidates-{stamp}.{fmt}"'
+        return response
+
+
 class UploadResumeView(APIView):
     """
-    POST /candidates/upload
-    Accepts a PDF/DOCX, creates a Candidate+Resume, and kicks off parsing in a background thread.
+    POST /candidates/upload[?priority=bulk&batch=<name>]
+    Accepts a resume (PDF, DOCX, DOC, RTF, ODT, TXT or HTML), creates a Candidate+Resume
+    and queues it for parsing. Answers 503 (429 for bulk) with Retry-After when that
+    priority's parse queue is full.
     """
     def post(self, request, *args, **kwargs):
         serializer = ResumeUploadSerializer(
-            data=request.data, context={"MAX_UPLOAD_MB": getattr(settings, "MAX_UPLOAD_MB", 10)}
+            data=_upload_data(request, request.data), context={"MAX_UPLOAD_MB": getattr(settings, "MAX_UPLOAD_MB", 10)}
         )
         serializer.is_valid(raise_exception=True)
         f = serializer.validated_data["file"]
+        try:
+            scheduler.admit(serializer.validated_data["priority"])
+        except scheduler.Overloaded as e:
+            body, code, headers = _overloaded(e)
+            return Response(body, status=code, headers=headers)
+
+        resume = _create_resume(f, request, serializer.validated_data)
+
+        payload = {
+            "candidate_id": resume.candidate_id,
+            "resume_id": resume.id,
+            "status": "PARSING",
+            "message": "Resume uploaded; parsing started.",
+        }
+        return Response(ResumeUploadResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
 
-        # Create a blank candidate; parsing will fill it.
-        candidate = Candidate.objects.create(extraction_status=Candidate.ExtractionStatus.PARSING)
 
-        # Store resume locally
-        resume = Resume(
-            candidate=candidate,
-            original_name=getattr(f, "name", "") or "",
-            mime_type=getattr(f, "content_type", "") or (mimetypes.guess_type(getattr(f, "name", ""))[0] or ""),
-            size_bytes=getattr(f, "size", 0) or 0,
-            status=Resume.Status.PARSING,
+class UploadResumeAsyncView(AsyncAPIView):
+    """
+    Async variant of UploadResumeView, served instead of it when settings.ASYNC_VIEWS is
+    on. Holds no thread while the upload arrives; the rows and the blob copy are written in
+    one transaction on a sync thread.
+    """
+    async def post(self, request, *args, **kwargs):
+        serializer = ResumeUploadSerializer(
+            data=_upload_data(request, await self.data(request)),
+            context={"MAX_UPLOAD_MB": getattr(settings, "MAX_UPLOAD_MB", 10)},
         )
-        resume.file.save(getattr(f, "name", "resume"), f, save=True)
+        serializer.is_valid(raise_exception=True)
+        f = serializer.validated_data["file"]
+        try:
+            scheduler.admit(serializer.validated_data["priority"])
+        except scheduler.Overloaded as e:
+            body, code, headers = _overloaded(e)
+            return JsonResponse(body, status=code, headers=headers)
 
-        # After transaction commits, kick off parse (threaded)
-        transaction.on_commit(lambda: queue_parse_resume(resume.id))
+        # one transaction, so it runs as a single sync call (off the event loop)
+        resume = await sync_to_async(_create_resume)(f, request, serializer.validated_data)
 
         payload = {
-            "candidate_id": candidate.id,
+            "candidate_id": resume.candidate_id,
             "resume_id": resume.id,
             "status": "PARSING",
             "message": "Resume uploaded; parsing started.",
         }
-        return Response(ResumeUploadResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+        return JsonResponse(ResumeUploadResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+
+
+def _upload_data(request, data):
+    """The form fields, with priority/batch also accepted from the query string."""
+    extra = {k: request.GET[k] for k in ("priority", "batch") if k in request.GET and k not in data}
+    if not extra:
+        return data
+    merged = {k: data[k] for k in data}
+    merged.update(extra)
+    return merged
+
+
+def _route(resume: Resume, request, validated: dict) -> None:
+    """
+    Scheduling hints read by the post_save signal when it queues the parse: the priority
+    class, and the tenant whose jobs share a fair-queuing turn -- the named batch, else
+    the signed-in user, else the client address.
+    """
+    user = getattr(request, "user", None)
+    if validated.get("batch"):
+        tenant = f"batch:{validated['batch']}"
+    elif user is not None and user.is_authenticated:
+        tenant = f"user:{user.pk}"
+    else:
+        tenant = f"addr:{request.META.get('REMOTE_ADDR', '')}"
+    resume.parse_priority = validated["priority"]
+    resume.parse_tenant = tenant
+
+
+def _overloaded(e: scheduler.Overloaded):
+    """(body, status, headers) for a refused upload."""
+    code = status.HTTP_429_TOO_MANY_REQUESTS if e.priority == scheduler.BULK else status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"detail": str(e)}, code, {"Retry-After": str(e.retry_after)}
+
+
+def _mime_type(f) -> str:
+    fmt = getattr(f, "resume_format", None)
+    if fmt:
+        return formats.spec(fmt).mime
+    return getattr(f, "content_type", "") or (mimetypes.guess_type(getattr(f, "name", ""))[0] or "")
+
+
+@transaction.atomic
+def _create_resume(f, request, validated: dict) -> Resume:
+    """
+    A blank candidate (parsing fills it in) and its resume, stored content-addressed so a
+    re-upload of the same file is not written again. One transaction: a failed save
+    leaves neither rows nor a blob reference behind, and the Resume post_save signal
+    queues the parse once it commits.
+    """
+    candidate = Candidate.objects.create(extraction_status=Candidate.ExtractionStatus.PARSING)
+    blob = blobs.store(f)
+    resume = _resume_for(candidate, f, blob)
+    _route(resume, request, validated)
+    resume.save()
+    return resume
+
+
+def _resume_for(candidate: Candidate, f, blob: Blob) -> Resume:
+    resume = Resume(
+        candidate=candidate,
+        original_name=getattr(f, "name", "") or "",
+        mime_type=_mime_type(f),
+        size_bytes=getattr(f, "size", 0) or 0,
+        sha256=blob.sha256,
+        status=Resume.Status.PARSING,
+    )
+    resume.file.name = blob.path
+    return resume
@@ -0,0 +1,252 @@
+"""
+Deadlines for parse stages and recovery of parses that never finished.
+
+run_with_deadline() bounds one stage. Python threads cannot be killed: a stage run with
+isolation "thread" (the default for text extraction, and the LLM call, which also has a
+client-side timeout) is abandoned at its deadline and the parse is recorded as failed
+while the thread winds down on its own. Isolation "process" runs the stage in a forked
+child that is killed when its deadline passes, so a PDF that sends pypdf into a loop
+costs one process for PARSE_TEXT_TIMEOUT_SECONDS and no more; forking costs tens of
+milliseconds, so it is opt-in (PARSE_TEXT_ISOLATION = "process") except for PDFs that
+preflight sends to a resource-limited child (see pdf_preflight.py).
+
+reap_stuck() finds resumes still PARSING PARSE_STUCK_SECONDS after their last attempt
+started -- the worker died, or hung somewhere no deadline covers -- and queues them
+again, or fails them after PARSE_MAX_ATTEMPTS. Candidates left PARSING with no resume
+being parsed are settled too. It runs every PARSE_WATCHDOG_INTERVAL_SECONDS in any
+process that queues parses, and from `manage.py reap_stuck_parses`.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PROCESS, THREAD = "process", "thread"
+
+
+class StageTimeout(Exception):
+    pass
+
+
+class StageCrashed(Exception):
+    """The child process running a stage exited without a result (killed, out of memory)."""
+
+
+def can_fork() -> bool:
+    return hasattr(os, "fork")
+
+
+def run_with_deadline(
+    stage: str,
+    func: Callable[..., Any],
+    *args: Any,
+    timeout: Optional[float],
+    isolation: str = THREAD,
+    rlimits: Optional[Dict[int, Tuple[int, int]]] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    func(*args, **kwargs), or StageTimeout once timeout seconds pass (no limit if falsy).
+    rlimits ({resource.RLIMIT_*: (soft, hard)}) always runs it in a child process that
+    applies them first.
+    """
+    if rlimits and can_fork():
+        return _in_child(stage, func, args, kwargs, timeout if timeout and timeout > 0 else None, rlimits)
+    if not timeout or timeout <= 0:
+        return func(*args, **kwargs)
+    if isolation == PROCESS and can_fork():
+        return _in_child(stage, func, args, kwargs, timeout)
+    return _in_thread(stage, func, args, kwargs, timeout)
+
+
+def _in_thread(stage: str, func, args, kwargs, timeout: float) -> Any:
+    box: Dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            box["value"] = func(*args, **kwargs)
+        except BaseException as e:  # noqa: BLE001
+            box["error"] = e
+
+    worker = threading.Thread(target=target, name=f"parse-{stage}", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        metrics.PARSE_TIMEOUTS_TOTAL.inc(stage=stage, action="abandoned")
+        raise StageTimeout(f"{stage} still running after {timeout:g}s")
+    if "error" in box:
+        raise box["error"]
+    return box["value"]
+
+
+def _child_main(conn, func, args, kwargs, rlimits=None) -> None:
+    # No database access here: the connections were inherited from the parent.
+    before = metrics.REGISTRY.counter_values()
+    try:
+        if rlimits:
+            import resource
+
+            for which, limit in rlimits.items():
+                resource.setrlimit(which, limit)
+        result = (True, func(*args, **kwargs))
+    except BaseException as e:  # noqa: BLE001
+        result = (False, e)
+    counts = metrics.REGISTRY.counter_deltas(before)
+    try:
+        conn.send(result + (counts,))
+    except Exception:  # noqa: BLE001
+        # an exception that does not pickle
+        conn.send((False, RuntimeError(f"{type(result[1]).__name__}: {result[1]}"), counts))
+    conn.close()
+
+
+def _in_child(stage: str, func, args, kwargs, timeout: Optional[float], rlimits=None) -> Any:
+    # fork: the child starts with the app already loaded, and only its result is pickled
+    ctx = multiprocessing.get_context("fork")
+    receiver, sender = ctx.Pipe(duplex=False)
+    proc = ctx.Process(
+        target=_child_main, args=(sender, func, args, kwargs, rlimits), name=f"parse-{stage}", daemon=True
+    )
+    proc.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            proc.kill()
+            metrics.PARSE_TIMEOUTS_TOTAL.inc(stage=stage, action="killed")
+            raise StageTimeout(f"{stage} killed after {timeout:g}s")
+        try:
+            ok, value, counts = receiver.recv()
+        except EOFError:
+            proc.join()
+            raise StageCrashed(f"{stage} worker exited with code {proc.exitcode}") from None
+    finally:
+        receiver.close()
+        proc.join()
+    metrics.REGISTRY.add_counter_deltas(counts)
+    if not ok:
+        raise value
+    return value
+
+
+def reap_stuck(
+    *, stuck_seconds: Optional[float] = None, dry_run: bool = False, requeue: Optional[Callable[[int], None]] = None
+) -> Dict[str, int]:
+    """
+    Requeue or fail resumes stuck in PARSING, and settle candidates left PARSING; returns
+    counts by action. requeue(resume_id) parses one again (default: queue_parse_resume).
+    """
+    from . import parsing, scheduler, writes
+    from .models import Resume
+
+    ttl = stuck_seconds if stuck_seconds is not None else settings.PARSE_STUCK_SECONDS
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=ttl)
+    done: Counter = Counter()
+    stuck = Resume.objects.filter(status=Resume.Status.PARSING).filter(
+        Q(parse_started_at__lt=cutoff) | Q(parse_started_at__isnull=True, uploaded_at__lt=cutoff)
+    )
+    for resume_id, started, attempts in stuck.values_list("id", "parse_started_at", "parse_attempts"):
+        if scheduler.is_queued(resume_id):
+            continue  # waiting behind a backlog, not stuck
+        hung = parsing.is_in_flight(resume_id)
+        action = "requeued" if attempts < settings.PARSE_MAX_ATTEMPTS and not hung else "failed"
+        if dry_run:
+            done[action] += 1
+            continue
+        # claim it, so one watchdog acts when several processes run one
+        claimed = Resume.objects.filter(id=resume_id, status=Resume.Status.PARSING, parse_started_at=started)
+        if started is None:
+            claimed = Resume.objects.filter(id=resume_id, status=Resume.Status.PARSING, parse_started_at__isnull=True)
+        if not claimed.update(parse_started_at=now):
+            continue
+        if action == "requeued":
+            logger.warning("Resume %s stuck in PARSING since %s; queueing it again", resume_id, started)
+            if requeue is None:
+                parsing.queue_parse_resume(resume_id, tenant="watchdog")
+            else:
+                requeue(resume_id)
+        else:
+            logger.error(
+                "Resume %s stuck in PARSING after %s attempt(s)%s; marking it failed",
+                resume_id, attempts, " (its parse thread is hung)" if hung else "",
+            )
+            resume = Resume.objects.select_related("candidate").get(id=resume_id)
+            writes.save(writes.ParseOutcome(
+                resume=resume, candidate=resume.candidate, timings={}, failed_stage="watchdog", exception="StuckParse"
+            ))
+        metrics.PARSE_RECOVERIES_TOTAL.inc(action=action)
+        done[action] += 1
+
+    done["settled"] = _settle_candidates(cutoff, dry_run)
+    return dict(done)
+
+
+def _settle_candidates(cutoff, dry_run: bool) -> int:
+    """Candidates PARSING with no resume being parsed: PARSED if an extraction completed, else FAILED."""
+    from apps.stats import counters
+
+    from .models import Candidate, Extraction, Resume
+
+    orphans = (
+        Candidate.objects.filter(extraction_status=Candidate.ExtractionStatus.PARSING, updated_at__lt=cutoff)
+        .exclude(resumes__status=Resume.Status.PARSING)
+        .values_list("id", flat=True)
+    )
+    settled = 0
+    for candidate_id in list(orphans):
+        parsed = Extraction.objects.filter(candidate_id=candidate_id, status=Extraction.Status.COMPLETED).exists()
+        status = Candidate.ExtractionStatus.PARSED if parsed else Candidate.ExtractionStatus.FAILED
+        settled += 1
+        if dry_run:
+            continue
+        with transaction.atomic():
+            if Candidate.objects.filter(
+                id=candidate_id, extraction_status=Candidate.ExtractionStatus.PARSING
+            ).update(extraction_status=status, updated_at=timezone.now()):
+                counters.bump(Counter({
+                    (counters.STATUS, Candidate.ExtractionStatus.PARSING): -1, (counters.STATUS, status): 1,
+                }))
+                metrics.PARSE_RECOVERIES_TOTAL.inc(action="settled")
+    return settled
+
+
+_watchdog: Optional[threading.Thread] = None
+_watchdog_lock = threading.Lock()
+
+
+def ensure_running() -> None:
+    """Start this process's watchdog thread (once), unless PARSE_WATCHDOG_INTERVAL_SECONDS is 0."""
+    global _watchdog
+    interval = getattr(settings, "PARSE_WATCHDOG_INTERVAL_SECONDS", 0)
+    if interval <= 0:
+        return
+    with _watchdog_lock:
+        if _watchdog is None:
+            _watchdog = threading.Thread(target=_run, args=(interval,), name="parse-watchdog", daemon=True)
+            _watchdog.start()
+
+
+def _run(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            reap_stuck()
+        except Exception:
+            logger.exception("Parse watchdog pass failed")
+        finally:
+            connections.close_all()
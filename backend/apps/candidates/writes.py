@@ -0,0 +1,264 @@
+"""
+Persisting parse results. Everything one parse changes -- its Extraction and raw text,
+the candidate's columns and skill rows, the resume's status and the stats counters -- is
+committed in one transaction.
+
+With settings.PARSE_WRITE_MODE = "batch" results are instead buffered per process and
+flushed together, every PARSE_WRITE_BATCH_SIZE results or PARSE_WRITE_FLUSH_SECONDS,
+whichever comes first: one transaction of bulk_create/bulk_update statements for the
+whole batch, so N parse workers commit a handful of times a second instead of once per
+resume each. A parsed resume stays PARSING until its batch is flushed.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from apps.stats import counters
+from . import dedup, metrics, skill_index
+from .extractors import ExtractionResult
+from .models import Candidate, Extraction, ExtractionText, Resume, compress_text
+
+logger = logging.getLogger(__name__)
+
+# extracted field -> Candidate column it populates
+CANDIDATE_FIELDS = {
+    "name": "name",
+    "email": "primary_email",
+    "phone": "primary_phone",
+    "company": "latest_company",
+    "designation": "designation",
+}
+
+
+def apply_fields_to_candidate(candidate: Candidate, fields: Union[Dict, ExtractionResult]) -> List[str]:
+    """Copy extracted fields onto candidate (keeping current values for missing keys); return changed columns."""
+    changed = []
+    for key, column in CANDIDATE_FIELDS.items():
+        value = fields.get(key, getattr(candidate, column) or "")
+        if value != getattr(candidate, column):
+            setattr(candidate, column, value)
+            changed.append(column)
+    return changed
+
+
+@dataclass
+class ParseOutcome:
+    """What one parse produced; nothing is written until it is passed to save()."""
+
+    resume: Resume
+    candidate: Candidate
+    timings: Dict[str, float]
+    model_name: str = "heuristics"
+    extractor_version: int = 0
+    result: ExtractionResult = field(default_factory=ExtractionResult)
+    text: str = ""
+    headings: List[str] = field(default_factory=list)  # layout hints, kept for re-extraction
+    failed_stage: Optional[str] = None
+    exception: str = ""
+
+
+def write_outcomes(outcomes: Sequence[ParseOutcome]) -> None:
+    """Commit a list of outcomes in one transaction, a fixed number of statements however long it is."""
+    now = timezone.now()
+    extractions: List[Extraction] = []
+    parsed: List[Candidate] = []
+    failed: List[Candidate] = []
+    for o in outcomes:
+        ex = Extraction(candidate=o.candidate, resume=o.resume, model_name=o.model_name, timings_json=o.timings)
+        if o.failed_stage:
+            ex.status = Extraction.Status.FAILED
+            ex.timings_json = {**o.timings, "failed_stage": o.failed_stage}
+            o.candidate.extraction_status = Candidate.ExtractionStatus.FAILED
+            o.resume.status = Resume.Status.FAILED
+            failed.append(o.candidate)
+        else:
+            ex.status = Extraction.Status.COMPLETED
+            ex.fields_json, ex.confidences_json = o.result.to_json()
+            ex.extractor_version = o.extractor_version
+            ex.completed_at = now
+            apply_fields_to_candidate(o.candidate, o.result)
+            o.candidate.extraction_status = Candidate.ExtractionStatus.PARSED
+            o.resume.status = Resume.Status.PARSED
+            parsed.append(o.candidate)
+        # bulk_update bypasses auto_now, so stamp updated_at explicitly
+        o.candidate.updated_at = now
+        extractions.append(ex)
+
+    new_skills = {o.candidate.id: skill_index.confidences(o.result) for o in outcomes if not o.failed_stage}
+    with transaction.atomic():
+        deltas = _stat_deltas(outcomes, new_skills)
+        Extraction.objects.bulk_create(extractions)
+        texts = []
+        for ex, o in zip(extractions, outcomes):
+            if not o.failed_stage:
+                codec, data = compress_text(o.text)
+                texts.append(
+                    ExtractionText(
+                        extraction=ex, codec=codec, data=data, size_chars=len(o.text), headings_json=o.headings
+                    )
+                )
+        ExtractionText.objects.bulk_create(texts)
+        if parsed:
+            Candidate.objects.bulk_update(
+                parsed, list(CANDIDATE_FIELDS.values()) + ["extraction_status", "updated_at"]
+            )
+        if failed:
+            Candidate.objects.bulk_update(failed, ["extraction_status", "updated_at"])
+        Resume.objects.bulk_update([o.resume for o in outcomes], ["status"])
+        skill_index.replace(new_skills)
+        counters.bump(deltas)
+    metrics.PARSE_WRITE_BATCH_ROWS.observe(len(outcomes))
+
+    for o in outcomes:
+        if o.failed_stage:
+            metrics.PARSE_FAILURES_TOTAL.inc(stage=o.failed_stage, exception=o.exception)
+            metrics.PARSES_TOTAL.inc(status="failed")
+        else:
+            metrics.PARSES_TOTAL.inc(status="parsed")
+
+
+def _stat_deltas(outcomes: Sequence[ParseOutcome], new_skills: Dict[int, Dict[str, float]]) -> counters.Deltas:
+    """
+    Counter changes for outcomes about to be written, measured against the candidates'
+    committed rows (locked until the write commits) rather than the copies the parses
+    loaded, so a resume parsed twice or a concurrent re-parse is not counted twice.
+    """
+    ids = [o.candidate.id for o in outcomes]
+    before = {
+        cid: (status, company)
+        for cid, status, company in Candidate.objects.select_for_update()
+        .filter(id__in=ids)
+        .values_list("id", "extraction_status", "latest_company")
+    }
+    skills_before = skill_index.skills_of(ids)
+    deltas = counters.Deltas()
+    for o in outcomes:
+        if o.candidate.id not in before:
+            continue
+        status, company = before.pop(o.candidate.id)
+        skills = skills_before.get(o.candidate.id, [])
+        deltas.subtract(counters.contribution(status, company, skills))
+        if o.failed_stage:
+            deltas.update(counters.contribution(Candidate.ExtractionStatus.FAILED, company, skills))
+        else:
+            deltas.update(counters.contribution(
+                Candidate.ExtractionStatus.PARSED, o.candidate.latest_company, new_skills[o.candidate.id]
+            ))
+    return deltas
+
+
+def _link_duplicates(outcomes: Sequence[ParseOutcome]) -> None:
+    if getattr(settings, "DEDUP_MODE", "link") == "off":
+        return
+    for o in outcomes:
+        if o.failed_stage:
+            continue
+        try:
+            with metrics.stage_timer("dedup"):
+                dedup.link_candidate(o.candidate, o.text)
+        except Exception:
+            # a failed duplicate check must not fail an otherwise good parse
+            logger.exception("Duplicate check for candidate %s failed", o.candidate.id)
+
+
+def _write(outcomes: Sequence[ParseOutcome]) -> None:
+    """Write outcomes, then run the duplicate check for the parsed ones."""
+    try:
+        with metrics.stage_timer("db_write"):
+            write_outcomes(outcomes)
+    except Exception as e:  # noqa: BLE001
+        if len(outcomes) > 1:
+            # keep one bad row from losing the batch: retry one by one
+            logger.warning(
+                "Batched write of %s parse results failed; writing them singly", len(outcomes), exc_info=True
+            )
+            for o in outcomes:
+                _write([o])
+            return
+        o = outcomes[0]
+        if o.failed_stage:
+            logger.exception("Recording failed parse of resume %s failed", o.resume.id)
+            return
+        logger.exception("Writing parse result of resume %s failed", o.resume.id)
+        o.failed_stage, o.exception = "db_write", type(e).__name__
+        _write([o])
+        return
+    _link_duplicates(outcomes)
+
+
+class WriteBatcher:
+    """Buffers outcomes and flushes them from a background thread on size or age."""
+
+    def __init__(self, batch_size: int, interval: float) -> None:
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._pending: List[ParseOutcome] = []
+        self._lock = threading.Lock()
+        # serialises flushes, so the background thread and a size-triggered flush never interleave
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="parse-writes", daemon=True)
+        self._thread.start()
+
+    def add(self, outcome: ParseOutcome) -> None:
+        with self._lock:
+            self._pending.append(outcome)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns how many outcomes were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            for start in range(0, len(batch), self.batch_size):
+                _write(batch[start: start + self.batch_size])
+            return len(batch)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing parse results failed")
+            finally:
+                connections.close_all()
+
+
+_batcher: Optional[WriteBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def _get_batcher() -> WriteBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = WriteBatcher(settings.PARSE_WRITE_BATCH_SIZE, settings.PARSE_WRITE_FLUSH_SECONDS)
+            atexit.register(_batcher.flush)
+        return _batcher
+
+
+def save(outcome: ParseOutcome) -> None:
+    """Persist one parse outcome now, or hand it to the batcher in "batch" mode."""
+    if getattr(settings, "PARSE_WRITE_MODE", "immediate") == "batch":
+        _get_batcher().add(outcome)
+    else:
+        _write([outcome])
+
+
+def flush() -> int:
+    """Write any buffered outcomes now (a no-op unless batching has started)."""
+    return _batcher.flush() if _batcher is not None else 0
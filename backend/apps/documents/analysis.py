@@ -0,0 +1,176 @@
+"""
+Background analysis of uploaded PAN/Aadhaar documents: read the document's text (the PDF
+text layer, or OCR when it is enabled), find PAN/Aadhaar numbers in it, cross-check them
+against what the uploader typed, and fill in masked_number. Runs after the submission
+commits, on a worker thread, so the submit request never waits for it.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.candidates import ocr, pdf_preflight
+from apps.candidates.metrics import REGISTRY
+from apps.candidates.formats.pdf import pages as pdf_pages
+from apps.candidates.parsing import extract_text_guarded
+from .models import Document
+from .validators import AADHAAR_RE, is_valid_pan, verhoeff_valid
+
+logger = logging.getLogger(__name__)
+
+# Unanchored forms of PAN_RE / AADHAAR_RE for scanning free text; hits are re-checked
+# with the validators. Aadhaar numbers never start with 0 or 1 and are printed "1234 5678 9012".
+PAN_SCAN_RE = re.compile(r"(?<![A-Z0-9])[A-Z]{5}[0-9]{4}[A-Z](?![A-Z0-9])")
+AADHAAR_SCAN_RE = re.compile(r"(?<!\d)[2-9]\d{3}[ -]?\d{4}[ -]?\d{4}(?!\d)")
+
+DOCUMENT_ANALYSES_TOTAL = REGISTRY.counter(
+    "document_analyses_total", "Background PAN/Aadhaar document analyses by kind and outcome.", ["kind", "outcome"]
+)
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def normalize_number(kind: str, value: str) -> str:
+    value = (value or "").strip()
+    if kind == Document.Kind.PAN:
+        return value.upper()
+    return re.sub(r"[\s-]", "", value)
+
+
+def mask_number(value: str) -> str:
+    # same masking the submit endpoint applies to typed numbers
+    return value[-4:] if value else ""
+
+
+def find_numbers(kind: str, text: str) -> List[str]:
+    """Distinct valid PAN (or Aadhaar) numbers in text, in order of appearance."""
+    found: List[str] = []
+    if kind == Document.Kind.PAN:
+        for m in PAN_SCAN_RE.finditer(text.upper()):
+            if is_valid_pan(m.group(0)) and m.group(0) not in found:
+                found.append(m.group(0))
+    else:
+        for m in AADHAAR_SCAN_RE.finditer(text):
+            digits = normalize_number(kind, m.group(0))
+            if AADHAAR_RE.match(digits) and verhoeff_valid(digits) and digits not in found:
+                found.append(digits)
+    return found
+
+
+def document_text(doc: Document) -> Tuple[str, str]:
+    """
+    (text, source): the PDF text layer, OCR output, or ("", "none") if neither is available.
+    Uploads get the same guards as resumes: PDFs are preflighted (PdfRejected past the hard
+    limits) and read under the text deadline, large ones in a resource-limited child.
+    """
+    with doc.file.open("rb") as fh:
+        data = fh.read()
+    report = pdf_preflight.check(data) if doc.mime_type == "application/pdf" else None
+    return extract_text_guarded(data, str(doc.id), doc.mime_type or "", report, read=_read_text)
+
+
+def _read_text(data: bytes, name: str, mime_type: str) -> Tuple[str, str]:
+    text, pages = "", None
+    if mime_type == "application/pdf":
+        try:
+            page_texts = list(pdf_pages(io.BytesIO(data)))
+            text, pages = "\n".join(page_texts), len(page_texts)
+        except Exception:
+            logger.warning("Could not read text layer of document %s", name, exc_info=True)
+    source = "pdf_text" if text.strip() else "none"
+    if ocr.enabled():
+        ocr_text = ocr.text_with_ocr_fallback(data, text, mime_type=mime_type, pages=pages)
+        if ocr_text != text and ocr_text.strip():
+            return ocr_text, "ocr"
+    return text, source
+
+
+def analyze_document(document_id: int, submitted_number: str = "") -> Optional[Document]:
+    """
+    Scan one document, record what was found in verified_flags_json and fill masked_number.
+    submitted_number is the full number the uploader typed, if any; only its masked form is
+    stored, so it is passed in memory rather than read back from the row.
+    """
+    doc = Document.objects.filter(id=document_id).first()
+    if doc is None:
+        return None
+    flags = dict(doc.verified_flags_json or {})
+    try:
+        text, source = document_text(doc)
+        numbers = find_numbers(doc.kind, text)
+        submitted = normalize_number(doc.kind, submitted_number)
+
+        flags.update(text_source=source, number_found=bool(numbers), analyzed_at=timezone.now().isoformat())
+        flags.pop("analysis_error", None)
+        if submitted:
+            flags["number_match"] = submitted in numbers if numbers else None
+        elif doc.masked_number and numbers and flags.get("masked_source") != "document":
+            # no full number to compare (e.g. a re-run): compare what was kept of the typed one
+            flags["number_match"] = any(mask_number(n) == doc.masked_number for n in numbers)
+        if numbers and not doc.masked_number:
+            doc.masked_number = mask_number(numbers[0])
+            flags["masked_source"] = "document"
+        if not numbers:
+            outcome = "not_found" if source != "none" else "no_text"
+        elif flags.get("number_match") is False:
+            outcome = "mismatch"
+        else:
+            outcome = "found"
+    except pdf_preflight.PdfRejected as e:
+        logger.warning("Document %s not analysed: %s", document_id, e)
+        flags["analysis_error"] = type(e).__name__
+        outcome = "rejected"
+    except Exception as e:  # noqa: BLE001
+        logger.exception("Analysing document %s failed", document_id)
+        flags["analysis_error"] = type(e).__name__
+        outcome = "failed"
+    doc.verified_flags_json = flags
+    doc.save(update_fields=["masked_number", "verified_flags_json"])
+    DOCUMENT_ANALYSES_TOTAL.inc(kind=doc.kind, outcome=outcome)
+    return doc
+
+
+def _executor() -> ThreadPoolExecutor:
+    # A fixed pool: a burst of submissions queues ids instead of starting a thread (and
+    # a database connection) per document.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.DOCUMENT_ANALYSIS_WORKERS), thread_name_prefix="doc-analysis"
+            )
+        return _pool
+
+
+def _forget_pool() -> None:
+    # the pool's threads do not survive fork(); a child builds its own if it needs one
+    global _pool, _pool_lock
+    _pool, _pool_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool)
+
+
+def _run_analysis(document_id: int, submitted_number: str) -> None:
+    try:
+        analyze_document(document_id, submitted_number)
+    except Exception:  # noqa: BLE001 - the row lookup or save itself failed
+        logger.exception("Analysing document %s failed", document_id)
+    finally:
+        close_old_connections()
+
+
+def queue_document_analysis(document_id: int, submitted_number: str = "") -> None:
+    """Analyse a document by id on the bounded analysis pool."""
+    _executor().submit(_run_analysis, document_id, submitted_number)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.documents.analysis import analyze_document
+from apps.documents.models import Document
+
+
+class Command(BaseCommand):
+    help = (
+        "Run PAN/Aadhaar analysis over stored documents that have not been analysed yet "
+        "(e.g. uploaded before automatic analysis, or while OCR was disabled)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="re-analyse every document")
+        parser.add_argument("--kind", choices=Document.Kind.values)
+
+    def handle(self, *args, **options):
+        docs = Document.objects.order_by("id")
+        if options["kind"]:
+            docs = docs.filter(kind=options["kind"])
+        if not options["all"]:
+            docs = docs.exclude(verified_flags_json__has_key="analyzed_at")
+        found = total = 0
+        for doc_id in docs.values_list("id", flat=True).iterator():
+            doc = analyze_document(doc_id)
+            total += 1
+            if doc is not None and (doc.verified_flags_json or {}).get("number_found"):
+                found += 1
+        self.stdout.write(f"Analysed {total} documents; a number was found in {found}.")
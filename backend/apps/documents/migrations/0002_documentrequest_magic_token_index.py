@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="documentrequest",
+            name="magic_token",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=128),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0002_hot_path_indexes"),
+        ("documents", "0002_documentrequest_magic_token_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(fields=["candidate", "kind"], name="doc_cand_kind_idx"),
+        ),
+    ]
@@ -35,6 +35,11 @@ class Document(models.Model):
 
     uploaded_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["candidate", "kind"], name="doc_cand_kind_idx"),
+        ]
+
     def compute_sha256(self) -> None:
         if not self.file:
             return
@@ -70,7 +75,7 @@ class DocumentRequest(models.Model):
 
     # simple content/log
     message_preview = models.TextField(blank=True, default="")
-    magic_token = models.CharField(max_length=128, blank=True, default="")  # if you later create a portal
+    magic_token = models.CharField(max_length=128, blank=True, default="", db_index=True)  # redeemed by /portal/upload
     link_url = models.URLField(blank=True, default="")
 
     created_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from apps.candidates.models import Candidate
+from .models import DocumentRequest
+
+TOKEN_SALT = "doc-request"
+
+
+class PortalGrant(NamedTuple):
+    """What a verified magic token entitles the bearer to."""
+
+    request_id: int
+    candidate_id: int
+    expires_at: datetime
+
+
+class PortalTokenError(Exception):
+    """Token is malformed, tampered with, expired or no longer backed by a request."""
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(settings.SECRET_KEY, salt=TOKEN_SALT)
+
+
+def _ttl() -> timedelta:
+    return timedelta(hours=int(getattr(settings, "PORTAL_TOKEN_TTL_HOURS", 72)))
+
+
+def portal_link(token: str) -> str:
+    base = getattr(settings, "PORTAL_BASE_URL", "http://localhost:8000").rstrip("/")
+    return f"{base}/portal/upload?t={token}"
+
+
+def issue_portal_token(candidate: Candidate) -> Tuple[str, datetime]:
+    """
+    Sign a new upload token for candidate. Returns (token, expires_at); the caller
+    stores both on a DocumentRequest so the token can be redeemed.
+    """
+    # The nonce keeps tokens unique even when issued within the same second.
+    token = _serializer().dumps({"cid": candidate.id, "n": secrets.token_hex(4)})
+    return token, timezone.now() + _ttl()
+
+
+class _GrantCache:
+    """
+    Bounded, thread-safe LRU of token -> PortalGrant. Entries live for ttl seconds, so a
+    request revoked or re-dated in the database (by any process) is seen within that.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[PortalGrant, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[PortalGrant]:
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return entry[0]
+
+    def put(self, token: str, grant: PortalGrant) -> None:
+        with self._lock:
+            self._data[token] = (grant, time.monotonic() + self.ttl)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._data.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+grant_cache = _GrantCache(
+    int(getattr(settings, "PORTAL_TOKEN_CACHE_SIZE", 1024)),
+    int(getattr(settings, "PORTAL_TOKEN_CACHE_SECONDS", 60)),
+)
+
+
+def verify_portal_token(token: str) -> PortalGrant:
+    """
+    Resolve a magic token to a PortalGrant.
+
+    A cache hit costs a dict lookup; a miss costs the signature check plus one query
+    on the indexed DocumentRequest.magic_token column. Grants are cached for at most
+    PORTAL_TOKEN_CACHE_SECONDS, after which the row is read again. Raises PortalTokenError.
+    """
+    if not token:
+        raise PortalTokenError("Missing token.")
+
+    now = timezone.now()
+    grant = grant_cache.get(token)
+    if grant is not None:
+        if grant.expires_at > now:
+            return grant
+        grant_cache.discard(token)
+        raise PortalTokenError("Link has expired.")
+
+    # No max_age: the request's expires_at decides, so a link re-dated after issue
+    # (or issued under a different PORTAL_TOKEN_TTL_HOURS) is honoured as stored.
+    try:
+        payload = _serializer().loads(token)
+    except BadSignature as e:
+        raise PortalTokenError("Invalid or expired link.") from e
+
+    row = (
+        DocumentRequest.objects.filter(magic_token=token)
+        .values("id", "candidate_id", "expires_at")
+        .first()
+    )
+    if row is None or row["candidate_id"] != payload.get("cid"):
+        raise PortalTokenError("Link is no longer valid.")
+    expires_at = row["expires_at"] or now
+    if expires_at <= now:
+        raise PortalTokenError("Link has expired.")
+
+    grant = PortalGrant(row["id"], row["candidate_id"], expires_at)
+    grant_cache.put(token, grant)
+    return grant
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from apps.candidates import aio
 from apps.candidates.models import Candidate
+from apps.stats import counters
+from apps.storage import blobs
+from .analysis import queue_document_analysis
 from .models import Document, DocumentRequest, DocumentSubmission
+from .portal import issue_portal_token, portal_link
 from .validators import (
     is_valid_pan,
     is_valid_aadhaar,
@@ -28,7 +37,7 @@ class SubmitDocumentsSerializer(serializers.Serializer):
             raise serializers.ValidationError("Provide at least one file: pan_file or aadhaar_file.")
         return attrs
 
-    def _save_one(
+    def _build_document(
         self,
         *,
         candidate: Candidate,
@@ -36,6 +45,7 @@ class SubmitDocumentsSerializer(serializers.Serializer):
         fobj,
         number: Optional[str],
     ) -> Document:
+        """Validate one upload and return its unsaved Document (file not stored yet)."""
         doc = Document(candidate=candidate, kind=kind)
 
         # Set meta from file
@@ -63,11 +73,6 @@ class SubmitDocumentsSerializer(serializers.Serializer):
 
         doc.mime_type = mime
         doc.size_bytes = size or 0
-        doc.file.save(filename, fobj, save=False)
-        doc.save()  # need pk for path; the save above may also persist
-
-        # compute hash post-save to read the stored file
-        doc.compute_sha256()
 
         verified = {"mime_ok": True}
 
@@ -82,45 +87,58 @@ class SubmitDocumentsSerializer(serializers.Serializer):
             doc.masked_number = v[-4:] if v else ""
 
         doc.verified_flags_json = verified
-        doc.save(update_fields=["sha256", "verified_flags_json", "masked_number"])
-
         return doc
 
-    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
-        candidate: Candidate = self.context["candidate"]
-        request_obj: Optional[DocumentRequest] = self.context.get("document_request")
-
-        pan_doc = None
-        aadhaar_doc = None
-
+    def _uploads(self, validated_data: Dict[str, Any]) -> List[Tuple[str, Any, str]]:
+        """(kind, file, typed number) for each document in the submission."""
+        uploads = []
         if validated_data.get("pan_file"):
-            pan_doc = self._save_one(
-                candidate=candidate,
-                kind=Document.Kind.PAN,
-                fobj=validated_data["pan_file"],
-                number=(validated_data.get("pan_number") or "").upper(),
+            uploads.append(
+                (Document.Kind.PAN, validated_data["pan_file"], (validated_data.get("pan_number") or "").upper())
             )
-
         if validated_data.get("aadhaar_file"):
-            aadhaar_doc = self._save_one(
-                candidate=candidate,
-                kind=Document.Kind.AADHAAR,
-                fobj=validated_data["aadhaar_file"],
-                number=validated_data.get("aadhaar_number") or "",
+            uploads.append(
+                (Document.Kind.AADHAAR, validated_data["aadhaar_file"], validated_data.get("aadhaar_number") or "")
             )
+        return uploads
+
+    @transaction.atomic
+    def _write(
+        self, docs: Dict[str, Document], uploads: List[Tuple[str, Any, str]], source: str
+    ) -> Dict[str, Any]:
+        """
+        Store the files and write the documents, the submission and the request status in
+        one transaction; the documents are queued for analysis once it commits.
+        """
+        candidate: Candidate = self.context["candidate"]
+        request_obj: Optional[DocumentRequest] = self.context.get("document_request")
 
+        for kind, fobj, number in uploads:
+            # Content-addressed: the hash was taken while the upload streamed in, and a
+            # re-submitted identical file only adds a reference.
+            blob = blobs.store(fobj)
+            docs[kind].sha256 = blob.sha256
+            docs[kind].file.name = blob.path
+            docs[kind].save()
+            # Read the number off the document itself once the submission has committed.
+            transaction.on_commit(partial(queue_document_analysis, docs[kind].id, number))
+
+        pan_doc = docs.get(Document.Kind.PAN)
+        aadhaar_doc = docs.get(Document.Kind.AADHAAR)
         sub = DocumentSubmission.objects.create(
             request=request_obj,
             candidate=candidate,
             pan_document=pan_doc,
             aadhaar_document=aadhaar_doc,
-            source=validated_data.get("source") or DocumentSubmission.Source.STAFF,
+            source=source or DocumentSubmission.Source.STAFF,
         )
 
         # if both uploaded, you might choose to mark latest request as completed
-        if request_obj and (pan_doc or aadhaar_doc):
+        if request_obj and docs:
+            # conditional, so a second submission on the same link is not counted again
+            if _open_requests(request_obj).update(status=DocumentRequest.Status.COMPLETED):
+                counters.bump(_COMPLETED)
             request_obj.status = DocumentRequest.Status.COMPLETED
-            request_obj.save(update_fields=["status"])
 
         return {
             "submission_id": sub.id,
@@ -128,6 +146,37 @@ class SubmitDocumentsSerializer(serializers.Serializer):
             "aadhaar_document_id": aadhaar_doc.id if aadhaar_doc else None,
         }
 
+    async def acreate(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        create() for the async views. Uploads are validated on the I/O pool; the writes
+        run as one sync transaction, since a transaction cannot span async ORM calls.
+        """
+        candidate: Candidate = self.context["candidate"]
+        uploads = self._uploads(validated_data)
+        docs = {}
+        for kind, fobj, number in uploads:
+            docs[kind] = await aio.run_io(
+                self._build_document, candidate=candidate, kind=kind, fobj=fobj, number=number
+            )
+        return await sync_to_async(self._write)(docs, uploads, validated_data.get("source"))
+
+    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        candidate: Candidate = self.context["candidate"]
+        uploads = self._uploads(validated_data)
+        # every upload is validated before anything is stored
+        docs = {
+            kind: self._build_document(candidate=candidate, kind=kind, fobj=fobj, number=number)
+            for kind, fobj, number in uploads
+        }
+        return self._write(docs, uploads, validated_data.get("source"))
+
+
+_COMPLETED = counters.Deltas({(counters.DOCUMENTS, counters.REQUESTS_COMPLETED): 1})
+
+
+def _open_requests(request_obj: DocumentRequest):
+    return DocumentRequest.objects.filter(pk=request_obj.pk).exclude(status=DocumentRequest.Status.COMPLETED)
+
 
 class SubmitDocumentsResponseSerializer(serializers.Serializer):
     submission_id = serializers.IntegerField()
@@ -138,16 +187,11 @@ class SubmitDocumentsResponseSerializer(serializers.Serializer):
 class RequestDocumentsSerializer(serializers.Serializer):
     channel = serializers.ChoiceField(choices=DocumentRequest.Channel.choices, default=DocumentRequest.Channel.EMAIL)
 
-    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
-        from itsdangerous import URLSafeSerializer
-
-        candidate: Candidate = self.context["candidate"]
-        channel = validated_data["channel"]
-
-        # Simple token & link (you can later add an actual portal endpoint)
-        s = URLSafeSerializer(settings.SECRET_KEY, salt="doc-request")
-        token = s.dumps({"cid": candidate.id})
-        link = f"http://localhost:8000/portal/upload?t={token}"
+    def _record(self, candidate: Candidate, channel: str) -> DocumentRequest:
+        """Unsaved DocumentRequest carrying a fresh portal link and the message to send."""
+        # Timed token, redeemable at /portal/upload until expires_at
+        token, expires_at = issue_portal_token(candidate)
+        link = portal_link(token)
 
         msg = (
             f"Hi {candidate.name or 'Candidate'},\n\n"
@@ -155,36 +199,58 @@ class RequestDocumentsSerializer(serializers.Serializer):
             f"Upload securely here: {link}\n\n"
             "Thanks!"
         )
-        req = DocumentRequest.objects.create(
+        return DocumentRequest(
             candidate=candidate,
             channel=channel,
             status=DocumentRequest.Status.SENT,
             message_preview=msg,
             magic_token=token,
             link_url=link,
+            sent_at=timezone.now(),
+            expires_at=expires_at,
         )
 
-        # Send via console email or log-SMS
-        if channel == DocumentRequest.Channel.EMAIL and candidate.primary_email:
-            send_mail(
-                subject="Request for PAN/Aadhaar",
-                message=msg,
-                from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "Dev <dev@localhost>"),
-                recipient_list=[candidate.primary_email],
-                fail_silently=True,
-            )
-        elif channel == DocumentRequest.Channel.SMS and candidate.primary_phone:
-            # minimal SMS stub
-            print(f"[SMS → {candidate.primary_phone}] {msg}")  # noqa: T201
-
+    def _payload(self, req: DocumentRequest) -> Dict[str, Any]:
         return {
             "request_id": req.id,
             "channel": req.channel,
             "status": req.status,
-            "link": link,
-            "message_preview": msg,
+            "link": req.link_url,
+            "message_preview": req.message_preview,
         }
 
+    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        candidate: Candidate = self.context["candidate"]
+        req = self._record(candidate, validated_data["channel"])
+        req.save()
+        send_document_request(req.channel, candidate.primary_email, candidate.primary_phone, req.message_preview)
+        return self._payload(req)
+
+    async def acreate(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        """create() for the async views: the send is dispatched, not awaited."""
+        candidate: Candidate = self.context["candidate"]
+        req = self._record(candidate, validated_data["channel"])
+        await req.asave()
+        aio.dispatch(
+            send_document_request, req.channel, candidate.primary_email, candidate.primary_phone, req.message_preview
+        )
+        return self._payload(req)
+
+
+def send_document_request(channel: str, email: str, phone: str, msg: str) -> None:
+    """Send via console email or log-SMS."""
+    if channel == DocumentRequest.Channel.EMAIL and email:
+        send_mail(
+            subject="Request for PAN/Aadhaar",
+            message=msg,
+            from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "Dev <dev@localhost>"),
+            recipient_list=[email],
+            fail_silently=True,
+        )
+    elif channel == DocumentRequest.Channel.SMS and phone:
+        # minimal SMS stub
+        print(f"[SMS → {phone}] {msg}")  # noqa: T201
+
 
 class RequestDocumentsResponseSerializer(serializers.Serializer):
     request_id = serializers.IntegerField()
@@ -192,3 +258,9 @@ class RequestDocumentsResponseSerializer(serializers.Serializer):
     status = serializers.CharField()
     link = serializers.CharField()
     message_preview = serializers.CharField()
+
+
+class PortalStatusSerializer(serializers.Serializer):
+    request_id = serializers.IntegerField()
+    candidate_id = serializers.IntegerField()
+    expires_at = serializers.DateTimeField()
@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import SubmitDocumentsView, RequestDocumentsView
+from .views import SubmitDocumentsView, RequestDocumentsView, SubmitDocumentsAsyncView, RequestDocumentsAsyncView
+
+# ASYNC_VIEWS: same routes, async views (serve config.asgi under an ASGI server)
+submit_view = SubmitDocumentsAsyncView if settings.ASYNC_VIEWS else SubmitDocumentsView
+request_view = RequestDocumentsAsyncView if settings.ASYNC_VIEWS else RequestDocumentsView
 
 urlpatterns = [
-    path("candidates/<int:candidate_id>/submit-documents", SubmitDocumentsView.as_view(), name="submit-documents"),
-    path("candidates/<int:candidate_id>/request-documents", RequestDocumentsView.as_view(), name="request-documents"),
+    path("candidates/<int:candidate_id>/submit-documents", submit_view.as_view(), name="submit-documents"),
+    path("candidates/<int:candidate_id>/request-documents", request_view.as_view(), name="request-documents"),
 ]
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.candidates.aio import AsyncAPIView
 from apps.candidates.models import Candidate
-from .models import DocumentRequest
+from .models import DocumentRequest, DocumentSubmission
+from .portal import PortalTokenError, verify_portal_token
 from .serializers import (
     SubmitDocumentsSerializer,
     SubmitDocumentsResponseSerializer,
     RequestDocumentsSerializer,
     RequestDocumentsResponseSerializer,
+    PortalStatusSerializer,
 )
 
 
@@ -51,3 +56,106 @@ class RequestDocumentsView(APIView):
         serializer.is_valid(raise_exception=True)
         payload = serializer.save()
         return Response(RequestDocumentsResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+
+
+class PortalUploadView(APIView):
+    """
+    GET  /portal/upload?t=<token>  -> whether the link is still redeemable
+    POST /portal/upload?t=<token>  -> same body as submit-documents, recorded as a PORTAL submission
+
+    Tokens are verified through the grant cache, so repeated uploads on one link skip the
+    signature check and the DocumentRequest lookup.
+    """
+
+    def _grant(self, request):
+        return verify_portal_token(request.query_params.get("t", ""))
+
+    def get(self, request, *args, **kwargs):
+        try:
+            grant = self._grant(request)
+        except PortalTokenError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        return Response(PortalStatusSerializer(grant._asdict()).data)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            grant = self._grant(request)
+        except PortalTokenError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        # The grant already proves both rows exist; unsaved shells carry the pks for the
+        # FK writes and the request status update without re-fetching them.
+        candidate = Candidate(pk=grant.candidate_id)
+        doc_req = DocumentRequest(pk=grant.request_id, candidate_id=grant.candidate_id)
+
+        serializer = SubmitDocumentsSerializer(
+            data=request.data, context={"candidate": candidate, "document_request": doc_req}
+        )
+        serializer.is_valid(raise_exception=True)
+        payload = serializer.save(source=DocumentSubmission.Source.PORTAL)
+        return Response(SubmitDocumentsResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+
+
+# Async variants, served instead of the views above when settings.ASYNC_VIEWS is on.
+
+
+async def _acandidate(candidate_id: int) -> Candidate:
+    candidate = await Candidate.objects.filter(pk=candidate_id).afirst()
+    if candidate is None:
+        raise Http404
+    return candidate
+
+
+class SubmitDocumentsAsyncView(AsyncAPIView):
+    async def post(self, request, candidate_id: int, *args, **kwargs):
+        candidate = await _acandidate(candidate_id)
+        request_id = request.GET.get("request_id")
+        doc_req = None
+        if request_id:
+            doc_req = await DocumentRequest.objects.filter(pk=request_id, candidate=candidate).afirst()
+
+        serializer = SubmitDocumentsSerializer(
+            data=await self.data(request), context={"candidate": candidate, "document_request": doc_req}
+        )
+        serializer.is_valid(raise_exception=True)
+        payload = await serializer.acreate(serializer.validated_data)
+        return JsonResponse(SubmitDocumentsResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+
+
+class RequestDocumentsAsyncView(AsyncAPIView):
+    """The email/SMS goes out on the I/O pool after the response; a slow SMTP server never holds the request."""
+
+    async def post(self, request, candidate_id: int, *args, **kwargs):
+        candidate = await _acandidate(candidate_id)
+        serializer = RequestDocumentsSerializer(data=await self.data(request) or {}, context={"candidate": candidate})
+        serializer.is_valid(raise_exception=True)
+        payload = await serializer.acreate(serializer.validated_data)
+        return JsonResponse(RequestDocumentsResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
+
+
+class PortalUploadAsyncView(AsyncAPIView):
+    async def _grant(self, request):
+        # cache hits are cheap; a miss looks the token up in the database
+        return await sync_to_async(verify_portal_token)(request.GET.get("t", ""))
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            grant = await self._grant(request)
+        except PortalTokenError as e:
+            return JsonResponse({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        return JsonResponse(PortalStatusSerializer(grant._asdict()).data)
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            grant = await self._grant(request)
+        except PortalTokenError as e:
+            return JsonResponse({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        candidate = Candidate(pk=grant.candidate_id)
+        doc_req = DocumentRequest(pk=grant.request_id, candidate_id=grant.candidate_id)
+        serializer = SubmitDocumentsSerializer(
+            data=await self.data(request), context={"candidate": candidate, "document_request": doc_req}
+        )
+        serializer.is_valid(raise_exception=True)
+        payload = await serializer.acreate({**serializer.validated_data, "source": DocumentSubmission.Source.PORTAL})
+        return JsonResponse(SubmitDocumentsResponseSerializer(payload).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1 @@
+# Dashboard aggregates kept as incrementally maintained counters; see counters.py.
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class StatsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.stats"
+
+    def ready(self) -> None:
+        super().ready()
+        # Count candidates and documents as they are created and deleted.
+        from . import signals  # noqa: F401
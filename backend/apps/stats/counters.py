@@ -0,0 +1,186 @@
+"""
+Summary counters behind GET /api/stats. Instead of grouping over candidates, their
+skill rows and the document tables on every request, each number lives in a StatCounter
+row that is adjusted in the same transaction as the change it counts:
+
+- parse results (candidates.writes) move a candidate between statuses and swap its
+  company and skills for the new ones;
+- creating or deleting a candidate, and creating a document, request or submission,
+  is counted by the signal handlers in signals.py;
+- a document request turning COMPLETED is counted where that happens.
+
+Writes that skip signals (bulk_create, queryset.update(), dedup merges, reextract) let
+the counters drift; `manage.py reconcile_stats` recomputes everything from the source
+tables and rewrites the rows, and should run periodically.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Count
+
+from apps.candidates.metrics import REGISTRY
+from .models import StatCounter
+
+STATUS = StatCounter.Scope.STATUS
+SKILL = StatCounter.Scope.SKILL
+COMPANY = StatCounter.Scope.COMPANY
+DOCUMENTS = StatCounter.Scope.DOCUMENTS
+
+# keys of the documents scope
+REQUESTS_SENT = "requests_sent"
+REQUESTS_COMPLETED = "requests_completed"
+CANDIDATES_REQUESTED = "candidates_requested"
+CANDIDATES_COMPLETE = "candidates_complete"  # at least one document of every kind
+
+
+def candidates_with(kind: str) -> str:
+    return f"candidates_with_{kind.lower()}"
+
+
+def submissions(source: str) -> str:
+    return f"submissions_{source.lower()}"
+
+
+# (scope, key) -> amount
+Deltas = Counter
+
+STATS_BUMPS_TOTAL = REGISTRY.counter("stats_counter_bumps_total", "Summary counter rows adjusted incrementally.")
+
+
+def contribution(status: str, company: str, skills: Iterable[str]) -> Deltas:
+    """What one candidate adds to the counters."""
+    deltas: Deltas = Counter({(STATUS, status): 1})
+    if company:
+        deltas[(COMPANY, company[:255])] += 1
+    for skill in set(skills):
+        deltas[(SKILL, skill)] += 1
+    return deltas
+
+
+def negated(deltas: Deltas) -> Deltas:
+    return Counter({k: -v for k, v in deltas.items()})
+
+
+def bump(deltas: Deltas) -> None:
+    """
+    Add deltas to their counters with one upsert per row (INSERT ... ON CONFLICT, which
+    both SQLite and PostgreSQL support). Call it inside the transaction making the change.
+    """
+    rows = [(scope, key, n) for (scope, key), n in sorted(deltas.items()) if n]
+    if not rows:
+        return
+    q = connection.ops.quote_name
+    table = q(StatCounter._meta.db_table)
+    with connection.cursor() as cur:
+        # sorted rows: concurrent writers lock counters in the same order
+        cur.executemany(
+            f"INSERT INTO {table} ({q('scope')}, {q('key')}, {q('value')}) VALUES (%s, %s, %s) "
+            f"ON CONFLICT ({q('scope')}, {q('key')}) DO UPDATE SET {q('value')} = {table}.{q('value')} + excluded.{q('value')}",
+            rows,
+        )
+    STATS_BUMPS_TOTAL.inc(len(rows))
+
+
+abump = sync_to_async(bump)
+
+
+def compute() -> Deltas:
+    """Every counter recomputed from the source tables."""
+    from apps.candidates.models import Candidate, CandidateSkill
+    from apps.documents.models import Document, DocumentRequest, DocumentSubmission
+
+    truth: Deltas = Counter()
+    for row in Candidate.objects.values("extraction_status").annotate(n=Count("id")).order_by():
+        truth[(STATUS, row["extraction_status"])] = row["n"]
+    for row in Candidate.objects.exclude(latest_company="").values("latest_company").annotate(n=Count("id")).order_by():
+        truth[(COMPANY, row["latest_company"][:255])] += row["n"]
+    for row in CandidateSkill.objects.values("skill__name").annotate(n=Count("candidate_id")).order_by():
+        truth[(SKILL, row["skill__name"])] = row["n"]
+
+    truth[(DOCUMENTS, REQUESTS_SENT)] = DocumentRequest.objects.count()
+    truth[(DOCUMENTS, REQUESTS_COMPLETED)] = DocumentRequest.objects.filter(
+        status=DocumentRequest.Status.COMPLETED
+    ).count()
+    truth[(DOCUMENTS, CANDIDATES_REQUESTED)] = DocumentRequest.objects.values("candidate_id").distinct().count()
+    kinds: Dict[int, set] = {}
+    for candidate_id, kind in Document.objects.values_list("candidate_id", "kind").distinct().order_by():
+        kinds.setdefault(candidate_id, set()).add(kind)
+    for kind in Document.Kind.values:
+        truth[(DOCUMENTS, candidates_with(kind))] = sum(1 for held in kinds.values() if kind in held)
+    truth[(DOCUMENTS, CANDIDATES_COMPLETE)] = sum(
+        1 for held in kinds.values() if held >= set(Document.Kind.values)
+    )
+    for row in DocumentSubmission.objects.values("source").annotate(n=Count("id")).order_by():
+        truth[(DOCUMENTS, submissions(row["source"]))] = row["n"]
+    return truth
+
+
+def reconcile(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rewrite every counter from compute(). Changes committed while compute() runs can be
+    lost or counted twice; the next run picks them up.
+    """
+    truth = compute()
+    current = {(c.scope, c.key): c.value for c in StatCounter.objects.all()}
+    stale = [k for k, v in current.items() if v and not truth.get(k)]
+    wrong = {k: v for k, v in truth.items() if v and current.get(k) != v}
+    report = {
+        "counters": sum(1 for v in truth.values() if v),
+        "corrected": len(wrong) + len(stale),
+        "drift": sum(abs(v - current.get(k, 0)) for k, v in wrong.items()) + sum(abs(current[k]) for k in stale),
+    }
+    if dry_run or not report["corrected"]:
+        return report
+    with transaction.atomic():
+        for scope, key in stale:
+            StatCounter.objects.filter(scope=scope, key=key).delete()
+        StatCounter.objects.bulk_create(
+            [StatCounter(scope=scope, key=key, value=v) for (scope, key), v in wrong.items()],
+            update_conflicts=True, unique_fields=["scope", "key"], update_fields=["value"], batch_size=500,
+        )
+    return report
+
+
+def snapshot(top: int = 10) -> Dict[str, object]:
+    """The /api/stats payload: three indexed reads whatever the table sizes."""
+    from apps.candidates.models import Candidate
+    from apps.documents.models import Document
+
+    by_status = {s: 0 for s in Candidate.ExtractionStatus.values}
+    docs: Dict[str, int] = {}
+    for scope, key, value in StatCounter.objects.filter(scope__in=[STATUS, DOCUMENTS]).values_list(
+        "scope", "key", "value"
+    ):
+        (by_status if scope == STATUS else docs)[key] = value
+
+    def top_of(scope: str, label: str) -> List[Dict[str, object]]:
+        rows = StatCounter.objects.filter(scope=scope, value__gt=0).order_by("-value", "key")[:top]
+        return [{label: key, "candidates": value} for key, value in rows.values_list("key", "value")]
+
+    requested = docs.get(CANDIDATES_REQUESTED, 0)
+    sent = docs.get(REQUESTS_SENT, 0)
+    documents: Dict[str, object] = {
+        "requests_sent": sent,
+        "requests_completed": docs.get(REQUESTS_COMPLETED, 0),
+        "request_completion_rate": _rate(docs.get(REQUESTS_COMPLETED, 0), sent),
+        "candidates_requested": requested,
+        "candidates_complete": docs.get(CANDIDATES_COMPLETE, 0),
+        "candidate_completion_rate": _rate(docs.get(CANDIDATES_COMPLETE, 0), requested),
+        "submissions": {k[len("submissions_"):]: v for k, v in docs.items() if k.startswith("submissions_")},
+    }
+    for kind in Document.Kind.values:
+        documents[candidates_with(kind)] = docs.get(candidates_with(kind), 0)
+    return {
+        "candidates": {"total": sum(by_status.values()), "by_status": by_status},
+        "top_skills": top_of(SKILL, "skill"),
+        "top_companies": top_of(COMPANY, "company"),
+        "documents": documents,
+    }
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole > 0 else None
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("scope", models.CharField(choices=[("status", "Candidates by extraction status"), ("skill", "Candidates by skill"), ("company", "Candidates by latest company"), ("documents", "Document requests and submissions")], max_length=16)),
+                ("key", models.CharField(max_length=255)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["scope", "-value"], name="statcounter_scope_value_idx")],
+                "constraints": [models.UniqueConstraint(fields=("scope", "key"), name="statcounter_scope_key_uniq")],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class StatCounter(models.Model):
+    """
+    One dashboard number: how many candidates have a status, a skill or a company, or a
+    document-flow total. Kept current by counters.bump() as data changes and rewritten
+    from the source tables by counters.reconcile().
+    """
+
+    class Scope(models.TextChoices):
+        STATUS = "status", "Candidates by extraction status"
+        SKILL = "skill", "Candidates by skill"
+        COMPANY = "company", "Candidates by latest company"
+        DOCUMENTS = "documents", "Document requests and submissions"
+
+    scope = models.CharField(max_length=16, choices=Scope.choices)
+    key = models.CharField(max_length=255)
+    # signed: a decrement can briefly land before the increment it undoes
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="statcounter_scope_key_uniq"),
+        ]
+        indexes = [
+            # top N of a scope: WHERE scope = ? ORDER BY value DESC LIMIT N
+            models.Index(fields=["scope", "-value"], name="statcounter_scope_value_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope}:{self.key}={self.value}"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.candidates.skill_index import skills_of
+from . import counters
+
+
+@receiver(post_save, sender="candidates.Candidate")
+def count_new_candidate(sender, instance, created: bool, **kwargs):
+    # later changes are counted by the code making them (parse writes) or by reconcile
+    if created:
+        counters.bump(counters.contribution(instance.extraction_status, instance.latest_company, ()))
+
+
+@receiver(pre_delete, sender="candidates.Candidate")
+def uncount_candidate(sender, instance, **kwargs):
+    # pre_delete: its skill rows are still there
+    skills = skills_of([instance.pk]).get(instance.pk, ())
+    counters.bump(counters.negated(
+        counters.contribution(instance.extraction_status, instance.latest_company, skills)
+    ))
+
+
+@receiver(post_save, sender="documents.Document")
+def count_document(sender, instance, created: bool, **kwargs):
+    if not created:
+        return
+    held = set(
+        sender.objects.filter(candidate_id=instance.candidate_id)
+        .exclude(pk=instance.pk)
+        .values_list("kind", flat=True)
+        .distinct()
+    )
+    if instance.kind in held:
+        return
+    deltas = Counter({(counters.DOCUMENTS, counters.candidates_with(instance.kind)): 1})
+    if held | {instance.kind} >= set(sender.Kind.values):
+        deltas[(counters.DOCUMENTS, counters.CANDIDATES_COMPLETE)] += 1
+    counters.bump(deltas)
+
+
+@receiver(post_save, sender="documents.DocumentRequest")
+def count_document_request(sender, instance, created: bool, **kwargs):
+    if not created:
+        return
+    deltas = Counter({(counters.DOCUMENTS, counters.REQUESTS_SENT): 1})
+    if not sender.objects.filter(candidate_id=instance.candidate_id).exclude(pk=instance.pk).exists():
+        deltas[(counters.DOCUMENTS, counters.CANDIDATES_REQUESTED)] += 1
+    counters.bump(deltas)
+
+
+@receiver(post_save, sender="documents.DocumentSubmission")
+def count_submission(sender, instance, created: bool, **kwargs):
+    if created:
+        counters.bump(Counter({(counters.DOCUMENTS, counters.submissions(instance.source)): 1}))
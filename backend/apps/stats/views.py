@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import counters
+
+MAX_TOP = 100
+
+
+class StatsView(APIView):
+    """
+    GET /stats[?top=10]
+    Candidate counts by extraction status, the top skills and companies, and document
+    request/completion totals, read from the summary counters.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            top = int(request.query_params.get("top", 10))
+        except ValueError:
+            top = 10
+        return Response(counters.snapshot(top=max(1, min(top, MAX_TOP))))
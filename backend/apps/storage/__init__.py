@@ -0,0 +1 @@
+# Content-addressed file storage shared by resumes and documents; see blobs.py.
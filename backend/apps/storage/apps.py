@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class StorageConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.storage"
+
+    def ready(self) -> None:
+        super().ready()
+        # Release blob references when resumes/documents are deleted.
+        from . import signals  # noqa: F401
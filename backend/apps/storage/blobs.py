@@ -0,0 +1,123 @@
+"""
+Content-addressed storage for uploaded files. Identical bytes are written once under
+blob_path(sha256); each Resume/Document referencing them holds one count on the Blob
+row, and the row and file are removed after the count drops to zero. Both store() and
+the removal go through the row lock, so a file is never deleted under a live row.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from functools import partial
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from apps.candidates.metrics import REGISTRY
+from .models import Blob, blob_path
+
+logger = logging.getLogger(__name__)
+
+BLOB_STORES_TOTAL = REGISTRY.counter(
+    "blob_stores_total", "Files stored, by whether the content was new or already present.", ["result"]
+)
+BLOB_BYTES_DEDUPED_TOTAL = REGISTRY.counter(
+    "blob_bytes_deduped_total", "Bytes not written because identical content was already stored."
+)
+
+
+def sha256_of(fobj) -> str:
+    """Digest set by the hashing upload handlers, or computed by reading the file once."""
+    digest = getattr(fobj, "sha256", None)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    pos = fobj.tell() if hasattr(fobj, "tell") else 0
+    fobj.seek(0)
+    for chunk in iter(lambda: fobj.read(64 * 1024), b""):
+        h.update(chunk)
+    fobj.seek(pos)
+    return h.hexdigest()
+
+
+def _file_size(fobj) -> int:
+    size = getattr(fobj, "size", None)
+    if size is None:
+        pos = fobj.tell()
+        fobj.seek(0, 2)
+        size = fobj.tell()
+        fobj.seek(pos)
+    return size or 0
+
+
+def store(fobj) -> Blob:
+    """
+    Add a reference to fobj's content, writing it only if no identical file is stored.
+    The row is counted (or created) before the file is looked at, and its lock is held
+    until the caller's transaction commits, so a concurrent release() of the same bytes
+    cannot remove the file from under the new reference.
+    """
+    digest = sha256_of(fobj)
+    path = blob_path(digest)
+    size = _file_size(fobj)
+    with transaction.atomic():
+        # the UPDATE takes the row lock; a pending removal of this digest waits for it
+        if Blob.objects.filter(sha256=digest).update(ref_count=F("ref_count") + 1):
+            blob = Blob.objects.get(sha256=digest)
+            if blob.ref_count > 1 or default_storage.exists(path):
+                BLOB_STORES_TOTAL.inc(result="dedup")
+                BLOB_BYTES_DEDUPED_TOTAL.inc(size)
+                return blob
+            # the last reference went and its file with it; this one brings the file back
+        else:
+            try:
+                with transaction.atomic():
+                    blob = Blob.objects.create(sha256=digest, size_bytes=size, ref_count=1)
+            except IntegrityError:
+                # created concurrently, and committed with its file: count on that one
+                Blob.objects.filter(sha256=digest).update(ref_count=F("ref_count") + 1)
+                BLOB_STORES_TOTAL.inc(result="dedup")
+                BLOB_BYTES_DEDUPED_TOTAL.inc(size)
+                return Blob.objects.get(sha256=digest)
+        # a file without a row is a leftover (a rolled-back upload); never trust it
+        _write(path, fobj, replace=True)
+    BLOB_STORES_TOTAL.inc(result="new")
+    return blob
+
+
+def _write(path: str, fobj, *, replace: bool = False) -> None:
+    if default_storage.exists(path):
+        if not replace:
+            return
+        default_storage.delete(path)
+    fobj.seek(0)
+    saved = default_storage.save(path, fobj)
+    if saved != path:
+        # the same name was written between the delete and the save; keep that copy
+        default_storage.delete(saved)
+
+
+def release(digest: str) -> None:
+    """Drop one reference; once none remain, delete the row and the file after commit."""
+    if not digest:
+        return
+    with transaction.atomic():
+        Blob.objects.filter(sha256=digest, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+        unreferenced = Blob.objects.filter(sha256=digest, ref_count=0).exists()
+    if unreferenced:
+        transaction.on_commit(partial(_remove_if_unreferenced, digest))
+
+
+def _remove_if_unreferenced(digest: str) -> None:
+    # The same bytes may have been stored again since. Deleting the row only while it is
+    # still at zero takes its lock, so either store() counted it first and the file stays,
+    # or store() waits for this, finds no row and writes the file again.
+    with transaction.atomic():
+        deleted, _ = Blob.objects.filter(sha256=digest, ref_count=0).delete()
+        if deleted:
+            default_storage.delete(blob_path(digest))
+
+
+def is_blob_name(name: str, digest: str) -> bool:
+    return bool(digest) and name == blob_path(digest)
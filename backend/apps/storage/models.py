@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+
+
+def blob_path(sha256: str) -> str:
+    """Storage name for content with this digest: blobs/ab/cd/abcd..."""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+class Blob(models.Model):
+    """
+    One stored file per distinct content. Resume/Document rows point their FileField at
+    blob_path(sha256) and hold a reference; the file is deleted when the last goes.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    @property
+    def path(self) -> str:
+        return blob_path(self.sha256)
+
+    def __str__(self) -> str:
+        return f"Blob {self.sha256[:12]} ({self.ref_count} refs)"
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .blobs import is_blob_name, release
+
+
+@receiver(post_delete, sender="candidates.Resume")
+@receiver(post_delete, sender="documents.Document")
+def release_blob_on_delete(sender, instance, **kwargs):
+    """Files stored before content addressing are left alone; blob-backed ones drop a reference."""
+    if is_blob_name(instance.file.name or "", instance.sha256):
+        release(instance.sha256)
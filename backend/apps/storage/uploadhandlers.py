@@ -0,0 +1,35 @@
+"""
+Upload handlers that hash each file while Django streams it in, so storing it
+content-addressed needs no second read. The digest is set as `.sha256` on the
+UploadedFile. Configured through settings.FILE_UPLOAD_HANDLERS.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        # before super(): MemoryFileUploadHandler raises StopFutureHandlers from new_file
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    pass
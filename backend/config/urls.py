@@ -2,16 +2,29 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+
+from apps.candidates.metrics import REGISTRY
+from apps.documents.views import PortalUploadAsyncView, PortalUploadView
 
 def health(_request):
     return JsonResponse({"status": "ok"})
 
+def metrics(_request):
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("health/", health),
+    path("metrics", metrics),
     path("api/", include("apps.candidates.urls")),
     path("api/", include("apps.documents.urls")),
+    path("api/", include("apps.stats.urls")),
+    path(
+        "portal/upload",
+        (PortalUploadAsyncView if settings.ASYNC_VIEWS else PortalUploadView).as_view(),
+        name="portal-upload",
+    ),
     # you can also expose agent logs later if desired
 ]
 
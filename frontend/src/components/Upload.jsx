@@ -42,14 +42,14 @@ export default function Upload() {
         onDrop={onDrop}
         onDragOver={(e) => e.preventDefault()}
       >
-        <p>Drag & drop PDF or DOCX here</p>
+        <p>Drag & drop a resume here (PDF, DOCX, DOC, RTF, ODT, TXT or HTML)</p>
         <p>— or —</p>
         <label className="label-file">
           Choose file
           <input
             className="upload-input"
             type="file"
-            accept=".pdf,.docx,application/pdf,application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            accept=".pdf,.docx,.doc,.rtf,.odt,.txt,.html,.htm"
             onChange={onPick}
             ref={fileInput}
           />